@@ -0,0 +1,79 @@
+"""
+Записывает снимок страниц docs.python.org и peps.python.org
+для бенчмарков. Выполняет режимы парсера на реальных сайтах
+и сохраняет каждый полученный ответ.
+
+    python benchmarks/record.py
+    python benchmarks/record.py --modes pep --output pep_snapshot.json
+"""
+import argparse
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin
+
+from stand_in import BASE_DIR, make_page, save_snapshot
+
+from run import MODES, SNAPSHOT_PATH
+
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Запись снимка страниц')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--output', type=Path, default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BASE_DIR / 'src'))
+    logging.disable(logging.CRITICAL)
+    import main as parser_main
+    from session import ParserSession
+
+    snapshot = {}
+    redirects = {}
+
+    def record(response: Any, *args: Any, **kwargs: Any) -> None:
+        if response.request.method != 'GET':
+            return
+        if response.is_redirect:
+            redirects[response.url] = urljoin(
+                response.url, response.headers['Location']
+            )
+            return
+        if not response.ok:
+            return
+        content_type = response.headers.get('Content-Type', '')
+        if content_type.startswith('text/'):
+            page = make_page(response.text, content_type)
+        else:
+            page = make_page(response.content, content_type)
+        page['headers'].update(
+            (name, response.headers[name]) for name in RECORDED_HEADERS
+            if name in response.headers
+        )
+        snapshot[response.url] = page
+
+    session = ParserSession(backend='memory')
+    session.hooks['response'].append(record)
+    with tempfile.TemporaryDirectory() as workdir:
+        parser_main.BASE_DIR = Path(workdir)
+        for mode in args.modes:
+            results = parser_main.MODE_TO_FUNCTION[mode](session)
+            print(f'{mode}: {len(results or [])} строк')
+
+    for url in redirects:
+        target = url
+        while target in redirects and target not in snapshot:
+            target = redirects[target]
+        if target in snapshot:
+            snapshot[url] = snapshot[target]
+
+    save_snapshot(snapshot, args.output)
+    print(f'Записано страниц: {len(snapshot)} в {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Бенчмарк режимов парсера на локальной подмене сайтов.
+
+Каждый режим запускается в отдельном процессе через синхронную
+(main.py) и асинхронную (async_main.py) точки входа. Для каждого
+запуска измеряются время работы, число запросов в секунду, время
+разбора HTML и пиковый RSS процесса; результаты сравниваются
+с сохраненным базовым замером.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --modes pep --entries async --latency 50
+    python benchmarks/run.py --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from prettytable import PrettyTable
+
+from stand_in import BASE_DIR, MAIN_DOC_URL, MAIN_PEP_URL, StandInServer,\
+    load_snapshot, synthetic_snapshot
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SNAPSHOT_PATH = BENCHMARKS_DIR / 'snapshot.json'
+BASELINE_PATH = BENCHMARKS_DIR / 'baseline.json'
+MODES = ['whats-new', 'latest-versions', 'download', 'pep']
+ENTRIES = ['sync', 'async']
+
+
+def run_mode(
+    base_url: str, mode: str, entry: str, workdir: str
+) -> Dict[str, Any]:
+    """
+    Выполняет один режим парсера на локальной подмене сайтов.
+    Вызывается в отдельном процессе, чтобы пиковый RSS
+    относился только к этому запуску.
+
+    :param base_url: адрес локального сервера
+    :param mode: режим работы парсера
+    :param entry: точка входа, sync или async
+    :param workdir: директория для загрузок
+    :return: время работы и разбора в секундах, пиковый RSS в КБ
+    """
+    sys.path.insert(0, str(BASE_DIR / 'src'))
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    import async_main
+    import main
+    import utils
+    from session import ParserSession
+
+    for module in (main, async_main):
+        module.MAIN_DOC_URL = base_url + MAIN_DOC_URL.split('://', 1)[1]
+        module.MAIN_PEP_URL = base_url + MAIN_PEP_URL.split('://', 1)[1]
+        module.BASE_DIR = Path(workdir)
+
+    parse_time = 0.0
+    parse_html = utils.parse_html
+
+    def timed_parse_html(*args: Any, **kwargs: Any) -> Any:
+        nonlocal parse_time
+        started = time.perf_counter()
+        try:
+            return parse_html(*args, **kwargs)
+        finally:
+            parse_time += time.perf_counter() - started
+
+    utils.parse_html = timed_parse_html
+    session = ParserSession(backend='memory')
+
+    started = time.perf_counter()
+    if entry == 'sync':
+        function = main.MODE_TO_STREAM.get(mode, main.MODE_TO_FUNCTION[mode])
+        results = function(session)
+    else:
+        function = async_main.MODE_TO_FUNCTION[mode]
+        results = function(session)
+        if asyncio.iscoroutine(results):
+            results = asyncio.run(results)
+    if results is not None:
+        list(results)
+    wall_time = time.perf_counter() - started
+
+    return {
+        'wall': wall_time,
+        'parse': parse_time,
+        'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def measure(
+    server: StandInServer, mode: str, entry: str, repeat: int
+) -> Dict[str, float]:
+    """
+    Запускает режим repeat раз и возвращает медианы замеров.
+
+    :param server: запущенный локальный сервер
+    :param mode: режим работы парсера
+    :param entry: точка входа, sync или async
+    :param repeat: число повторов
+    :return: медианы времени работы, запросов в секунду,
+    времени разбора и пиковый RSS в МБ
+    """
+    runs = []
+    for _ in range(repeat):
+        server.reset()
+        with tempfile.TemporaryDirectory() as workdir:
+            completed = subprocess.run(
+                [
+                    sys.executable, __file__, '--worker',
+                    server.base_url, mode, entry, workdir
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+        run = json.loads(completed.stdout.decode().splitlines()[-1])
+        run['rps'] = server.requests / run['wall']
+        runs.append(run)
+    return {
+        'wall': statistics.median(run['wall'] for run in runs),
+        'rps': statistics.median(run['rps'] for run in runs),
+        'parse': statistics.median(run['parse'] for run in runs),
+        'rss_mb': max(run['rss_kb'] for run in runs) / 1024,
+    }
+
+
+def format_delta(value: float, baseline: Dict[str, float], key: str) -> str:
+    if key not in baseline or not baseline[key]:
+        return '-'
+    return f'{(value - baseline[key]) / baseline[key] * 100:+.1f}%'
+
+
+def report(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]]
+) -> None:
+    """
+    Выводит таблицу замеров и их отклонение от базового замера.
+
+    :param results: замеры по ключам вида режим/точка входа
+    :param baseline: базовые замеры по тем же ключам
+    :return: None
+    """
+    table = PrettyTable()
+    table.field_names = [
+        'Запуск', 'Время, с', 'Δ время', 'Запросов/с',
+        'Разбор, с', 'Δ разбор', 'RSS, МБ'
+    ]
+    table.align = 'l'
+    for key, result in results.items():
+        base = baseline.get(key, {})
+        table.add_row([
+            key,
+            f'{result["wall"]:.3f}',
+            format_delta(result['wall'], base, 'wall'),
+            f'{result["rps"]:.1f}',
+            f'{result["parse"]:.3f}',
+            format_delta(result['parse'], base, 'parse'),
+            f'{result["rss_mb"]:.1f}',
+        ])
+    print(table)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Бенчмарк режимов парсера')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument(
+        '--entries', nargs='+', choices=ENTRIES, default=ENTRIES
+    )
+    parser.add_argument(
+        '--latency', type=float, default=20,
+        help='Задержка ответа в миллисекундах'
+    )
+    parser.add_argument(
+        '--jitter', type=float, default=5,
+        help='Разброс задержки в миллисекундах'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--snapshot', type=Path, default=SNAPSHOT_PATH,
+        help='Записанный снимок страниц (см. record.py); если файла нет, '
+             'используется синтетический снимок из корпуса тестов'
+    )
+    parser.add_argument('--peps', type=int, default=500)
+    parser.add_argument('--articles', type=int, default=12)
+    parser.add_argument('--archive-size', type=int, default=1024 * 1024)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Сохранить замеры как базовые'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> None:
+    if argv[:1] == ['--worker']:
+        print(json.dumps(run_mode(*argv[1:])))
+        return
+
+    args = parse_args(argv)
+    if args.snapshot.exists():
+        snapshot = load_snapshot(args.snapshot)
+    else:
+        snapshot = synthetic_snapshot(
+            args.peps, args.articles, args.archive_size
+        )
+
+    results = {}
+    with StandInServer(
+        snapshot, args.latency / 1000, args.jitter / 1000, args.seed
+    ) as server:
+        for mode in args.modes:
+            for entry in args.entries:
+                results[f'{mode}/{entry}'] = measure(
+                    server, mode, entry, args.repeat
+                )
+
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline, encoding='UTF-8') as file:
+            baseline = json.load(file)
+    report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='UTF-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
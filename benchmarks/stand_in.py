@@ -0,0 +1,228 @@
+"""
+Локальная подмена docs.python.org и peps.python.org для бенчмарков.
+Отдает записанный снимок страниц с настраиваемой задержкой и разбросом.
+"""
+import base64
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+MAIN_PEP_URL = 'https://peps.python.org/'
+ARCHIVE_PATH = 'archives/python-3.11.4-docs-pdf-a4.zip'
+
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+def make_page(
+    body: Any, content_type: str = 'text/html; charset=utf-8'
+) -> Dict[str, Any]:
+    """
+    Создает запись снимка для одной страницы.
+
+    :param body: тело ответа, str или bytes
+    :param content_type: значение заголовка Content-Type
+    :return: запись снимка
+    """
+    if isinstance(body, bytes):
+        return {
+            'status': 200,
+            'headers': {'Content-Type': content_type},
+            'body': base64.b64encode(body).decode(),
+            'encoding': 'base64',
+        }
+    return {
+        'status': 200,
+        'headers': {'Content-Type': content_type},
+        'body': body,
+        'encoding': 'text',
+    }
+
+
+def page_body(page: Dict[str, Any]) -> bytes:
+    """
+    Возвращает тело страницы из записи снимка.
+
+    :param page: запись снимка
+    :return: тело ответа
+    """
+    if page.get('encoding') == 'base64':
+        return base64.b64decode(page['body'])
+    return page['body'].encode('utf-8')
+
+
+def synthetic_snapshot(
+    peps: int = 500, articles: int = 12, archive_size: int = 1024 * 1024
+) -> Snapshot:
+    """
+    Строит снимок сайтов из корпуса страниц тестов, увеличенный
+    до заданного числа PEP и статей whatsnew. Каждая PEP
+    указана в двух разделах индекса, как на peps.python.org.
+
+    :param peps: число карточек PEP
+    :param articles: число статей whatsnew
+    :param archive_size: размер архива документации в байтах
+    :return: снимок страниц
+    """
+    sys.path.insert(0, str(BASE_DIR / 'tests'))
+    from fixture_data.pages import DOC_INDEX, DOWNLOAD, pep_card, pep_row,\
+        whats_new_article
+
+    statuses = [('PA', 'Active'), ('PF', 'Final'), ('SW', 'Withdrawn'),
+                ('I', 'Draft'), ('SR', 'Rejected')]
+    rows = []
+    snapshot = {}
+    for number in range(1, peps + 1):
+        index_status, card_status = statuses[number % len(statuses)]
+        rows.append(pep_row(index_status, number))
+        snapshot[MAIN_PEP_URL + f'pep-{number}'] = make_page(
+            pep_card(number, card_status)
+        )
+    tbody = ''.join(rows)
+    snapshot[MAIN_PEP_URL] = make_page(
+        '<html><body>'
+        '<section id="index-by-category"><section id="meta-peps">'
+        f'<table><tbody>{tbody}</tbody></table></section></section>'
+        '<section id="numerical-index">'
+        f'<table><tbody>{tbody}</tbody></table></section>'
+        '</body></html>'
+    )
+
+    versions = [f'3.{minor}' for minor in range(articles, 0, -1)]
+    items = ''.join(
+        f'<li class="toctree-l1"><a class="reference internal" '
+        f'href="{version}.html">What’s New In Python {version}</a></li>'
+        for version in versions
+    )
+    snapshot[MAIN_DOC_URL + 'whatsnew/'] = make_page(
+        '<html><body><section id="what-s-new-in-python">'
+        f'<div class="toctree-wrapper compound"><ul>{items}</ul></div>'
+        '</section></body></html>'
+    )
+    for version in versions:
+        snapshot[MAIN_DOC_URL + f'whatsnew/{version}.html'] = make_page(
+            whats_new_article(version, 'Editor')
+        )
+    snapshot[MAIN_DOC_URL] = make_page(DOC_INDEX)
+    snapshot[MAIN_DOC_URL + 'download.html'] = make_page(DOWNLOAD)
+    snapshot[MAIN_DOC_URL + ARCHIVE_PATH] = make_page(
+        bytes(archive_size), 'application/zip'
+    )
+    return snapshot
+
+
+def load_snapshot(path: Path) -> Snapshot:
+    with open(path, encoding='UTF-8') as file:
+        return json.load(file)
+
+
+def save_snapshot(snapshot: Snapshot, path: Path) -> None:
+    with open(path, 'w', encoding='UTF-8') as file:
+        json.dump(snapshot, file, ensure_ascii=False)
+
+
+class StandInServer:
+    """
+    HTTP-сервер, который отдает страницы снимка по адресам вида
+    http://127.0.0.1:<порт>/<хост>/<путь>. Перед каждым ответом
+    выдерживается задержка latency ± jitter секунд.
+    """
+
+    def __init__(
+        self,
+        snapshot: Snapshot,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        self.snapshot = snapshot
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}/'
+
+    def local_url(self, url: str) -> str:
+        """
+        Переводит адрес реального сайта в адрес на локальном сервере.
+
+        :param url: адрес на docs.python.org или peps.python.org
+        :return: адрес на локальном сервере
+        """
+        return self.base_url + url.split('://', 1)[1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.requests += 1
+            jitter = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency + jitter)
+
+    def start(self) -> 'StandInServer':
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _respond(self, with_body: bool) -> None:
+                time.sleep(stand_in._delay())
+                url = 'https://' + self.path.lstrip('/').split('?', 1)[0]
+                page = stand_in.snapshot.get(url)
+                if page is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = page_body(page)
+                self.send_response(page.get('status', 200))
+                for name, value in page.get('headers', {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                self._respond(with_body=True)
+
+            def do_HEAD(self) -> None:
+                self._respond(with_body=False)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
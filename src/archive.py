@@ -0,0 +1,198 @@
+import gzip
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.client import parse_headers
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+# requests и aiohttp отдают тело ответа уже распакованным, поэтому
+# заголовки о сжатии и длине исходного тела не переносятся
+# в сохраняемый ответ.
+SKIPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+WARC_VERSION = 'WARC/1.0'
+
+# Запись архива: код ответа, пояснение, заголовки и тело.
+Exchange = Tuple[int, str, List[Tuple[str, str]], bytes]
+
+
+class WarcWriter:
+    """
+    Запись ответов в архив WARC/1.0.
+    Каждый ответ сохраняется записью типа response, сжатой
+    отдельным членом gzip, поэтому архив можно дописывать
+    и читать стандартными инструментами WARC.
+    Ответ на каждый URL записывается один раз за запуск.
+    Методы потокобезопасны.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        :param path: путь к файлу .warc.gz
+        """
+        self.path = path
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def record(self, response: requests.Response) -> None:
+        """
+        Записывает ответ и ответы перенаправлений, которые к нему привели.
+
+        :param response: объект Response или CachedResponse
+        :return: None
+        """
+        for item in [*response.history, response]:
+            self.write(
+                item.url, item.status_code, item.reason or '',
+                item.headers.items(), item.content
+            )
+
+    def write(
+        self,
+        url: str,
+        status: int,
+        reason: str,
+        headers: Any,
+        body: bytes
+    ) -> None:
+        """
+        Записывает ответ на URL, если он еще не записан.
+
+        :param url: URL запроса
+        :param status: код ответа
+        :param reason: пояснение к коду ответа
+        :param headers: пары (заголовок, значение)
+        :param body: распакованное тело ответа
+        :return: None
+        """
+        with self._lock:
+            if url in self._seen:
+                return
+            self._seen.add(url)
+        lines = [f'HTTP/1.1 {status} {reason}']
+        lines.extend(
+            f'{name}: {value}' for name, value in headers
+            if name.lower() not in SKIPPED_HEADERS
+        )
+        lines.append(f'Content-Length: {len(body)}')
+        http = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+        warc_headers = '\r\n'.join([
+            WARC_VERSION,
+            'WARC-Type: response',
+            f'WARC-Target-URI: {url}',
+            'WARC-Date: '
+            + datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+            'Content-Type: application/http; msgtype=response',
+            f'Content-Length: {len(http)}',
+        ])
+        block = warc_headers.encode() + b'\r\n\r\n' + http + b'\r\n\r\n'
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as file:
+                file.write(gzip.compress(block))
+
+
+def read_warc(path: Path) -> Iterator[Tuple[str, Exchange]]:
+    """
+    Читает записи типа response из архива WARC.
+
+    :param path: путь к файлу .warc.gz или .warc
+    :return: итератор пар (URL, ответ)
+    """
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rb') as file:
+        while True:
+            line = file.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            warc_headers = parse_headers(file)
+            block = file.read(int(warc_headers['Content-Length']))
+            if warc_headers.get('WARC-Type') != 'response':
+                continue
+            yield warc_headers['WARC-Target-URI'], parse_http(block)
+
+
+def parse_http(block: bytes) -> Exchange:
+    """
+    Разбирает HTTP-ответ из блока записи WARC.
+
+    :param block: статусная строка, заголовки и тело ответа
+    :return: кортеж (код, пояснение, заголовки, тело)
+    """
+    stream = BytesIO(block)
+    status_line = stream.readline().decode('latin-1').rstrip('\r\n')
+    _, status, *reason = status_line.split(' ', 2)
+    headers = parse_headers(stream)
+    return int(status), ''.join(reason), list(headers.items()), stream.read()
+
+
+class WarcArchive:
+    """
+    Архив WARC, из которого парсер получает ответы вместо сети.
+    Ответы загружаются в память при первом обращении.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        :param path: путь к файлу .warc.gz
+        """
+        self.path = path
+        self._exchanges: Optional[Dict[str, Exchange]] = None
+        self._adapter = HTTPAdapter()
+
+    @property
+    def exchanges(self) -> Dict[str, Exchange]:
+        if self._exchanges is None:
+            self._exchanges = dict(read_warc(self.path))
+        return self._exchanges
+
+    def build_response(
+        self, request: requests.PreparedRequest
+    ) -> requests.Response:
+        """
+        Возвращает сохраненный в архиве ответ на запрос.
+        На HEAD-запрос возвращаются заголовки ответа на GET без тела.
+
+        :param request: подготовленный запрос
+        :return: объект Response
+        :raises requests.ConnectionError: если ответа на URL нет в архиве
+        """
+        exchange = self.exchanges.get(request.url)
+        if exchange is None:
+            raise requests.ConnectionError(
+                f'Ответа на {request.url} нет в архиве {self.path}',
+                request=request
+            )
+        status, reason, headers, body = exchange
+        raw = HTTPResponse(
+            body=BytesIO(b'' if request.method == 'HEAD' else body),
+            headers=headers,
+            status=status,
+            reason=reason,
+            preload_content=False,
+            request_url=request.url,
+        )
+        response = self._adapter.build_response(request, raw)
+        response.content
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Транспорт, отвечающий на запросы из архива WARC без сети."""
+
+    def __init__(self, archive: WarcArchive, **kwargs) -> None:
+        self.archive = archive
+        super().__init__(**kwargs)
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs
+    ) -> requests.Response:
+        return self.archive.build_response(request)
@@ -1,39 +1,58 @@
-from itertools import chain
-from typing import Dict, List, Tuple
+from __future__ import annotations
+
+from argparse import Namespace
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from collections import defaultdict
-import re
+import time
 import asyncio
-import aiohttp
 
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-from tqdm import tqdm
-import requests_cache
 import logging
 
 from configs import configure_argument_parser, configure_logging
+from frontier import CrawlFrontier
+from metrics import METRICS
+from main import ARCHIVE_PATTERN, MODE_TO_CACHE, VERSION_PATTERN,\
+    check_replay_modes, count_card_status, expand_modes, get_pep_frontier,\
+    get_shards_dir, mode_args
 from outputs import control_output
-from utils import async_get_response,\
-    find_tag, find_all_tags, get_soup
-from constants import BASE_DIR, DOWNLOAD_PATH, MAIN_DOC_URL, MAIN_PEP_URL,\
-    NAME_DIR_DOWNLOADS, PREFIX_PEP, SECTIONS_PEP,\
-    EXPECTED_STATUS, WHATS_NEW_PATH
-
-
-def whats_new(
-    session: requests_cache.CachedSession
+from parsers import configure_parser
+from pool import ParsePool
+from shards import save_shard
+from state import PepStateStore
+from utils import DOWNLOAD_STRAINER, VERSIONS_STRAINER,\
+    WHATS_NEW_INDEX_STRAINER, async_get_response, download_file,\
+    extract_pep_status_text, extract_whats_new_text, find_tag,\
+    find_all_tags, get_response, get_soup, progress
+from constants import BASE_DIR, DOWNLOAD_PATH, MAIN_DOC_URL,\
+    NAME_DIR_DOWNLOADS, MODE_ALL, WHATS_NEW_PATH
+
+# aiohttp и HTTP-стек сессии загружаются, только когда режим
+# действительно обращается к сети.
+if TYPE_CHECKING:
+    import requests_cache
+
+    from fetcher import AsyncFetcher
+    from session import ParserSession
+
+
+async def whats_new(
+    session: ParserSession
 ) -> List[Tuple[str, str, str]]:
     """
     Получает список новых возможностей Python с их заголовками
-    и ссылками на статьи.
+    и ссылками на статьи. Статьи загружаются параллельно,
+    порядок результатов совпадает с оглавлением.
 
     :param session: Сессия для отправки запросов.
-    :type session: requests_cache.CachedSession
+    :type session: ParserSession
     :return: Список кортежей вида
     (ссылка на статью, заголовок, редактор/автор).
     """
     whats_new_url = urljoin(MAIN_DOC_URL, WHATS_NEW_PATH)
-    soup = get_soup(session, whats_new_url)
+    soup = get_soup(
+        get_response(session, whats_new_url), WHATS_NEW_INDEX_STRAINER
+    )
     main_div = find_tag(soup, 'section', attrs={'id': 'what-s-new-in-python'})
     div_with_ul = find_tag(
         main_div, 'div', attrs={'class': 'toctree-wrapper'}
@@ -42,20 +61,43 @@ def whats_new(
         div_with_ul,
         'li', attrs={'class': 'toctree-l1'}
     )
+    links = [
+        urljoin(whats_new_url, find_tag(section, 'a')['href'])
+        for section in sections_by_python
+    ]
+    from fetcher import session_fetcher
+    with ParsePool.from_session(session) as pool:
+        async with session_fetcher(session) as fetcher:
+            articles = await asyncio.gather(
+                *(fetch_article(fetcher, pool, link) for link in links)
+            )
     results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-
-    for section in tqdm(sections_by_python):
-        version_a_tag = find_tag(section, 'a')
-        href = version_a_tag['href']
-        link = urljoin(whats_new_url, href)
-        soup = get_soup(session, link)
-        h1 = find_tag(soup, 'h1')
-        dl = find_tag(soup, 'dl')
-        dl_text = dl.text.replace('\n', ' ')
-        results.append((link, h1.text, dl_text))
+    results.extend(article for article in articles if article is not None)
     return results
 
 
+async def fetch_article(
+    fetcher: AsyncFetcher, pool: ParsePool, link: str
+) -> Optional[Tuple[str, str, str]]:
+    """
+    Загружает статью whatsnew и извлекает из нее заголовок
+    и редактора/автора; разбор выполняется в пуле процессов.
+
+    :param fetcher: Загрузчик страниц с ограничением параллелизма.
+    :param pool: Пул процессов для разбора страниц.
+    :param link: URL статьи.
+    :return: кортеж (ссылка, заголовок, редактор/автор)
+    или None, если статью не удалось загрузить.
+    """
+    response = await async_get_response(fetcher, link)
+    if response is None:
+        return None
+    h1_text, dl_text = await pool.extract(
+        extract_whats_new_text, response.text
+    )
+    return link, h1_text, dl_text
+
+
 def latest_versions(
     session: requests_cache.CachedSession
 ) -> List[Tuple[str, str, str]]:
@@ -67,23 +109,24 @@ def latest_versions(
     :type session: requests_cache.CachedSession
     :return: Список кортежей вида (ссылка на документацию, версия, статус).
     """
-    soup = get_soup(session, MAIN_DOC_URL)
+    soup = get_soup(
+        get_response(session, MAIN_DOC_URL), VERSIONS_STRAINER
+    )
     sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
     ul_tags = sidebar.find_all('ul')
 
-    for ul in tqdm(ul_tags):
+    for ul in progress(ul_tags):
         if 'All versions' in ul.text:
             a_tags = find_all_tags(ul, 'a')
             break
     else:
         raise Exception('Не найден список c версиями Python')
 
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
     results = [('Ссылка на документацию', 'Версия', 'Статус')]
 
-    for a_tag in tqdm(a_tags):
+    for a_tag in progress(a_tags):
         link = a_tag['href']
-        text_match = re.search(pattern, a_tag.text)
+        text_match = VERSION_PATTERN.search(a_tag.text)
         if text_match is not None:
             version, status = text_match.groups()
         else:
@@ -102,10 +145,12 @@ def download(session: requests_cache.CachedSession) -> None:
     :type session: requests_cache.CachedSession
     """
     downloads_url = urljoin(MAIN_DOC_URL, DOWNLOAD_PATH)
-    soup = get_soup(session, downloads_url)
+    soup = get_soup(
+        get_response(session, downloads_url), DOWNLOAD_STRAINER
+    )
     table = find_tag(soup, 'table')
     pdf_a4_tag = find_tag(
-        table, 'a', {'href': re.compile(r'.+pdf-a4\.zip$')}
+        table, 'a', {'href': ARCHIVE_PATTERN}
     )
     a4_link = pdf_a4_tag['href']
     archive_url = urljoin(downloads_url, a4_link)
@@ -115,96 +160,112 @@ def download(session: requests_cache.CachedSession) -> None:
     downloads_dir.mkdir(exist_ok=True)
     archive_path = downloads_dir / filename
 
-    response = session.get(archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(f'Архив был загружен и сохранён: {archive_path}')
+    if download_file(session, archive_url, archive_path):
+        logging.info(f'Архив был загружен и сохранён: {archive_path}')
+    else:
+        logging.info(f'Архив уже актуален: {archive_path}')
 
 
 async def pep(
-    session: requests_cache.CachedSession
+    session: ParserSession
 ) -> List[Tuple[str, int]]:
     """
     Получает статусы PEP документов и их количество.
+    Если у сессии задан шард, обрабатываются только карточки шарда,
+    а его счетчики вместе с отпечатком индекса PEP сохраняются
+    в директорию результатов шардов для режима merge.
 
     :param session: Сессия для отправки запросов.
-    :type session: requests_cache.CachedSession
+    :type session: ParserSession
     :return: Список кортежей, содержащих статусы
     и количество PEP документов с соответствующим статусом.
     """
-    status_links = []
-    soup = get_soup(session, MAIN_PEP_URL)
-    sections = find_all_tags(soup, 'section', {'id': SECTIONS_PEP})
-    tbodys = [find_tag(section, 'tbody') for section in sections]
-    tr_tags = chain.from_iterable(
-        find_all_tags(tbody, 'tr') for tbody in tbodys
-    )
-
-    for tr in tr_tags:
-        status = tr.find('td').text[1:]
-        status = EXPECTED_STATUS.get(status)
-        if status is None:
-            logging.info('Получен неизвестный статус')
-            continue
-        link = tr.find('a').text
-        status_links.append((status, PREFIX_PEP + link))
-
-    result_status = await get_count_status(status_links)
+    pep_frontier = get_pep_frontier(session)
+    shard = getattr(session, 'shard', None)
+    frontier = pep_frontier if shard is None else pep_frontier.shard(*shard)
+    result_status = await get_count_status(session, frontier)
+    if shard is not None:
+        path = save_shard(
+            get_shards_dir(session), shard, result_status,
+            pep_frontier.digest()
+        )
+        logging.info(f'Результаты шарда сохранены: {path}')
     return [item for item in result_status.items()]
 
 
 async def process_link(
-        session: aiohttp,
+        fetcher: AsyncFetcher,
+        pool: ParsePool,
+        pep_state: Optional[PepStateStore],
         result_status: Dict[str, int],
-        status: str, link: str
+        url: str,
+        rows: List[Tuple[str, Tuple[str, ...]]]
 ) -> None:
     """
-    Обрабатывает одну ссылку на страницу PEP и обновляет счетчики статусов.
-
-    :param session: Сессия aiohttp для выполнения запросов.
+    Обрабатывает одну карточку PEP и обновляет счетчики статусов
+    для всех строк индекса, которые на нее ссылаются.
+    Если строка индекса не изменилась с прошлого запуска,
+    статус карточки берется из хранилища состояния без загрузки.
+
+    :param fetcher: Загрузчик страниц с ограничением параллелизма.
+    :param pool: Пул процессов для разбора карточек.
+    :param pep_state: Хранилище состояния PEP или None.
     :param result_status: Словарь счетчиков статусов.
-    :param status: ожидаемый статусов.
-    :param link: Ссылка на страницу PEP.
+    :param url: URL карточки PEP.
+    :param rows: строки индекса (текст строки, ожидаемые статусы).
     :return: None.
     """
-    url = urljoin(MAIN_PEP_URL, link)
-    response = await async_get_response(session, url)
-    if response is None:
-        return
-    soup = BeautifulSoup(response, features='lxml')
-    new_status = find_tag(
-        soup, 'section', {'id': 'pep-content'}
-    ).find('abbr').text
-
-    if new_status not in status:
-        logging.info(
-            f'\nНесовпадающие статусы:\n'
-            f'{url}\nСтатус в карточке: {new_status}\n'
-            f'Ожидаемые статусы: {status}'
+    index_row = rows[0][0]
+    card_status = None
+    if pep_state is not None:
+        card_status = pep_state.lookup(url, index_row)
+    if card_status is None:
+        response = await async_get_response(fetcher, url)
+        if response is None:
+            logging.error(
+                f'Карточка {url} не загружена после повторов и не учтена '
+                f'в {len(rows)} строках индекса'
+            )
+            return
+        card_status = await pool.extract(
+            extract_pep_status_text, response.text
         )
-    result_status[new_status] += 1
+        if pep_state is not None:
+            pep_state.remember(url, index_row, card_status)
+    count_card_status(result_status, url, card_status, rows)
 
 
 async def get_count_status(
-    status_links: List[Tuple[str, str]]
+    session: ParserSession,
+    frontier: CrawlFrontier
 ) -> Dict[str, int]:
     """
-    Получает список ссылок на страницы PEP
-    и возвращает словарь счетчиков статусов.
-
-    :param status_links: Список кортежей (статус, ссылка на страницу PEP).
+    Загружает карточки PEP и возвращает словарь счетчиков статусов.
+    Страницы загружаются параллельно в пределах лимитов,
+    заданных в настройках сессии, каждая карточка — один раз.
+    Подсчет ведется по строкам индекса, как в main.get_count_status.
+    Карточки разбираются в пуле процессов, если он задан в сессии.
+
+    :param session: Сессия парсера с настройками загрузки.
+    :param frontier: уникальные URL карточек PEP со строками
+    индекса (текст строки, ожидаемые статусы).
     :return: Словарь счетчиков статусов.
     """
     result_status = defaultdict(int)
 
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for status, link in status_links:
-            task = process_link(session, result_status, status, link)
-            tasks.append(task)
-
-        await asyncio.gather(*tasks)
-
+    from fetcher import session_fetcher
+    with ParsePool.from_session(session) as pool:
+        async with session_fetcher(session) as fetcher:
+            await asyncio.gather(*(
+                process_link(
+                    fetcher, pool, session.pep_state, result_status,
+                    url, frontier.rows(url)
+                )
+                for url in frontier
+            ))
+
+    if session.pep_state is not None:
+        session.pep_state.save()
     result_status['Total'] = sum(result_status.values())
     return result_status
 
@@ -217,10 +278,70 @@ MODE_TO_FUNCTION = {
 }
 
 
+async def run_mode(
+    session: ParserSession, mode: str, cli_args: Namespace
+) -> None:
+    """
+    Выполняет режим и выводит его результаты в заданном формате.
+    Синхронные режимы и вывод выполняются в потоке, чтобы не
+    останавливать цикл событий для других режимов.
+    Ошибка режима записывается в лог и не прерывает другие режимы.
+
+    :param session: Сессия парсера.
+    :param mode: режим работы
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    mode_function = {**MODE_TO_FUNCTION, **MODE_TO_CACHE}[mode]
+    METRICS.mode = mode
+    started = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(mode_function):
+            results = await mode_function(session)
+        else:
+            results = await asyncio.to_thread(mode_function, session)
+        if results is not None:
+            await asyncio.to_thread(
+                control_output, results, mode_args(cli_args, mode)
+            )
+    except Exception as e:
+        logging.error(str(e))
+    METRICS.set(
+        'run_duration_seconds', time.perf_counter() - started, mode=mode
+    )
+
+
+async def run_modes(
+    session: ParserSession, modes: List[str], cli_args: Namespace
+) -> None:
+    """
+    Выполняет режимы одновременно в одном цикле событий.
+    Режимы делят HTTP-кеш сессии, а при запуске нескольких режимов —
+    и один асинхронный загрузчик с его пулом соединений и лимитами.
+
+    :param session: Сессия парсера.
+    :param modes: режимы работы
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    if len(modes) == 1:
+        await run_mode(session, modes[0], cli_args)
+        return
+    from fetcher import AsyncFetcher
+    async with AsyncFetcher.from_session(session) as fetcher:
+        session.fetcher = fetcher
+        try:
+            await asyncio.gather(
+                *(run_mode(session, mode, cli_args) for mode in modes)
+            )
+        finally:
+            session.fetcher = None
+
+
 def main() -> None:
     """
     Основная функция парсера PEP документов.
-    Парсит PEP документы в зависимости от выбранного режима
+    Парсит PEP документы в выбранных режимах
     и выводит результаты в заданном формате.
 
     :return: None
@@ -228,27 +349,25 @@ def main() -> None:
     configure_logging()
     logging.info('Парсер запущен!')
 
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser(
+        [*MODE_TO_FUNCTION, *MODE_TO_CACHE, MODE_ALL]
+    )
     args = arg_parser.parse_args()
+    check_replay_modes(arg_parser, args)
     logging.info(f'Аргументы командной строки: {args}')
+    configure_parser(args.parser)
 
-    session = requests_cache.CachedSession()
+    from session import create_session
+    session = create_session(args)
 
     if args.clear_cache:
         session.cache.clear()
+        if session.extract_memo is not None:
+            session.extract_memo.clear()
 
-    parser_mode = args.mode
-    try:
-        if parser_mode == 'pep':
-            results = asyncio.run(MODE_TO_FUNCTION[parser_mode](session))
-        else:
-            results = MODE_TO_FUNCTION[parser_mode](session)
-    except Exception as e:
-        logging.error(str(e), e)
-        results = None
-
-    if results is not None:
-        control_output(results, args)
+    asyncio.run(run_modes(session, expand_modes(args.mode), args))
+    if args.stats:
+        METRICS.report(args.stats_file)
     logging.info('Парсер завершил работу.')
 
 
@@ -0,0 +1,205 @@
+import logging
+import sqlite3
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from requests_cache.backends.sqlite import SQLiteCache, SQLiteDict
+from requests_cache.serializers import SerializerPipeline, Stage,\
+    pickle_serializer
+
+from constants import CACHE_COMPRESS_LEVEL, CACHE_TOUCH_BATCH
+
+# Сжатые zlib данные начинаются с байта 0x78, а данные pickle — с 0x80,
+# поэтому записи, сохраненные до включения сжатия, читаются как есть.
+ZLIB_HEADER = b'\x78'
+
+
+def compress(data: bytes) -> bytes:
+    return zlib.compress(data, CACHE_COMPRESS_LEVEL)
+
+
+def decompress(data: bytes) -> bytes:
+    if data[:1] == ZLIB_HEADER:
+        return zlib.decompress(data)
+    return data
+
+
+compressed_serializer = SerializerPipeline(
+    [*pickle_serializer.stages, Stage(dumps=compress, loads=decompress)],
+    name='pickle_zlib',
+    is_binary=True,
+)
+
+
+class LRUSQLiteDict(SQLiteDict):
+    """
+    Таблица ответов SQLite с вытеснением давно не использованных записей.
+    Для каждой записи хранятся размер сжатого значения и время
+    последнего обращения. Если суммарный размер записей превышает
+    max_size байт, при сохранении ответа удаляются записи,
+    к которым дольше всего не обращались.
+    Время обращения накапливается в памяти и записывается пачками,
+    чтобы чтение из кеша не требовало отдельной транзакции.
+    """
+
+    def __init__(
+        self, *args, max_size: Optional[int] = None, **kwargs
+    ) -> None:
+        """
+        :param max_size: наибольший размер записей в байтах
+        или None, если размер не ограничен
+        """
+        self.max_size = max_size
+        self._touched: Dict[str, float] = {}
+        super().__init__(*args, **kwargs)
+
+    def init_db(self) -> None:
+        super().init_db()
+        with self.connection(commit=True) as connection:
+            for column in ('size INTEGER', 'accessed REAL'):
+                try:
+                    connection.execute(
+                        f'ALTER TABLE {self.table_name} ADD COLUMN {column}'
+                    )
+                except sqlite3.OperationalError:
+                    pass
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS accessed_idx '
+                f'ON {self.table_name}(accessed)'
+            )
+
+    def __getitem__(self, key: str):
+        value = super().__getitem__(key)
+        with self._lock:
+            self._touched[key] = time.time()
+            flush = len(self._touched) >= CACHE_TOUCH_BATCH
+        if flush:
+            self.flush_touched()
+        return value
+
+    def __setitem__(self, key: str, value) -> None:
+        expires = getattr(value, 'expires_unix', None)
+        value = self.serialize(value)
+        with self.connection(commit=True) as connection:
+            connection.execute(
+                f'INSERT OR REPLACE INTO {self.table_name} '
+                '(key, value, expires, size, accessed) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, value, expires, len(value), time.time()),
+            )
+        if self.max_size is not None \
+                and self.total_size() > self.max_size:
+            self.evict(self.max_size)
+
+    def flush_touched(self) -> None:
+        """
+        Записывает накопленное время обращения к записям.
+
+        :return: None
+        """
+        with self._lock:
+            touched = list(self._touched.items())
+            self._touched.clear()
+        if not touched:
+            return
+        with self.connection(commit=True) as connection:
+            connection.executemany(
+                f'UPDATE {self.table_name} SET accessed = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in touched],
+            )
+
+    def total_size(self) -> int:
+        """
+        Возвращает суммарный размер записей в байтах.
+
+        :return: размер сжатых значений в байтах
+        """
+        with self.connection() as connection:
+            return connection.execute(
+                f'SELECT COALESCE(SUM(COALESCE(size, LENGTH(value))), 0) '
+                f'FROM {self.table_name}'
+            ).fetchone()[0]
+
+    def evict(self, max_size: int) -> Tuple[int, int]:
+        """
+        Удаляет давно не использованные записи,
+        пока их суммарный размер больше max_size.
+        Записи без времени обращения удаляются первыми.
+
+        :param max_size: наибольший размер записей в байтах
+        :return: кортеж (число удаленных записей, освобождено байт)
+        """
+        self.flush_touched()
+        excess = self.total_size() - max_size
+        if excess <= 0:
+            return 0, 0
+        keys = []
+        freed = 0
+        with self.connection() as connection:
+            rows = connection.execute(
+                f'SELECT key, COALESCE(size, LENGTH(value)) '
+                f'FROM {self.table_name} ORDER BY accessed ASC'
+            ).fetchall()
+        for key, size in rows:
+            if freed >= excess:
+                break
+            keys.append(key)
+            freed += size
+        self.bulk_delete(keys)
+        logging.debug(
+            f'Из кеша вытеснено {len(keys)} записей, {freed} байт'
+        )
+        return len(keys), freed
+
+    def close(self) -> None:
+        if self._connection is not None and self._touched:
+            self.flush_touched()
+        super().close()
+
+
+class ParserCache(SQLiteCache):
+    """
+    SQLite-кеш парсера: тела ответов хранятся сжатыми zlib,
+    а таблица ответов ограничена max_size байт
+    с вытеснением давно не использованных записей.
+    Записи о перенаправлениях на вытесненные ответы
+    удаляются при очистке кеша методом prune.
+    """
+
+    def __init__(
+        self, db_path: str, max_size: Optional[int] = None, **kwargs
+    ) -> None:
+        """
+        :param db_path: путь к базе SQLite
+        :param max_size: наибольший размер ответов в байтах
+        или None, если размер не ограничен
+        """
+        super().__init__(db_path, **kwargs)
+        self.responses = LRUSQLiteDict(
+            db_path,
+            table_name='responses',
+            serializer=compressed_serializer,
+            max_size=max_size,
+            **kwargs
+        )
+
+    def prune(self) -> Tuple[int, int]:
+        """
+        Удаляет устаревшие ответы и вытесняет давно не использованные,
+        пока размер кеша больше max_size, затем сжимает файл базы.
+
+        :return: кортеж (число удаленных записей, освобождено байт)
+        """
+        self.responses.flush_touched()
+        count = self.responses.count()
+        size = self.responses.total_size()
+        self.delete(expired=True)
+        if self.responses.max_size is not None:
+            self.responses.evict(self.responses.max_size)
+        self._prune_redirects()
+        self.responses.vacuum()
+        return (
+            count - self.responses.count(),
+            size - self.responses.total_size(),
+        )
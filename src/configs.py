@@ -1,41 +1,334 @@
 import argparse
-from typing import List
+from pathlib import Path
+from typing import List, Tuple
 import logging
 from logging.handlers import RotatingFileHandler
 
 from constants import BASE_DIR, NAME_DIR_LOGS, NAME_FILE_LOGS,\
-    OUTPUT_FILE, OUTPUT_TABLE, LOG_FORMAT, DT_FORMAT
+    OUTPUT_FILE, OUTPUT_TABLE, LOG_FORMAT, DT_FORMAT, CONCURRENCY,\
+    PER_HOST_CONCURRENCY, POOL_SIZE, REQUEST_TIMEOUT, DEFAULT_PARSER,\
+    PARSER_BS4, PARSER_LXML, PARSER_SELECTOLAX, OUTPUT_JSONL, OUTPUT_SQLITE,\
+    OUTPUT_PARQUET, RETRY_ATTEMPTS, RATE_BURST, CONNECT_TIMEOUT,\
+    PARSE_WORKERS, CACHE_MAX_SIZE_MB, SERVE_HOST, SERVE_PORT,\
+    SERVE_REFRESH_INTERVAL, NAME_DIR_METRICS, NAME_FILE_METRICS, HOST_POOLS
 
 
-def configure_argument_parser(
-    available_modes: List[str]
-) -> argparse.ArgumentParser:
+def positive_int(value: str) -> int:
     """
-    Создает парсер аргументов командной строки для работы парсера.
-    Парсер принимает режимы работы, флаг для очистки кеша
-    и дополнительные способы вывода данных.
+    Преобразует аргумент командной строки в целое положительное число.
+
+    :param value: строковое значение аргумента
+    :return: целое число больше нуля
+    :raises argparse.ArgumentTypeError: если значение не подходит
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value} не является целым числом')
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f'{value} должно быть больше нуля')
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    """
+    Преобразует аргумент командной строки в целое неотрицательное число.
+
+    :param value: строковое значение аргумента
+    :return: целое число не меньше нуля
+    :raises argparse.ArgumentTypeError: если значение не подходит
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value} не является целым числом')
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'{value} не может быть меньше нуля')
+    return number
+
+
+def positive_float(value: str) -> float:
+    """
+    Преобразует аргумент командной строки в положительное число.
 
+    :param value: строковое значение аргумента
+    :return: число больше нуля
+    :raises argparse.ArgumentTypeError: если значение не подходит
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value} не является числом')
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f'{value} должно быть больше нуля')
+    return number
+
+
+def shard_spec(value: str) -> Tuple[int, int]:
+    """
+    Преобразует аргумент командной строки вида I/N в номер шарда
+    и число шардов.
+
+    :param value: строковое значение аргумента
+    :return: кортеж (номер шарда от 1 до N, число шардов N)
+    :raises argparse.ArgumentTypeError: если значение не подходит
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'{value} должно иметь вид I/N, например 1/4'
+        )
+    if count <= 0:
+        raise argparse.ArgumentTypeError(
+            f'Число шардов в {value} должно быть больше нуля'
+        )
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            f'Номер шарда в {value} должен быть от 1 до {count}'
+        )
+    return index, count
+
+
+def add_mode_argument(
+    parser: argparse.ArgumentParser, available_modes: List[str]
+) -> None:
+    """
+    Добавляет в парсер аргументов один или несколько режимов работы.
+
+    :param parser: объект ArgumentParser
     :param available_modes: список доступных режимов работы
-    :return: объект ArgumentParser
+    :return: None
     """
-    parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
+
+
+def add_session_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Добавляет в парсер аргументов настройки сессии: кеша,
+    сетевого слоя, HTML-парсера, состояния PEP и архива WARC.
+    Их принимают и запуск из командной строки, и сервис.
+
+    :param parser: объект ArgumentParser
+    :return: None
+    """
     parser.add_argument(
             '-c',
             '--clear-cache',
             action='store_true',
             help='Очистка кеша'
         )
+    parser.add_argument(
+        '--cache-size',
+        type=positive_int,
+        default=CACHE_MAX_SIZE_MB,
+        help='Наибольший размер HTTP-кеша в мегабайтах; давно не '
+             'использованные ответы вытесняются'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=positive_int,
+        default=CONCURRENCY,
+        help='Максимальное число одновременных запросов'
+    )
+    parser.add_argument(
+        '--per-host',
+        type=positive_int,
+        default=PER_HOST_CONCURRENCY,
+        help='Максимальное число одновременных запросов к одному хосту'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        default=POOL_SIZE,
+        help='Размер пула соединений'
+    )
+    parser.add_argument(
+        '--pool-connections',
+        type=positive_int,
+        default=HOST_POOLS,
+        help='Число хостов, для которых хранятся пулы соединений'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=positive_float,
+        default=REQUEST_TIMEOUT,
+        help='Таймаут одного запроса в секундах'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=positive_float,
+        default=CONNECT_TIMEOUT,
+        help='Таймаут установки соединения в секундах'
+    )
+    parser.add_argument(
+        '--no-keep-alive',
+        action='store_true',
+        help='Закрывать соединение после каждого запроса'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=RETRY_ATTEMPTS,
+        help='Число повторов запроса при ошибках 5xx, 429 и таймаутах'
+    )
+    parser.add_argument(
+        '--rate',
+        type=positive_float,
+        help='Максимальное число запросов в секунду к одному хосту'
+    )
+    parser.add_argument(
+        '--burst',
+        type=positive_int,
+        default=RATE_BURST,
+        help='Число запросов к хосту, которые можно отправить без ожидания'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=(PARSER_BS4, PARSER_LXML, PARSER_SELECTOLAX),
+        default=DEFAULT_PARSER,
+        help='HTML-парсер для разбора страниц'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=non_negative_int,
+        default=PARSE_WORKERS,
+        help='Число процессов для разбора страниц в async_main.py; '
+             '0 — разбирать страницы в цикле событий'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Загрузить все карточки PEP без учета сохраненного состояния'
+    )
+    parser.add_argument(
+        '--no-memo',
+        action='store_true',
+        help='Разбирать страницы без кеша извлеченных значений'
+    )
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument(
+        '--record',
+        type=Path,
+        metavar='WARC',
+        help='Записать полученные ответы в архив WARC'
+    )
+    archive.add_argument(
+        '--replay',
+        type=Path,
+        metavar='WARC',
+        help='Отвечать на запросы из архива WARC без сети'
+    )
+
+
+def configure_argument_parser(
+    available_modes: List[str]
+) -> argparse.ArgumentParser:
+    """
+    Создает парсер аргументов командной строки для работы парсера.
+    Парсер принимает один или несколько режимов работы, флаг
+    для очистки кеша и дополнительные способы вывода данных.
+
+    :param available_modes: список доступных режимов работы
+    :return: объект ArgumentParser
+    """
+    parser = argparse.ArgumentParser(description='Парсер документации Python')
+    add_mode_argument(parser, available_modes)
+    add_session_arguments(parser)
     parser.add_argument(
         '-o',
         '--output',
-        choices=(OUTPUT_TABLE, OUTPUT_FILE),
+        choices=(
+            OUTPUT_TABLE, OUTPUT_FILE, OUTPUT_JSONL, OUTPUT_SQLITE,
+            OUTPUT_PARQUET
+        ),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '--shard',
+        type=shard_spec,
+        metavar='I/N',
+        help='Обработать только шард I из N карточек PEP и сохранить '
+             'его счетчики для режима merge'
+    )
+    parser.add_argument(
+        '--shards-dir',
+        type=Path,
+        metavar='DIR',
+        help='Директория результатов шардов для --shard и режима merge; '
+             'по умолчанию src/shards'
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Вывести статистику запуска и сохранить метрики Prometheus'
+    )
+    parser.add_argument(
+        '--stats-file',
+        type=Path,
+        default=BASE_DIR / NAME_DIR_METRICS / NAME_FILE_METRICS,
+        metavar='PATH',
+        help='Файл метрик Prometheus для --stats, например в директории '
+             'textfile collector node exporter'
+    )
+    return parser
+
+
+def configure_serve_argument_parser(
+    available_modes: List[str]
+) -> argparse.ArgumentParser:
+    """
+    Создает парсер аргументов командной строки для сервиса.
+    Сервис принимает режимы, настройки сессии и настройки HTTP-сервиса;
+    способ вывода, статистика запуска и шарды к сервису не относятся:
+    результаты отдаются по HTTP, а каждое обновление обходит все
+    карточки PEP.
+
+    :param available_modes: список доступных режимов работы
+    :return: объект ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description='Сервис парсера документации Python'
+    )
+    add_mode_argument(parser, available_modes)
+    add_session_arguments(parser)
+    configure_serve_arguments(parser)
+    parser.set_defaults(shard=None, shards_dir=None)
+    return parser
+
+
+def configure_serve_arguments(
+    parser: argparse.ArgumentParser
+) -> argparse.ArgumentParser:
+    """
+    Добавляет в парсер аргументов настройки HTTP-сервиса:
+    адрес, порт и период обновления результатов.
+
+    :param parser: объект ArgumentParser
+    :return: тот же объект ArgumentParser
+    """
+    parser.add_argument(
+        '--host',
+        default=SERVE_HOST,
+        help='Адрес, на котором сервис принимает запросы'
+    )
+    parser.add_argument(
+        '--port',
+        type=non_negative_int,
+        default=SERVE_PORT,
+        help='Порт сервиса; 0 — любой свободный'
+    )
+    parser.add_argument(
+        '--refresh',
+        type=positive_float,
+        default=SERVE_REFRESH_INTERVAL,
+        help='Период обновления результатов в секундах'
+    )
     return parser
 
 
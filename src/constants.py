@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pathlib import Path
 
 
@@ -14,6 +15,12 @@ NAME_DIR_DOWNLOADS = 'downloads'
 NAME_DIR_LOGS = 'logs'
 NAME_FILE_LOGS = 'parser.log'
 NAME_DIR_RESULTS = 'results'
+NAME_DIR_STATE = 'state'
+NAME_FILE_PEP_STATE = 'pep_state.json'
+NAME_FILE_EXTRACT_MEMO = 'extract_memo.db'
+NAME_DIR_METRICS = 'stats'
+NAME_FILE_METRICS = 'bs4_parser.prom'
+NAME_DIR_SHARDS = 'shards'
 
 
 # FormatConstants:
@@ -31,6 +38,22 @@ SECTIONS = [
 PREFIX = 'pep-'
 
 
+# CacheConstants:
+CACHE_NAME = 'http_cache'
+CACHE_MAX_SIZE_MB = 200
+CACHE_COMPRESS_LEVEL = 6
+CACHE_TOUCH_BATCH = 100
+# Шаблоны сопоставляются с началом URL без протокола в порядке объявления,
+# поэтому более частные шаблоны должны идти первыми.
+EXPIRE_AFTER = timedelta(hours=1)
+URLS_EXPIRE_AFTER = {
+    MAIN_PEP_URL + PREFIX: timedelta(days=7),
+    MAIN_DOC_URL + WHATS_NEW_PATH + '[0-9]': timedelta(days=30),
+    MAIN_PEP_URL: timedelta(hours=1),
+    MAIN_DOC_URL: timedelta(hours=1),
+}
+
+
 # StatusConstants:
 EXPECTED_STATUS = {
     'A': ['Active', 'Accepted'],
@@ -44,6 +67,66 @@ EXPECTED_STATUS = {
 }
 
 
+# DownloadConstants:
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = '.part'
+
+
+# FetchConstants:
+CONCURRENCY = 20
+PER_HOST_CONCURRENCY = 10
+POOL_SIZE = 20
+REQUEST_TIMEOUT = 30
+CONNECT_TIMEOUT = 5
+HOST_POOLS = 10
+
+
+# ParserConstants:
+PARSER_BS4 = 'bs4'
+PARSER_LXML = 'lxml'
+PARSER_SELECTOLAX = 'selectolax'
+DEFAULT_PARSER = PARSER_BS4
+PARSE_WORKERS = 0
+
+# ModeConstants:
+MODE_ALL = 'all'
+
+
 # ConfigOutputConstants:
 OUTPUT_FILE = 'file'
 OUTPUT_TABLE = 'pretty'
+OUTPUT_FLUSH_ROWS = 100
+OUTPUT_JSONL = 'jsonl'
+OUTPUT_SQLITE = 'sqlite'
+OUTPUT_PARQUET = 'parquet'
+NAME_FILE_RESULTS_DB = 'results.db'
+
+
+# MetricsConstants:
+METRICS_PREFIX = 'bs4_parser'
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+
+# RetryConstants:
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+
+# RateLimitConstants:
+RATE_BURST = 5
+
+
+# MemoConstants:
+EXTRACTOR_VERSION = 2
+
+
+# ServeConstants:
+SERVE_HOST = '127.0.0.1'
+SERVE_PORT = 8000
+SERVE_REFRESH_INTERVAL = 3600
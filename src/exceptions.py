@@ -1,3 +1,6 @@
+from requests import RequestException
+
+
 class ParserFindTagException(Exception):
     """Вызывается, когда парсер не может найти тег."""
     pass
@@ -10,3 +13,23 @@ class NotFoundVersionList(Exception):
 
 class EmptyResponseExeption(Exception):
     """Вызывается когда в BeautifulSoup передается пустой респонс"""
+
+
+class DownloadIntegrityException(Exception):
+    """Вызывается, когда размер загруженного файла не совпал с ожидаемым"""
+
+
+class ParserBackendException(Exception):
+    """Вызывается, когда выбранный HTML-парсер недоступен"""
+
+
+class OutputFormatException(Exception):
+    """Вызывается, когда выбранный формат вывода недоступен"""
+
+
+class ShardMergeException(Exception):
+    """Вызывается, когда результаты шардов pep нельзя объединить"""
+
+
+class CircuitOpenException(RequestException):
+    """Вызывается, когда хост недоступен и запросы к нему не отправляются"""
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from io import BytesIO
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from requests_cache.policy import CacheActions
+from urllib3 import HTTPResponse
+
+from archive import SKIPPED_HEADERS, WarcArchive, WarcWriter
+from constants import CONCURRENCY, CONNECT_TIMEOUT, PER_HOST_CONCURRENCY,\
+    POOL_SIZE, REQUEST_TIMEOUT
+from limiter import HostRateLimiter
+from metrics import METRICS
+from retry import CircuitBreaker, RetryPolicy
+
+
+class AsyncFetcher:
+    """
+    Асинхронный загрузчик страниц.
+    Ограничивает общее число одновременных запросов и число запросов
+    к одному хосту, а также размер пула соединений aiohttp.
+    Если передана кеширующая сессия, читает и пишет ответы в её кеш
+    по тем же ключам и правилам, что и синхронные запросы.
+    Ошибки соединения, таймауты и ответы 5xx/429 повторяются
+    по политике RetryPolicy; запросы к хостам с разомкнутым
+    CircuitBreaker сразу завершаются CircuitOpenException.
+    Если задан ограничитель частоты, каждая попытка запроса
+    к хосту ждет токен; ответы из кеша токены не расходуют.
+    Если задан recorder, полученные ответы записываются в архив WARC,
+    а если задан archive, ответы берутся из архива без сети и кеша.
+    Используется как асинхронный контекстный менеджер.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CONCURRENCY,
+        per_host: int = PER_HOST_CONCURRENCY,
+        pool_size: int = POOL_SIZE,
+        timeout: float = REQUEST_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        keep_alive: bool = True,
+        cache_session: Optional[requests_cache.CachedSession] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        recorder: Optional[WarcWriter] = None,
+        archive: Optional[WarcArchive] = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.keep_alive = keep_alive
+        self.cache_session = cache_session
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker
+        self.rate_limiter = rate_limiter
+        self.recorder = recorder
+        self.archive = archive
+        self._adapter = HTTPAdapter()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_session(cls, session) -> 'AsyncFetcher':
+        """
+        Создает загрузчик с настройками сессии парсера.
+
+        :param session: объект ParserSession
+        :return: объект AsyncFetcher
+        """
+        return cls(
+            concurrency=session.concurrency,
+            per_host=session.per_host,
+            pool_size=session.pool_size,
+            timeout=session.timeout,
+            connect_timeout=session.connect_timeout,
+            keep_alive=session.keep_alive,
+            cache_session=session,
+            retry_policy=session.retry_policy,
+            breaker=session.breaker,
+            rate_limiter=session.rate_limiter,
+            recorder=session.recorder,
+            archive=session.archive,
+        )
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.per_host,
+            force_close=not self.keep_alive,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=self.timeout, sock_connect=self.connect_timeout
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._session.close()
+        self._session = None
+
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._host_semaphores[host]
+
+    async def get(self, url: str) -> requests_cache.AnyResponse:
+        """
+        Возвращает ответ из кеша сессии или загружает страницу,
+        соблюдая общий лимит и лимит на хост.
+        Загруженный ответ сохраняется в кеш, если это позволяют
+        настройки кеша и заголовки ответа.
+
+        :param url: URL страницы
+        :return: объект Response или CachedResponse
+        :raises aiohttp.ClientError: при ошибке запроса или статусе >= 400
+        :raises asyncio.TimeoutError: если истек таймаут запроса
+        :raises CircuitOpenException: если хост недоступен
+        :raises requests.ConnectionError: если ответа нет в архиве
+        """
+        if self.archive is not None:
+            return self.archive.build_response(
+                requests.Request('GET', url).prepare()
+            )
+        response = await self._get(url)
+        if self.recorder is not None:
+            self.recorder.record(response)
+        return response
+
+    async def _get(self, url: str) -> requests_cache.AnyResponse:
+        if self.cache_session is None:
+            request = requests.Request('GET', url).prepare()
+            return await self._send(request)
+
+        cache = self.cache_session.cache
+        request = self.cache_session.prepare_request(
+            requests.Request('GET', url)
+        )
+        key_kwargs = self.cache_session.merge_environment_settings(
+            url, {}, None, None, None
+        )
+        actions = CacheActions.from_request(
+            cache.create_key(request, **key_kwargs),
+            request,
+            self.cache_session.settings
+        )
+        cached_response = None
+        if not actions.skip_read:
+            cached_response = cache.get_response(actions.cache_key)
+        actions.update_from_cached_response(
+            cached_response, cache.create_key, **key_kwargs
+        )
+        if not (actions.send_request or actions.resend_request):
+            return cached_response
+
+        response = await self._send(actions.update_request(request))
+        actions.update_from_response(response)
+        if not actions.skip_write:
+            cache.save_response(response, actions.cache_key, actions.expires)
+        elif cached_response is not None and response.status_code == 304:
+            cached_response = actions.update_revalidated_response(
+                response, cached_response
+            )
+            cache.save_response(
+                cached_response, actions.cache_key, actions.expires
+            )
+            return cached_response
+        return response
+
+    async def _send(
+        self, request: requests.PreparedRequest
+    ) -> requests.Response:
+        host = urlparse(request.url).netloc
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_request(host)
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve(host))
+            try:
+                response, body = await self._request(request)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self._record(host, success=False)
+                if not self.retry_policy.should_retry(attempt):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                self._record(host, success=response.status < 500)
+                if not self.retry_policy.should_retry(
+                    attempt, response.status
+                ):
+                    response.raise_for_status()
+                    return self._build_response(request, response, body)
+                delay = self.retry_policy.delay(
+                    attempt, response.headers.get('Retry-After')
+                )
+            METRICS.inc('retries_total')
+            logging.warning(
+                f'Повтор запроса {request.url} через {delay:.2f} с'
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request(
+        self, request: requests.PreparedRequest
+    ) -> Tuple[aiohttp.ClientResponse, bytes]:
+        async with self._semaphore, self._get_host_semaphore(request.url):
+            async with self._session.get(
+                request.url, headers=dict(request.headers)
+            ) as response:
+                return response, await response.read()
+
+    def _record(self, host: str, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success(host)
+        else:
+            self.breaker.record_failure(host)
+
+    def _build_response(
+        self,
+        request: requests.PreparedRequest,
+        response: aiohttp.ClientResponse,
+        body: bytes
+    ) -> requests.Response:
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in SKIPPED_HEADERS
+        }
+        raw = HTTPResponse(
+            body=BytesIO(body),
+            headers=headers,
+            status=response.status,
+            reason=response.reason,
+            preload_content=False,
+            request_url=request.url,
+        )
+        built = self._adapter.build_response(request, raw)
+        built.content
+        return built
+
+
+@asynccontextmanager
+async def session_fetcher(session) -> AsyncIterator[AsyncFetcher]:
+    """
+    Отдает загрузчик, открытый для сессии парсера на время запуска
+    нескольких режимов, а если его нет — открывает новый
+    с настройками сессии.
+
+    :param session: объект ParserSession
+    :return: объект AsyncFetcher
+    """
+    fetcher = getattr(session, 'fetcher', None)
+    if fetcher is not None:
+        yield fetcher
+        return
+    async with AsyncFetcher.from_session(session) as fetcher:
+        yield fetcher
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Iterator, List
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """
+    Приводит URL к каноническому виду для дедупликации:
+    схема и хост в нижнем регистре, без фрагмента
+    и без завершающего слеша в пути.
+
+    :param url: исходный URL
+    :return: нормализованный URL
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''
+    ))
+
+
+class CrawlFrontier:
+    """
+    Очередь уникальных URL для обхода.
+    Одна страница может встречаться в нескольких строках индекса,
+    поэтому к каждому URL привязаны все его строки: страница
+    загружается один раз, а результат раздается всем строкам.
+    URL возвращаются в порядке первого появления.
+    """
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, List[Any]] = {}
+        self._urls: Dict[str, str] = {}
+
+    def add(self, url: str, row: Any) -> None:
+        """
+        Добавляет строку индекса, ссылающуюся на url.
+
+        :param url: URL страницы
+        :param row: данные строки индекса
+        :return: None
+        """
+        key = normalize_url(url)
+        if key not in self._rows:
+            self._rows[key] = []
+            self._urls[key] = url
+        self._rows[key].append(row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._urls.values())
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self, url: str) -> List[Any]:
+        """
+        Возвращает все строки индекса, ссылающиеся на url.
+
+        :param url: URL страницы
+        :return: список строк индекса
+        """
+        return self._rows[normalize_url(url)]
+
+    @property
+    def rows_count(self) -> int:
+        return sum(len(rows) for rows in self._rows.values())
+
+    def shard(self, index: int, count: int) -> 'CrawlFrontier':
+        """
+        Возвращает часть очереди для шарда index из count.
+        URL распределяются по CRC32 нормализованного URL, поэтому
+        разбиение одинаково в любом процессе и на любой машине,
+        а каждый URL со всеми его строками попадает ровно в один шард.
+
+        :param index: номер шарда, от 1 до count
+        :param count: число шардов
+        :return: CrawlFrontier с URL шарда
+        """
+        shard = CrawlFrontier()
+        for key, url in self._urls.items():
+            if zlib.crc32(key.encode()) % count == index - 1:
+                shard._urls[key] = url
+                shard._rows[key] = self._rows[key]
+        return shard
+
+    def digest(self) -> str:
+        """
+        Возвращает отпечаток очереди: SHA-256 от всех URL и их строк.
+        Шарды, построенные по одному снимку индекса, получают
+        одинаковый отпечаток полной очереди, поэтому по нему
+        проверяется, что результаты шардов можно объединять.
+
+        :return: шестнадцатеричная строка SHA-256
+        """
+        data = json.dumps(
+            sorted(self._rows.items()), ensure_ascii=False
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
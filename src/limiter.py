@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import Dict
+
+from constants import RATE_BURST
+
+
+class TokenBucket:
+    """
+    Корзина токенов: пополняется со скоростью rate токенов в секунду
+    и вмещает не больше burst токенов. Токен резервируется сразу,
+    даже если корзина пуста, а вызывающий код ждет возвращенное время,
+    поэтому одна корзина подходит и для потоков, и для корутин.
+    """
+
+    def __init__(self, rate: float, burst: int = RATE_BURST) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Резервирует один токен.
+
+        :return: время в секундах, через которое можно отправить запрос
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+
+class HostRateLimiter:
+    """
+    Ограничитель частоты запросов с отдельной корзиной
+    токенов для каждого хоста. Общий для синхронной сессии
+    и асинхронного загрузчика; ответы из кеша его не расходуют.
+    """
+
+    def __init__(self, rate: float, burst: int = RATE_BURST) -> None:
+        """
+        :param rate: запросов в секунду к одному хосту
+        :param burst: сколько запросов можно отправить без ожидания
+        """
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        """
+        Резервирует запрос к хосту.
+
+        :param host: хост запроса
+        :return: время в секундах, которое нужно подождать перед запросом
+        """
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host].reserve()
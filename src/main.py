@@ -1,39 +1,59 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
 from collections import defaultdict
 import re
+import time
 
 from urllib.parse import urljoin
-from tqdm import tqdm
-import requests_cache
 import logging
 
 from configs import configure_argument_parser, configure_logging
+from frontier import CrawlFrontier
+from metrics import METRICS
 from outputs import control_output
-from utils import find_tag, find_all_tags, get_response, get_soup
+from parsers import configure_parser
+from shards import merge_shards, save_shard
+from utils import DOWNLOAD_STRAINER, PEP_INDEX_STRAINER,\
+    VERSIONS_STRAINER, WHATS_NEW_INDEX_STRAINER, download_file,\
+    extract_cached, extract_pep_status_text, extract_whats_new_text,\
+    find_tag, find_all_tags, get_response, get_soup, index_row_text,\
+    iter_responses, progress
 from exceptions import NotFoundVersionList
 from constants import BASE_DIR, DOWNLOAD_PATH, EXPECTED_STATUS, MAIN_DOC_URL,\
-    MAIN_PEP_URL, NAME_DIR_DOWNLOADS, PREFIX, SECTIONS, WHATS_NEW_PATH
+    MAIN_PEP_URL, MODE_ALL, NAME_DIR_DOWNLOADS, NAME_DIR_SHARDS, PREFIX,\
+    SECTIONS, WHATS_NEW_PATH
 
+# requests_cache нужен только для аннотаций: сессия создается в main()
+# после разбора аргументов, поэтому справка и ошибки в аргументах
+# не загружают HTTP-стек.
+if TYPE_CHECKING:
+    import requests_cache
 
-def whats_new(
-    session: requests_cache.CachedSession
-) -> List[Tuple[str, str, str]]:
+VERSION_PATTERN = re.compile(
+    r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+)
+ARCHIVE_PATTERN = re.compile(r'.+pdf-a4\.zip$')
+
+
+def get_whats_new_links(session: requests_cache.CachedSession) -> List[str]:
     """
-    Получает список новых возможностей Python с их заголовками
-    и ссылками на статьи.
+    Возвращает ссылки на статьи whatsnew из оглавления.
 
     :param session: Сессия для отправки запросов.
     :type session: requests_cache.CachedSession
-    :return: Список кортежей вида
-    (ссылка на статью, заголовок, редактор/автор).
+    :return: Список URL статей в порядке оглавления.
     """
     whats_new_url = urljoin(
         MAIN_DOC_URL,
         WHATS_NEW_PATH
     )
     response = get_response(session, whats_new_url)
-    soup = get_soup(response)
+    soup = get_soup(response, WHATS_NEW_INDEX_STRAINER)
     main_div = find_tag(soup, 'section', attrs={'id': 'what-s-new-in-python'})
     div_with_ul = find_tag(
         main_div, 'div', attrs={'class': 'toctree-wrapper'}
@@ -42,58 +62,98 @@ def whats_new(
         div_with_ul,
         'li', attrs={'class': 'toctree-l1'}
     )
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-
-    for section in tqdm(sections_by_python):
-        version_a_tag = find_tag(section, 'a')
-        href = version_a_tag['href']
-        link = urljoin(whats_new_url, href)
-        response = get_response(session, link)
-        soup = get_soup(response)
-        h1 = find_tag(soup, 'h1')
-        dl = find_tag(soup, 'dl')
-        dl_text = dl.text.replace('\n', ' ')
-        results.append((link, h1.text, dl_text))
-    return results
+    return [
+        urljoin(whats_new_url, find_tag(section, 'a')['href'])
+        for section in sections_by_python
+    ]
 
 
-def latest_versions(
+def iter_whats_new(
+    session: requests_cache.CachedSession
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Отдает новые возможности Python с их заголовками и ссылками
+    на статьи по мере загрузки статей. Статьи загружаются параллельно,
+    порядок результатов совпадает с оглавлением.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    :return: Итератор кортежей вида
+    (ссылка на статью, заголовок, редактор/автор), первый — заголовок.
+    """
+    links = get_whats_new_links(session)
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+
+    for link, response in zip(links, iter_responses(session, links)):
+        h1_text, dl_text = extract_cached(
+            session, extract_whats_new_text, response
+        )
+        yield (link, h1_text, dl_text)
+
+
+def whats_new(
     session: requests_cache.CachedSession
 ) -> List[Tuple[str, str, str]]:
     """
-    Получает список последних версий Python с их статусами
+    Получает список новых возможностей Python с их заголовками
+    и ссылками на статьи.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    :return: Список кортежей вида
+    (ссылка на статью, заголовок, редактор/автор).
+    """
+    return list(iter_whats_new(session))
+
+
+def iter_latest_versions(
+    session: requests_cache.CachedSession
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Отдает последние версии Python с их статусами
     и ссылками на документацию.
 
     :param session: Сессия для отправки запросов.
     :type session: requests_cache.CachedSession
-    :return: Список кортежей вида (ссылка на документацию, версия, статус).
+    :return: Итератор кортежей вида
+    (ссылка на документацию, версия, статус), первый — заголовок.
     """
     response = get_response(session, MAIN_DOC_URL)
-    soup = get_soup(response)
+    soup = get_soup(response, VERSIONS_STRAINER)
     sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
     ul_tags = sidebar.find_all('ul')
 
-    for ul in tqdm(ul_tags):
+    for ul in progress(ul_tags):
         if 'All versions' in ul.text:
             a_tags = find_all_tags(ul, 'a')
             break
     else:
         raise NotFoundVersionList('Не найден список c версиями Python')
 
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
 
-    for a_tag in tqdm(a_tags):
+    for a_tag in progress(a_tags):
         link = a_tag['href']
-        text_match = re.search(pattern, a_tag.text)
+        text_match = VERSION_PATTERN.search(a_tag.text)
         if text_match is not None:
             version, status = text_match.groups()
         else:
             version, status = a_tag.text, ''
-        results.append(
-            (link, version, status)
-        )
-    return results
+        yield (link, version, status)
+
+
+def latest_versions(
+    session: requests_cache.CachedSession
+) -> List[Tuple[str, str, str]]:
+    """
+    Получает список последних версий Python с их статусами
+    и ссылками на документацию.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    :return: Список кортежей вида (ссылка на документацию, версия, статус).
+    """
+    return list(iter_latest_versions(session))
 
 
 def download(session: requests_cache.CachedSession) -> None:
@@ -108,10 +168,10 @@ def download(session: requests_cache.CachedSession) -> None:
         DOWNLOAD_PATH
     )
     response = get_response(session, downloads_url)
-    soup = get_soup(response)
+    soup = get_soup(response, DOWNLOAD_STRAINER)
     table = find_tag(soup, 'table')
     pdf_a4_tag = find_tag(
-        table, 'a', {'href': re.compile(r'.+pdf-a4\.zip$')}
+        table, 'a', {'href': ARCHIVE_PATTERN}
     )
     a4_link = pdf_a4_tag['href']
     archive_url = urljoin(downloads_url, a4_link)
@@ -121,25 +181,24 @@ def download(session: requests_cache.CachedSession) -> None:
     downloads_dir.mkdir(exist_ok=True)
     archive_path = downloads_dir / filename
 
-    response = session.get(archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(f'Архив был загружен и сохранён: {archive_path}')
+    if download_file(session, archive_url, archive_path):
+        logging.info(f'Архив был загружен и сохранён: {archive_path}')
+    else:
+        logging.info(f'Архив уже актуален: {archive_path}')
 
 
-def pep(
-    session: requests_cache.CachedSession
-) -> List[Tuple[str, int]]:
+def get_pep_frontier(session: requests_cache.CachedSession) -> CrawlFrontier:
     """
-    Получает статусы PEP документов и их количество.
+    Собирает из индекса PEP уникальные URL карточек
+    со строками индекса, которые на них ссылаются.
 
     :param session: Сессия для отправки запросов.
     :type session: requests_cache.CachedSession
-    :return: Список кортежей, содержащих статусы
-    и количество PEP документов с соответствующим статусом.
+    :return: CrawlFrontier со строками (текст строки индекса,
+    ожидаемые статусы).
     """
     response = get_response(session, MAIN_PEP_URL)
-    soup = get_soup(response)
+    soup = get_soup(response, PEP_INDEX_STRAINER)
     sections = find_all_tags(
         soup, 'section', {'id': SECTIONS}
     )
@@ -147,64 +206,362 @@ def pep(
     tr_tags = chain.from_iterable(
         find_all_tags(tbody, 'tr') for tbody in tbodys
     )
-    status_links = []
-    for tr in tqdm(tr_tags):
-        status = tr.find('td').text[1:]
-        status = EXPECTED_STATUS.get(status)
+    frontier = CrawlFrontier()
+    for tr in progress(tr_tags):
+        index_status = tr.find('td').text[1:]
+        status = EXPECTED_STATUS.get(index_status)
         if status is None:
             logging.info('Получен неизвестный статус')
             continue
         link = tr.find('a').text
-        status_links.append((status, PREFIX + link))
+        frontier.add(
+            urljoin(MAIN_PEP_URL, PREFIX + link), (index_row_text(tr), status)
+        )
+    logging.info(
+        f'Уникальных карточек PEP: {len(frontier)} '
+        f'из {frontier.rows_count} строк индекса'
+    )
+    return frontier
+
 
-    result_status = get_count_status(session, status_links)
+def get_shards_dir(session: requests_cache.CachedSession) -> Path:
+    """
+    Возвращает директорию результатов шардов: заданную в сессии
+    флагом --shards-dir или shards в BASE_DIR.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    :return: путь к директории результатов шардов
+    """
+    return getattr(session, 'shards_dir', None) or BASE_DIR / NAME_DIR_SHARDS
+
+
+def pep(
+    session: requests_cache.CachedSession
+) -> List[Tuple[str, int]]:
+    """
+    Получает статусы PEP документов и их количество.
+    Если у сессии задан шард, обрабатываются только карточки шарда,
+    а его счетчики вместе с отпечатком индекса PEP сохраняются
+    в директорию результатов шардов для режима merge.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    :return: Список кортежей, содержащих статусы
+    и количество PEP документов с соответствующим статусом.
+    """
+    pep_frontier = get_pep_frontier(session)
+    shard = getattr(session, 'shard', None)
+    frontier = pep_frontier if shard is None else pep_frontier.shard(*shard)
+    result_status = get_count_status(session, frontier)
+    if shard is not None:
+        path = save_shard(
+            get_shards_dir(session), shard, result_status,
+            pep_frontier.digest()
+        )
+        logging.info(f'Результаты шарда сохранены: {path}')
     return [item for item in result_status.items()]
 
 
+def merge(session: requests_cache.CachedSession) -> List[Tuple[str, int]]:
+    """
+    Объединяет результаты шардов режима pep из директории результатов
+    шардов в итоговую таблицу статусов с общим количеством Total.
+    Запросы не отправляются.
+
+    :param session: Сессия; из нее берется только директория шардов.
+    :type session: requests_cache.CachedSession
+    :return: Список кортежей (статус, количество) с итогом Total.
+    """
+    result_status = merge_shards(get_shards_dir(session))
+    return [item for item in result_status.items()]
+
+
+def get_card_status(
+    session: requests_cache.CachedSession, url: str, index_row: str
+) -> str:
+    """
+    Получает статус из карточки PEP.
+    Если у сессии есть хранилище состояния PEP и строка индекса
+    не изменилась, карточка не загружается.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    :param url: URL карточки PEP
+    :param index_row: текст строки индекса
+    :return: статус из карточки PEP
+    """
+    pep_state = getattr(session, 'pep_state', None)
+    if pep_state is not None:
+        card_status = pep_state.lookup(url, index_row)
+        if card_status is not None:
+            return card_status
+    response = get_response(session, url)
+    card_status = extract_cached(session, extract_pep_status_text, response)
+    if pep_state is not None:
+        pep_state.remember(url, index_row, card_status)
+    return card_status
+
+
+def count_card_status(
+    result_status: Dict[str, int],
+    url: str,
+    card_status: str,
+    rows: List[Tuple[str, Tuple[str, ...]]]
+) -> None:
+    """
+    Учитывает статус карточки PEP для каждой строки индекса,
+    которая на нее ссылается, и проверяет его по ожидаемым статусам.
+
+    :param result_status: словарь с количеством PEP по статусам
+    :param url: URL карточки PEP
+    :param card_status: статус из карточки PEP
+    :param rows: строки индекса (текст строки, ожидаемые статусы)
+    :return: None
+    """
+    for _, status in rows:
+        if card_status not in status:
+            logging.info(
+                f'\nНесовпадающие статусы:\n'
+                f'{url}\nСтатус в карточке: {card_status}\n'
+                f'Ожидаемые статусы: {status}'
+            )
+        result_status[card_status] += 1
+
+
 def get_count_status(
     session: requests_cache.CachedSession,
-    status_links: List[Tuple[str, str]]
+    frontier: CrawlFrontier
 ) -> Dict[str, int]:
     """
-    Получает URLs PEP с каждым статусом.
+    Получает количество PEP с каждым статусом.
+    Каждая карточка PEP загружается один раз, даже если она указана
+    в нескольких разделах индекса. Подсчет ведется по строкам индекса:
+    PEP из нескольких разделов учитывается в каждом из них, а статус
+    карточки проверяется по ожидаемым статусам каждой строки.
+    Состояние PEP хранится по URL карточки с текстом первой
+    ссылающейся на нее строки индекса.
 
     :param session: Сессия для отправки запросов.
     :type session: requests_cache.CachedSession
+    :param frontier: уникальные URL карточек PEP со строками
+    индекса (текст строки, ожидаемые статусы).
     :return: Словарь, содержащий количество PEP документов
     с каждым статусом и общее количество документов.
     """
     result_status = defaultdict(int)
-    for status, link in tqdm(status_links):
-        url = urljoin(MAIN_PEP_URL, link)
-        response = get_response(session, url)
-        soup = get_soup(response)
-        new_status = find_tag(
-            soup, 'section', {'id': 'pep-content'}
-        ).find('abbr').text
-
-        if new_status not in status:
-            logging.info(
-                f'\nНесовпадающие статусы:\n'
-                f'{url}\nСтатус в карточке: {new_status}\n'
-                f'Ожидаемые статусы: {status}'
-            )
-        result_status[new_status] += 1
+    for url in progress(frontier):
+        rows = frontier.rows(url)
+        card_status = get_card_status(session, url, rows[0][0])
+        count_card_status(result_status, url, card_status, rows)
+    pep_state = getattr(session, 'pep_state', None)
+    if pep_state is not None:
+        pep_state.save()
     result_status['Total'] = sum(result_status.values())
     return result_status
 
 
+def warm(session: requests_cache.CachedSession) -> None:
+    """
+    Загружает в кеш страницы, которые читают режимы парсера:
+    индекс и статьи whatsnew, главную страницу документации
+    со списком версий, страницу загрузок, индекс и карточки PEP.
+    Страницы загружаются параллельно; свежие ответы из кеша
+    не запрашиваются повторно, устаревшие перепроверяются.
+    Архив документации не загружается: режим download
+    скачивает его в обход кеша.
+
+    :param session: Сессия для отправки запросов.
+    :type session: requests_cache.CachedSession
+    """
+    urls = [MAIN_DOC_URL, urljoin(MAIN_DOC_URL, DOWNLOAD_PATH)]
+    urls.extend(get_whats_new_links(session))
+    urls.extend(get_pep_frontier(session))
+    from_cache = failed = 0
+    for response in iter_responses(session, urls):
+        if response is None:
+            failed += 1
+        elif getattr(response, 'from_cache', False):
+            from_cache += 1
+    logging.info(
+        f'Кеш прогрет: {len(urls)} страниц, из них уже были в кеше '
+        f'{from_cache}, не загружено {failed}'
+    )
+
+
+def cache_stats(
+    session: requests_cache.CachedSession
+) -> List[Tuple[str, str]]:
+    """
+    Возвращает сводку по HTTP-кешу: число ответов, размер записей
+    и файла базы, лимит размера.
+
+    :param session: Сессия с кешем парсера.
+    :return: Список кортежей (показатель, значение), первый — заголовок.
+    """
+    responses = session.cache.responses
+    results = [('Показатель', 'Значение')]
+    results.append(('Ответов', str(responses.count())))
+    results.append((
+        'Актуальных ответов', str(responses.count(expired=False))
+    ))
+    if hasattr(responses, 'total_size'):
+        results.append(('Размер ответов, байт', str(responses.total_size())))
+        results.append((
+            'Лимит, байт',
+            '-' if responses.max_size is None else str(responses.max_size)
+        ))
+    results.append(('Размер базы, байт', str(responses.size())))
+    return results
+
+
+def cache_prune(
+    session: requests_cache.CachedSession
+) -> List[Tuple[str, str]]:
+    """
+    Удаляет из HTTP-кеша устаревшие ответы и ответы сверх лимита размера.
+
+    :param session: Сессия с кешем парсера.
+    :return: Список кортежей (показатель, значение), первый — заголовок.
+    """
+    removed, freed = session.cache.prune()
+    logging.info(f'Из кеша удалено {removed} ответов, {freed} байт')
+    return [
+        ('Показатель', 'Значение'),
+        ('Удалено ответов', str(removed)),
+        ('Освобождено, байт', str(freed)),
+    ]
+
+
 MODE_TO_FUNCTION = {
     'whats-new': whats_new,
     'latest-versions': latest_versions,
     'download': download,
     'pep': pep
 }
+MODE_TO_STREAM = {
+    'whats-new': iter_whats_new,
+    'latest-versions': iter_latest_versions,
+}
+# Служебные режимы работают с локальными данными: обслуживают HTTP-кеш
+# и объединяют результаты шардов pep.
+MODE_TO_CACHE = {
+    'cache-stats': cache_stats,
+    'cache-prune': cache_prune,
+    'warm': warm,
+    'merge': merge,
+}
+# Режимы, которые читают и меняют HTTP-кеш на диске. С --replay
+# сессия работает с кешем в памяти, поэтому эти режимы недоступны.
+DISK_CACHE_MODES = ('cache-stats', 'cache-prune')
+
+
+def check_replay_modes(
+    arg_parser: ArgumentParser, cli_args: Namespace
+) -> None:
+    """
+    Завершает работу с ошибкой аргументов, если режимы HTTP-кеша
+    запрошены вместе с --replay.
+
+    :param arg_parser: парсер аргументов командной строки
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    modes = [mode for mode in cli_args.mode if mode in DISK_CACHE_MODES]
+    if cli_args.replay and modes:
+        arg_parser.error(
+            f'Режимы {", ".join(modes)} работают с HTTP-кешем на диске '
+            'и несовместимы с --replay'
+        )
+
+
+def expand_modes(
+    modes: List[str], all_modes: Iterable[str] = tuple(MODE_TO_FUNCTION)
+) -> List[str]:
+    """
+    Раскрывает режим all в список режимов парсинга
+    и убирает повторы, сохраняя порядок режимов.
+
+    :param modes: режимы из командной строки
+    :param all_modes: режимы, которые означает all
+    (по умолчанию все режимы парсинга)
+    :return: список режимов для запуска
+    """
+    expanded = []
+    for mode in modes:
+        for item in all_modes if mode == MODE_ALL else [mode]:
+            if item not in expanded:
+                expanded.append(item)
+    return expanded
+
+
+def mode_args(cli_args: Namespace, mode: str) -> Namespace:
+    """
+    Возвращает аргументы командной строки для вывода одного режима:
+    control_output называет файлы и таблицы по имени режима.
+
+    :param cli_args: аргументы командной строки
+    :param mode: режим работы
+    :return: копия аргументов с одним режимом
+    """
+    return Namespace(**{**vars(cli_args), 'mode': mode})
+
+
+def run_mode(
+    session: requests_cache.CachedSession, mode: str, cli_args: Namespace
+) -> None:
+    """
+    Выполняет режим и выводит его результаты в заданном формате.
+    Ошибка режима записывается в лог и не прерывает другие режимы.
+
+    :param session: Сессия для отправки запросов.
+    :param mode: режим работы
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    mode_function = {
+        **MODE_TO_FUNCTION, **MODE_TO_CACHE, **MODE_TO_STREAM
+    }[mode]
+    METRICS.mode = mode
+    started = time.perf_counter()
+    try:
+        results = mode_function(session)
+        if results is not None:
+            control_output(results, mode_args(cli_args, mode))
+    except Exception as e:
+        logging.error(str(e))
+    METRICS.set(
+        'run_duration_seconds', time.perf_counter() - started, mode=mode
+    )
+
+
+def run_modes(
+    session: requests_cache.CachedSession,
+    modes: List[str],
+    cli_args: Namespace
+) -> None:
+    """
+    Выполняет режимы одновременно в потоках с общей сессией,
+    поэтому режимы делят HTTP-кеш и пул соединений.
+    Результаты каждого режима выводятся отдельно.
+
+    :param session: Сессия для отправки запросов.
+    :param modes: режимы работы
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    if len(modes) == 1:
+        run_mode(session, modes[0], cli_args)
+        return
+    with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+        for mode in modes:
+            executor.submit(run_mode, session, mode, cli_args)
 
 
 def main() -> None:
     """
     Основная функция парсера PEP документов.
-    Парсит PEP документы в зависимости от выбранного режима
+    Парсит PEP документы в выбранных режимах
     и выводит результаты в заданном формате.
 
     :return: None
@@ -212,24 +569,25 @@ def main() -> None:
     configure_logging()
     logging.info('Парсер запущен!')
 
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser(
+        [*MODE_TO_FUNCTION, *MODE_TO_CACHE, MODE_ALL]
+    )
     args = arg_parser.parse_args()
+    check_replay_modes(arg_parser, args)
     logging.info(f'Аргументы командной строки: {args}')
+    configure_parser(args.parser)
 
-    session = requests_cache.CachedSession(expire_after=None)
+    from session import create_session
+    session = create_session(args)
     session.max_redirects
     if args.clear_cache:
         session.cache.clear()
+        if session.extract_memo is not None:
+            session.extract_memo.clear()
 
-    parser_mode = args.mode
-    try:
-        results = MODE_TO_FUNCTION[parser_mode](session)
-    except Exception as e:
-        logging.error(str(e))
-        results = None
-
-    if results is not None:
-        control_output(results, args)
+    run_modes(session, expand_modes(args.mode), args)
+    if args.stats:
+        METRICS.report(args.stats_file)
     logging.info('Парсер завершил работу.')
 
 
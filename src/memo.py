@@ -0,0 +1,121 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from constants import EXTRACTOR_VERSION
+from metrics import METRICS
+
+# Ключ записи: имя функции извлечения, версия извлечения
+# и SHA-256 HTML-кода страницы.
+MemoKey = Tuple[str, int, str]
+
+
+class ExtractMemo:
+    """
+    Кеш извлеченных из страниц значений в базе SQLite.
+    Записи хранятся по хешу содержимого страницы, имени функции
+    извлечения и версии EXTRACTOR_VERSION, поэтому неизменившаяся
+    страница, полученная из HTTP-кеша или загруженная заново,
+    не разбирается повторно. При изменении логики извлечения
+    версию нужно увеличить: старые записи перестанут совпадать.
+    Значения хранятся в JSON, кортежи возвращаются списками.
+    Методы потокобезопасны.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        :param path: путь к базе SQLite
+        """
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS extractions ('
+                'extractor TEXT NOT NULL, version INTEGER NOT NULL, '
+                'digest TEXT NOT NULL, value TEXT NOT NULL, '
+                'PRIMARY KEY (extractor, version, digest))'
+            )
+        return self._connection
+
+    @staticmethod
+    def key(function: Callable[[str], Any], text: str) -> MemoKey:
+        """
+        Возвращает ключ записи для страницы и функции извлечения.
+
+        :param function: функция извлечения, принимающая HTML-код
+        :param text: HTML-код страницы
+        :return: кортеж (функция, версия, хеш содержимого)
+        """
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return function.__name__, EXTRACTOR_VERSION, digest
+
+    def lookup(self, key: MemoKey) -> Optional[Any]:
+        """
+        Возвращает сохраненное значение или None.
+
+        :param key: ключ записи из ExtractMemo.key
+        :return: значение или None, если записи нет
+        """
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT value FROM extractions '
+                'WHERE extractor = ? AND version = ? AND digest = ?',
+                key
+            ).fetchone()
+        if row is None:
+            return None
+        METRICS.inc('extract_memo_hits_total')
+        return json.loads(row[0])
+
+    def store(self, key: MemoKey, value: Any) -> None:
+        """
+        Сохраняет извлеченное значение.
+
+        :param key: ключ записи из ExtractMemo.key
+        :param value: значение, сериализуемое в JSON
+        :return: None
+        """
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?)',
+                key + (json.dumps(value, ensure_ascii=False),)
+            )
+
+    def extract(self, function: Callable[[str], Any], text: str) -> Any:
+        """
+        Возвращает сохраненное значение для страницы
+        или извлекает его функцией и сохраняет.
+
+        :param function: функция извлечения, принимающая HTML-код
+        :param text: HTML-код страницы
+        :return: извлеченное значение
+        """
+        key = self.key(function, text)
+        value = self.lookup(key)
+        if value is None:
+            value = function(text)
+            self.store(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute('DELETE FROM extractions')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
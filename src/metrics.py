@@ -0,0 +1,247 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from constants import LATENCY_BUCKETS, METRICS_PREFIX
+
+Labels = Tuple[Tuple[str, str], ...]
+
+METRIC_HELP = {
+    'request_duration_seconds': 'Время получения ответа на запрос',
+    'parse_duration_seconds': 'Время разбора HTML-страницы',
+    'find_duration_seconds': 'Время поиска тегов в дереве страницы',
+    'requests_total': 'Число полученных ответов',
+    'response_bytes_total': 'Число байт в телах полученных ответов',
+    'request_errors_total': 'Число запросов, завершившихся ошибкой',
+    'retries_total': 'Число повторных запросов',
+    'extract_memo_hits_total': 'Число страниц, значения которых взяты '
+                               'из кеша извлечения без разбора',
+    'cache_hit_ratio': 'Доля ответов, полученных из кеша',
+    'run_duration_seconds': 'Время работы режима',
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class Metrics:
+    """
+    Метрики одного запуска парсера: гистограммы времени запросов
+    и разбора страниц и счетчики ответов, байт, ошибок и повторов.
+    Время разбора помечается текущим режимом работы.
+    Режим хранится в переменной контекста, поэтому режимы,
+    запущенные одновременно в потоках или задачах asyncio,
+    помечают метрики каждый своим именем.
+    Методы потокобезопасны: метрики пишутся и из пула потоков.
+    """
+
+    def __init__(self) -> None:
+        self._mode: ContextVar[str] = ContextVar('mode', default='')
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+
+    @property
+    def mode(self) -> str:
+        return self._mode.get()
+
+    @mode.setter
+    def mode(self, value: str) -> None:
+        self._mode.set(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Замеряет время выполнения блока и добавляет его в гистограмму.
+
+        :param name: имя гистограммы
+        :param labels: метки гистограммы
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def record_response(self, response: Any, elapsed: float) -> None:
+        """
+        Учитывает полученный ответ: время, источник (кеш или сеть)
+        и размер тела.
+
+        :param response: объект Response или CachedResponse
+        :param elapsed: время получения ответа в секундах
+        :return: None
+        """
+        source = 'cache' if getattr(response, 'from_cache', False) \
+            else 'network'
+        self.observe('request_duration_seconds', elapsed, source=source)
+        self.inc('requests_total', source=source)
+        self.inc('response_bytes_total', len(response.content), source=source)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """
+        Возвращает сумму счетчика по всем меткам,
+        совпадающим с переданными.
+        """
+        return sum(
+            value for (key, key_labels), value in self.counters.items()
+            if key == name and set(labels.items()) <= set(key_labels)
+        )
+
+    def cache_hit_ratio(self) -> Optional[float]:
+        total = self.counter('requests_total')
+        if not total:
+            return None
+        return self.counter('requests_total', source='cache') / total
+
+    def summary(self) -> List[Tuple[str, str]]:
+        """
+        Возвращает сводку запуска для вывода в лог.
+
+        :return: список пар (показатель, значение)
+        """
+        rows = []
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            label = ', '.join(f'{key}={value}' for key, value in labels)
+            rows.append((
+                f'{name} {{{label}}}',
+                f'n={histogram.count} sum={histogram.sum:.3f}s '
+                f'avg={histogram.sum / histogram.count:.4f}s '
+                f'max={histogram.max:.4f}s'
+            ))
+        ratio = self.cache_hit_ratio()
+        rows.extend([
+            ('requests', f'{self.counter("requests_total"):.0f}'),
+            ('bytes', f'{self.counter("response_bytes_total"):.0f}'),
+            ('cache hit ratio', '-' if ratio is None else f'{ratio:.2%}'),
+            ('errors', f'{self.counter("request_errors_total"):.0f}'),
+            ('retries', f'{self.counter("retries_total"):.0f}'),
+            (
+                'extract memo hits',
+                f'{self.counter("extract_memo_hits_total"):.0f}'
+            ),
+        ])
+        return rows
+
+    def to_prometheus(self) -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+
+        :return: текст для node exporter textfile collector
+        """
+        ratio = self.cache_hit_ratio()
+        if ratio is not None:
+            self.set('cache_hit_ratio', ratio)
+        lines = []
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name in typed:
+                return
+            typed.add(name)
+            full_name = f'{METRICS_PREFIX}_{name}'
+            lines.append(f'# HELP {full_name} {METRIC_HELP.get(name, name)}')
+            lines.append(f'# TYPE {full_name} {kind}')
+
+        def sample(name: str, labels: Labels, value: float) -> str:
+            label = ','.join(f'{key}="{val}"' for key, val in labels)
+            label = f'{{{label}}}' if label else ''
+            return f'{METRICS_PREFIX}_{name}{label} {value}'
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(sample(
+                    f'{name}_bucket', labels + (('le', f'{bound:g}'),),
+                    cumulative
+                ))
+            lines.append(sample(
+                f'{name}_bucket', labels + (('le', '+Inf'),), histogram.count
+            ))
+            lines.append(sample(f'{name}_sum', labels, histogram.sum))
+            lines.append(sample(f'{name}_count', labels, histogram.count))
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, 'counter')
+            lines.append(sample(name, labels, value))
+        for (name, labels), value in sorted(self.gauges.items()):
+            header(name, 'gauge')
+            lines.append(sample(name, labels, value))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: Path) -> None:
+        """
+        Атомарно записывает метрики в файл формата Prometheus,
+        чтобы node exporter не прочитал файл частично.
+
+        :param path: путь к файлу .prom
+        :return: None
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='UTF-8') as file:
+            file.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def report(self, path: Path) -> None:
+        """
+        Выводит сводку метрик в лог и записывает их в файл Prometheus.
+
+        :param path: путь к файлу .prom
+        :return: None
+        """
+        summary = '\n'.join(
+            f'{name}: {value}' for name, value in self.summary()
+        )
+        logging.info(f'Статистика запуска:\n{summary}')
+        self.write_prometheus(path)
+        logging.info(f'Метрики были сохранены: {path}')
+
+
+METRICS = Metrics()
@@ -1,53 +1,85 @@
 import datetime as dt
 import csv
+import json
 import logging
-from typing import Any, List
-
-from prettytable import PrettyTable
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Sequence
 
 from constants import BASE_DIR, DATETIME_FORMAT, NAME_DIR_RESULTS,\
-    OUTPUT_FILE, OUTPUT_TABLE
+    NAME_FILE_RESULTS_DB, OUTPUT_FILE, OUTPUT_FLUSH_ROWS, OUTPUT_JSONL,\
+    OUTPUT_PARQUET, OUTPUT_SQLITE, OUTPUT_TABLE
+from exceptions import OutputFormatException
+
+Rows = Iterable[Sequence[Any]]
+
+# Режимы, запущенные вместе, выводят результаты в консоль по очереди,
+# чтобы их строки не перемешивались.
+CONSOLE_LOCK = threading.Lock()
 
 
-def control_output(results: List[List[str]], cli_args: Any) -> None:
+def control_output(results: Rows, cli_args: Any) -> None:
     """
     Определяет тип вывода результатов парсинга PEP документов в зависимости
     от выбранного режима и вызывает соответствующую функцию вывода.
     Если тип вывода не задан, то используется функция default_output.
+    Результаты могут быть генератором: вывод в консоль и в файл
+    пишет строки по мере их получения. Вывод в консоль из нескольких
+    потоков выполняется под CONSOLE_LOCK, вывод в файлы и базы данных
+    остается параллельным.
 
-    :param results: список результатов парсинга
+    :param results: строки результатов парсинга, первая — заголовок
     :param cli_args: аргументы командной строки
     :return: None
     """
     output = cli_args.output
-    if output == OUTPUT_TABLE:
-        pretty_output(results)
-    elif output == OUTPUT_FILE:
+    if output == OUTPUT_FILE:
         file_output(results, cli_args)
+    elif output == OUTPUT_JSONL:
+        jsonl_output(results, cli_args)
+    elif output == OUTPUT_SQLITE:
+        sqlite_output(results, cli_args)
+    elif output == OUTPUT_PARQUET:
+        parquet_output(results, cli_args)
     else:
-        default_output(results)
+        with CONSOLE_LOCK:
+            if output == OUTPUT_TABLE:
+                pretty_output(results)
+            else:
+                default_output(results)
 
 
-def default_output(results: List[List[str]]) -> None:
+def default_output(results: Rows) -> None:
     """
     Выводит результаты парсинга в консоль в формате,
     где каждый элемент строки разделен пробелом.
+    Строки выводятся по мере получения, буфер сбрасывается
+    каждые OUTPUT_FLUSH_ROWS строк.
 
-    :param results: список результатов парсинга
+    :param results: строки результатов парсинга
     :return: None
     """
-    for row in results:
+    for number, row in enumerate(results, 1):
         print(*row)
+        if number % OUTPUT_FLUSH_ROWS == 0:
+            sys.stdout.flush()
+    sys.stdout.flush()
 
 
-def pretty_output(results: List[List[str]]) -> None:
+def pretty_output(results: Rows) -> None:
     """
     Выводит результаты парсинга в консоль в виде таблицы
     с помощью библиотеки PrettyTable.
+    Таблице нужна ширина всех столбцов, поэтому строки
+    накапливаются до конца парсинга.
 
-    :param results: список результатов парсинга
+    :param results: строки результатов парсинга
     :return: None
     """
+    from prettytable import PrettyTable
+    results = list(results)
     table = PrettyTable()
     table.field_names = results[0]
     table.align = 'l'
@@ -55,23 +87,142 @@ def pretty_output(results: List[List[str]]) -> None:
     print(table)
 
 
-def file_output(results: List[List[str]], cli_args: Any) -> None:
+def get_results_path(cli_args: Any, extension: str) -> Path:
+    """
+    Возвращает путь к файлу результатов в директории results
+    с названием из режима работы, текущей даты и времени.
+
+    :param cli_args: аргументы командной строки
+    :param extension: расширение файла
+    :return: путь к файлу результатов
+    """
+    results_dir = BASE_DIR / NAME_DIR_RESULTS
+    results_dir.mkdir(exist_ok=True)
+    now = dt.datetime.now().strftime(DATETIME_FORMAT)
+    return results_dir / f'{cli_args.mode}_{now}.{extension}'
+
+
+def file_output(results: Rows, cli_args: Any) -> None:
     """
     Сохраняет результаты парсинга в файл формата csv в директории results
     с названием, содержащим текущую дату и время и выбранный режим работы.
+    Строки записываются по мере получения, файл сбрасывается на диск
+    каждые OUTPUT_FLUSH_ROWS строк, поэтому при сбое в середине
+    парсинга уже полученные результаты сохраняются.
     Также функция записывает информацию о сохранении файла в лог.
 
-    :param results: список результатов парсинга
+    :param results: строки результатов парсинга
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    file_path = get_results_path(cli_args, 'csv')
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        writer = csv.writer(file, dialect='unix')
+        for number, row in enumerate(results, 1):
+            writer.writerow(row)
+            if number % OUTPUT_FLUSH_ROWS == 0:
+                file.flush()
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def jsonl_output(results: Rows, cli_args: Any) -> None:
+    """
+    Сохраняет результаты парсинга в файл формата JSON Lines
+    в директории results: каждая строка результатов — объект
+    с ключами из строки заголовка. Строки записываются по мере
+    получения, как в file_output.
+
+    :param results: строки результатов парсинга, первая — заголовок
+    :param cli_args: аргументы командной строки
+    :return: None
+    """
+    rows = iter(results)
+    header = next(rows)
+    file_path = get_results_path(cli_args, 'jsonl')
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        for number, row in enumerate(rows, 1):
+            file.write(
+                json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+            )
+            if number % OUTPUT_FLUSH_ROWS == 0:
+                file.flush()
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def sqlite_output(results: Rows, cli_args: Any) -> None:
+    """
+    Добавляет результаты парсинга в базу SQLite results.db
+    в директории results. Для каждого режима ведется своя таблица
+    с колонками из строки заголовка и колонкой run_at со временем
+    запуска, поэтому в базе накапливается история запусков.
+    Все строки записываются одной транзакцией.
+
+    :param results: строки результатов парсинга, первая — заголовок
     :param cli_args: аргументы командной строки
     :return: None
     """
+    rows = iter(results)
+    header = next(rows)
     results_dir = BASE_DIR / NAME_DIR_RESULTS
     results_dir.mkdir(exist_ok=True)
-    now = dt.datetime.now().strftime(DATETIME_FORMAT)
-    file_name = f'{cli_args.mode}_{now}.csv'
-    file_path = results_dir / file_name
+    db_path = results_dir / NAME_FILE_RESULTS_DB
+    table = quote_identifier(cli_args.mode.replace('-', '_'))
+    columns = ', '.join(
+        quote_identifier(column) for column in ('run_at', *header)
+    )
+    placeholders = ', '.join('?' * (len(header) + 1))
+    run_at = dt.datetime.now().isoformat(timespec='seconds')
 
-    with open(file_path, 'w', encoding='UTF-8') as file:
-        writer = csv.writer(file, dialect='unix')
-        writer.writerows(results)
+    connection = sqlite3.connect(db_path)
+    try:
+        with connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ({columns})'
+            )
+            connection.executemany(
+                f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                ((run_at, *row) for row in rows)
+            )
+    finally:
+        connection.close()
+    logging.info(f'Результаты были сохранены в базу: {db_path}')
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Экранирует имя таблицы или колонки SQLite.
+
+    :param name: имя
+    :return: имя в двойных кавычках
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def parquet_output(results: Rows, cli_args: Any) -> None:
+    """
+    Сохраняет результаты парсинга в файл формата Parquet
+    в директории results с колонками из строки заголовка.
+    Для записи нужен пакет pyarrow, строки накапливаются
+    до конца парсинга.
+
+    :param results: строки результатов парсинга, первая — заголовок
+    :param cli_args: аргументы командной строки
+    :return: None
+    :raises OutputFormatException: если pyarrow не установлен
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise OutputFormatException(
+            'Для вывода в формате parquet установите пакет pyarrow'
+        )
+    rows = iter(results)
+    header = next(rows)
+    columns = list(zip(*rows)) or [()] * len(header)
+    table = pyarrow.table(
+        {name: list(column) for name, column in zip(header, columns)}
+    )
+    file_path = get_results_path(cli_args, 'parquet')
+    pyarrow.parquet.write_table(table, file_path)
     logging.info(f'Файл с результатами был сохранён: {file_path}')
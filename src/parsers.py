@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List,\
+    Optional
+
+from constants import DEFAULT_PARSER, PARSER_BS4, PARSER_LXML,\
+    PARSER_SELECTOLAX
+from exceptions import ParserBackendException
+
+if TYPE_CHECKING:
+    import lxml.html
+    from bs4 import BeautifulSoup, SoupStrainer
+
+MULTI_VALUED_ATTRIBUTES = ('class',)
+
+
+class Strainer:
+    """
+    Фильтр частичного разбора страницы: имя тега и атрибуты.
+    SoupStrainer для BeautifulSoup создается при первом разборе,
+    поэтому модуль bs4 загружается только режимами, которые
+    разбирают страницы этим парсером.
+    """
+
+    def __init__(self, name: Any, attrs: Optional[Dict] = None) -> None:
+        """
+        :param name: имя тега или список имен
+        :param attrs: атрибуты тега (по умолчанию None)
+        """
+        self.name = name
+        self.attrs = attrs or {}
+        self._soup_strainer: Optional[SoupStrainer] = None
+
+    def soup_strainer(self) -> SoupStrainer:
+        """
+        Возвращает фильтр SoupStrainer с теми же условиями.
+
+        :return: объект SoupStrainer
+        """
+        if self._soup_strainer is None:
+            from bs4 import SoupStrainer
+            self._soup_strainer = SoupStrainer(self.name, attrs=self.attrs)
+        return self._soup_strainer
+
+
+def match_attribute(value: Optional[str], expected: Any, name: str) -> bool:
+    """
+    Проверяет значение атрибута по правилам BeautifulSoup:
+    строка сравнивается целиком, а для class — и с каждым классом,
+    регулярное выражение ищется в значении, список совпадает,
+    если совпал любой его элемент, True требует наличия атрибута.
+
+    :param value: значение атрибута или None, если атрибута нет
+    :param expected: ожидаемое значение
+    :param name: имя атрибута
+    :return: True, если значение подходит
+    """
+    if expected is True:
+        return value is not None
+    if value is None:
+        return expected is None
+    if isinstance(expected, (list, tuple, set)):
+        return any(match_attribute(value, item, name) for item in expected)
+    candidates = [value]
+    if name in MULTI_VALUED_ATTRIBUTES:
+        candidates.extend(value.split())
+    if isinstance(expected, re.Pattern):
+        return any(expected.search(candidate) for candidate in candidates)
+    return expected in candidates
+
+
+class Node(ABC):
+    """
+    Узел HTML-дерева с интерфейсом поиска BeautifulSoup:
+    find, find_all, text и доступ к атрибутам через [].
+    Наследники реализуют обход потомков и чтение атрибутов.
+    """
+
+    @abstractmethod
+    def _iter_descendants(self, names: List[str]) -> Iterator['Node']:
+        """Обходит потомков узла с именами из names в порядке документа."""
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """Возвращает значение атрибута key или default."""
+
+    @property
+    @abstractmethod
+    def text(self) -> str:
+        """Возвращает текст узла вместе с текстом потомков."""
+
+    def __getitem__(self, key: str) -> str:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def _search(self, name: Any, attrs: Optional[Dict]) -> Iterator['Node']:
+        names = [name] if isinstance(name, str) else list(name)
+        for node in self._iter_descendants(names):
+            if all(
+                match_attribute(node.get(key), expected, key)
+                for key, expected in (attrs or {}).items()
+            ):
+                yield node
+
+    def find(
+        self, name: Any, attrs: Optional[Dict] = None
+    ) -> Optional['Node']:
+        return next(self._search(name, attrs), None)
+
+    def find_all(
+        self, name: Any, attrs: Optional[Dict] = None
+    ) -> List['Node']:
+        return list(self._search(name, attrs))
+
+
+class LxmlNode(Node):
+    """Узел дерева lxml.html."""
+
+    def __init__(self, element: lxml.html.HtmlElement) -> None:
+        self._element = element
+
+    def _iter_descendants(self, names: List[str]) -> Iterator[Node]:
+        for element in self._element.iterdescendants(*names):
+            yield LxmlNode(element)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._element.get(key, default)
+
+    @property
+    def text(self) -> str:
+        return self._element.text_content()
+
+
+class SelectolaxNode(Node):
+    """Узел дерева selectolax (движок lexbor)."""
+
+    def __init__(self, node: Any) -> None:
+        self._node = node
+
+    def _iter_descendants(self, names: List[str]) -> Iterator[Node]:
+        nodes = self._node.traverse(include_text=False)
+        next(nodes, None)
+        for node in nodes:
+            if node.tag in names:
+                yield SelectolaxNode(node)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        attributes = self._node.attributes
+        if key not in attributes:
+            return default
+        value = attributes[key]
+        return '' if value is None else value
+
+    @property
+    def text(self) -> str:
+        return self._node.text(deep=True)
+
+
+def parse_bs4(
+    text: str, parse_only: Optional[Strainer] = None
+) -> BeautifulSoup:
+    """
+    Разбирает страницу BeautifulSoup с парсером lxml.
+
+    :param text: HTML-код страницы
+    :param parse_only: фильтр Strainer (по умолчанию None)
+    :return: объект BeautifulSoup
+    """
+    from bs4 import BeautifulSoup
+    if parse_only is not None:
+        parse_only = parse_only.soup_strainer()
+    return BeautifulSoup(text, features='lxml', parse_only=parse_only)
+
+
+def parse_lxml(text: str, parse_only: Optional[Strainer] = None) -> Node:
+    """
+    Разбирает страницу напрямую через lxml.html.
+    Фильтр parse_only не применяется: дерево lxml строится в C
+    и не требует частичного разбора.
+
+    :param text: HTML-код страницы
+    :param parse_only: не используется
+    :return: корневой узел LxmlNode
+    """
+    import lxml.html
+    from lxml.etree import ParserError
+    try:
+        return LxmlNode(lxml.html.document_fromstring(text))
+    except ParserError:
+        return LxmlNode(lxml.html.document_fromstring('<html></html>'))
+
+
+def parse_selectolax(
+    text: str, parse_only: Optional[Strainer] = None
+) -> Node:
+    """
+    Разбирает страницу парсером selectolax на движке lexbor.
+    Фильтр parse_only не применяется.
+
+    :param text: HTML-код страницы
+    :param parse_only: не используется
+    :return: корневой узел SelectolaxNode
+    :raises ParserBackendException: если selectolax не установлен
+    """
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        raise ParserBackendException(
+            'Для парсера selectolax установите пакет selectolax'
+        )
+    return SelectolaxNode(LexborHTMLParser(text).root)
+
+
+PARSERS: Dict[str, Callable[[str, Optional[Strainer]], Any]] = {
+    PARSER_BS4: parse_bs4,
+    PARSER_LXML: parse_lxml,
+    PARSER_SELECTOLAX: parse_selectolax,
+}
+_parser = PARSERS[DEFAULT_PARSER]
+_parser_name = DEFAULT_PARSER
+
+
+def configure_parser(name: str) -> None:
+    """
+    Выбирает HTML-парсер, которым будут разбираться страницы.
+
+    :param name: имя парсера из PARSERS
+    :return: None
+    """
+    global _parser, _parser_name
+    _parser = PARSERS[name]
+    _parser_name = name
+
+
+def get_parser_name() -> str:
+    """
+    Возвращает имя выбранного HTML-парсера.
+
+    :return: имя парсера из PARSERS
+    """
+    return _parser_name
+
+
+def parse_html(text: str, parse_only: Optional[Strainer] = None) -> Any:
+    """
+    Разбирает страницу выбранным HTML-парсером.
+
+    :param text: HTML-код страницы
+    :param parse_only: фильтр Strainer для парсера bs4
+    :return: корневой узел дерева
+    """
+    return _parser(text, parse_only)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from memo import ExtractMemo
+from metrics import METRICS
+from parsers import configure_parser, get_parser_name
+
+
+def timed_call(function: Callable[[str], Any], text: str) -> Tuple[Any, float]:
+    """
+    Выполняет извлечение в процессе пула и замеряет его время,
+    чтобы время разбора попало в метрики основного процесса.
+
+    :param function: функция извлечения, принимающая HTML-код
+    :param text: HTML-код страницы
+    :return: кортеж (результат, время в секундах)
+    """
+    started = time.perf_counter()
+    result = function(text)
+    return result, time.perf_counter() - started
+
+
+class ParsePool:
+    """
+    Пул процессов для разбора загруженных страниц.
+    Загрузка остается в цикле событий, а разбор HTML, который
+    занимает процессор и держит GIL, выполняется в workers
+    процессах. В процесс передается текст страницы, а обратно
+    возвращаются только извлеченные строки, а не дерево разбора.
+    Процессы разбирают страницы тем же HTML-парсером, что выбран
+    в основном процессе. При workers == 0 страницы разбираются
+    в цикле событий, как без пула.
+    Если задан кеш извлечения memo, страницы с уже известным
+    содержимым не передаются в пул и не разбираются.
+    Используется как контекстный менеджер.
+    """
+
+    def __init__(
+        self, workers: int = 0, memo: Optional[ExtractMemo] = None
+    ) -> None:
+        """
+        :param workers: число процессов; 0 — разбирать без пула
+        :param memo: кеш извлеченных значений или None
+        """
+        self.workers = workers
+        self.memo = memo
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_session(cls, session) -> 'ParsePool':
+        """
+        Создает пул с настройками сессии парсера.
+
+        :param session: объект ParserSession
+        :return: объект ParsePool
+        """
+        return cls(session.parse_workers, session.extract_memo)
+
+    def __enter__(self) -> 'ParsePool':
+        if self.workers:
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                initializer=configure_parser,
+                initargs=(get_parser_name(),),
+            )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def extract(
+        self, function: Callable[[str], Any], text: str
+    ) -> Any:
+        """
+        Извлекает данные из страницы в процессе пула.
+
+        :param function: функция извлечения уровня модуля,
+        принимающая HTML-код, например extract_pep_status_text
+        :param text: HTML-код страницы
+        :return: результат функции извлечения
+        """
+        key = None
+        if self.memo is not None:
+            key = self.memo.key(function, text)
+            result = self.memo.lookup(key)
+            if result is not None:
+                return result
+        if self._executor is None:
+            result = function(text)
+        else:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(
+                self._executor, timed_call, function, text
+            )
+            METRICS.observe(
+                'parse_duration_seconds', elapsed, mode=METRICS.mode
+            )
+        if key is not None:
+            self.memo.store(key, result)
+        return result
@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from constants import BREAKER_RESET_TIMEOUT, BREAKER_THRESHOLD,\
+    RETRY_ATTEMPTS, RETRY_BACKOFF, RETRY_MAX_BACKOFF, RETRY_STATUSES
+from exceptions import CircuitOpenException
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Возвращает задержку из заголовка Retry-After в секундах.
+    Заголовок может содержать число секунд или HTTP-дату.
+
+    :param value: значение заголовка или None
+    :return: задержка в секундах или None, если заголовка нет
+    или его не удалось разобрать
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - time.time())
+
+
+class RetryPolicy:
+    """
+    Политика повторных запросов, общая для синхронного
+    и асинхронного транспорта. Повторяются запросы с ответами
+    из statuses, ошибками соединения и таймаутами.
+    Перед повтором выдерживается случайная задержка от нуля
+    до backoff * 2 ** попытка (не больше max_backoff),
+    а если сервер прислал Retry-After — указанное в нем время.
+    """
+
+    def __init__(
+        self,
+        attempts: int = RETRY_ATTEMPTS,
+        backoff: float = RETRY_BACKOFF,
+        max_backoff: float = RETRY_MAX_BACKOFF,
+        statuses: tuple = RETRY_STATUSES,
+    ) -> None:
+        """
+        :param attempts: число повторов после первой попытки
+        :param backoff: базовая задержка в секундах
+        :param max_backoff: наибольшая задержка в секундах
+        :param statuses: коды ответа, после которых запрос повторяется
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def should_retry(self, attempt: int, status: Optional[int] = None) -> bool:
+        """
+        Проверяет, нужно ли повторить запрос.
+
+        :param attempt: номер выполненной попытки, начиная с нуля
+        :param status: код ответа или None при ошибке соединения
+        :return: True, если запрос нужно повторить
+        """
+        if attempt >= self.attempts:
+            return False
+        return status is None or status in self.statuses
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Возвращает задержку перед повтором.
+
+        :param attempt: номер выполненной попытки, начиная с нуля
+        :param retry_after: значение заголовка Retry-After или None
+        :return: задержка в секундах
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_backoff)
+        cap = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи по хостам.
+    После threshold неудачных попыток подряд хост считается
+    недоступным, и запросы к нему сразу завершаются исключением
+    CircuitOpenException. Через reset_timeout секунд пропускается
+    пробный запрос: при успехе цепь замыкается, при ошибке снова
+    размыкается на reset_timeout секунд.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str) -> None:
+        """
+        Проверяет, можно ли отправить запрос к хосту.
+
+        :param host: хост запроса
+        :return: None
+        :raises CircuitOpenException: если цепь для хоста разомкнута
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return
+            if time.monotonic() - opened_at < self.reset_timeout:
+                raise CircuitOpenException(
+                    f'Хост {host} недоступен, запрос не отправлен'
+                )
+            # Пробный запрос: следующие ждут его результата
+            # еще reset_timeout секунд.
+            self._opened_at[host] = time.monotonic()
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold:
+                self._opened_at[host] = time.monotonic()
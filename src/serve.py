@@ -0,0 +1,250 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from configs import configure_logging, configure_serve_argument_parser
+from constants import MODE_ALL
+from main import MODE_TO_FUNCTION, expand_modes
+from metrics import METRICS
+from parsers import configure_parser
+
+# Режимы, результаты которых отдает сервис. Режим download
+# ничего не возвращает и в сервис не входит.
+SERVE_MODES = ('pep', 'whats-new', 'latest-versions')
+
+
+class Snapshot:
+    """
+    Последние результаты режимов, готовые к отдаче по HTTP.
+    Результаты сериализуются в JSON при обновлении, поэтому запрос
+    к сервису не требует ни загрузки и разбора страниц,
+    ни сериализации. Методы потокобезопасны.
+    """
+
+    def __init__(self) -> None:
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def update(self, mode: str, results: Iterable[Sequence[Any]]) -> None:
+        """
+        Заменяет результаты режима.
+
+        :param mode: режим работы
+        :param results: строки результатов, первая — заголовок
+        :return: None
+        """
+        rows = [list(row) for row in results]
+        body = json.dumps(
+            {
+                'mode': mode,
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+                'header': rows[0],
+                'rows': rows[1:],
+            },
+            ensure_ascii=False,
+        ).encode()
+        with self._lock:
+            self._bodies[mode] = body
+
+    def get(self, mode: str) -> Optional[bytes]:
+        """
+        Возвращает результаты режима в JSON.
+
+        :param mode: режим работы
+        :return: тело ответа или None, если режим еще не выполнялся
+        """
+        with self._lock:
+            return self._bodies.get(mode)
+
+
+def refresh_mode(session: Any, snapshot: Snapshot, mode: str) -> None:
+    """
+    Выполняет режим и обновляет его результаты в снимке.
+    Если режим завершился ошибкой, в снимке остаются прежние результаты.
+
+    :param session: Сессия для отправки запросов.
+    :param snapshot: снимок результатов
+    :param mode: режим работы
+    :return: None
+    """
+    METRICS.mode = mode
+    started = time.perf_counter()
+    try:
+        snapshot.update(mode, MODE_TO_FUNCTION[mode](session))
+    except Exception:
+        logging.exception(f'Не удалось обновить результаты режима {mode}')
+    else:
+        logging.info(f'Результаты режима {mode} обновлены')
+    METRICS.set(
+        'run_duration_seconds', time.perf_counter() - started, mode=mode
+    )
+
+
+def refresh(session: Any, snapshot: Snapshot, modes: List[str]) -> None:
+    """
+    Обновляет результаты режимов одновременно в потоках с общей сессией.
+
+    :param session: Сессия для отправки запросов.
+    :param snapshot: снимок результатов
+    :param modes: режимы работы
+    :return: None
+    """
+    with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+        for mode in modes:
+            executor.submit(refresh_mode, session, snapshot, mode)
+
+
+class Refresher(threading.Thread):
+    """
+    Фоновый поток, который обновляет снимок результатов сразу
+    после запуска и затем каждые interval секунд.
+    Сессия живет все время работы сервиса, поэтому обновления
+    используют прогретый HTTP-кеш, открытые соединения
+    и кеш извлеченных значений.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        snapshot: Snapshot,
+        modes: List[str],
+        interval: float
+    ) -> None:
+        """
+        :param session: Сессия для отправки запросов.
+        :param snapshot: снимок результатов
+        :param modes: режимы работы
+        :param interval: период обновления в секундах
+        """
+        super().__init__(name='refresher', daemon=True)
+        self.session = session
+        self.snapshot = snapshot
+        self.modes = modes
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            refresh(self.session, self.snapshot, self.modes)
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """Отдает результаты режима из снимка: GET /<режим>."""
+
+    server: 'SnapshotServer'
+
+    def do_GET(self) -> None:
+        mode = urlsplit(self.path).path.strip('/')
+        if mode not in self.server.modes:
+            self.send_json(404, {'error': f'Неизвестный режим {mode}'})
+            return
+        body = self.server.snapshot.get(mode)
+        if body is None:
+            self.send_json(
+                503,
+                {'error': f'Результаты режима {mode} еще не получены'},
+                [('Retry-After', '1')]
+            )
+            return
+        self.send_body(200, body)
+
+    def send_json(
+        self,
+        status: int,
+        data: Dict[str, Any],
+        headers: Iterable[Tuple[str, str]] = ()
+    ) -> None:
+        self.send_body(
+            status, json.dumps(data, ensure_ascii=False).encode(), headers
+        )
+
+    def send_body(
+        self,
+        status: int,
+        body: bytes,
+        headers: Iterable[Tuple[str, str]] = ()
+    ) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug(format % args)
+
+
+class SnapshotServer(ThreadingHTTPServer):
+    """HTTP-сервер, отдающий результаты режимов из снимка."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        snapshot: Snapshot,
+        modes: List[str]
+    ) -> None:
+        """
+        :param address: адрес и порт сервера
+        :param snapshot: снимок результатов
+        :param modes: режимы, результаты которых отдает сервер
+        """
+        self.snapshot = snapshot
+        self.modes = modes
+        super().__init__(address, SnapshotHandler)
+
+
+def main() -> None:
+    """
+    Запускает парсер как сервис: результаты режимов обновляются
+    в фоне с периодом --refresh и отдаются по HTTP в JSON
+    из памяти: GET /pep, /whats-new и /latest-versions.
+
+    :return: None
+    """
+    configure_logging()
+    logging.info('Сервис парсера запускается')
+
+    arg_parser = configure_serve_argument_parser([*SERVE_MODES, MODE_ALL])
+    args = arg_parser.parse_args()
+    logging.info(f'Аргументы командной строки: {args}')
+    configure_parser(args.parser)
+
+    from session import create_session
+    session = create_session(args)
+    if args.clear_cache:
+        session.cache.clear()
+        if session.extract_memo is not None:
+            session.extract_memo.clear()
+
+    modes = expand_modes(args.mode, SERVE_MODES)
+    snapshot = Snapshot()
+    refresher = Refresher(session, snapshot, modes, args.refresh)
+    refresher.start()
+    with SnapshotServer((args.host, args.port), snapshot, modes) as server:
+        host, port = server.server_address[:2]
+        logging.info(f'Сервис принимает запросы на http://{host}:{port}/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            refresher.stop()
+    logging.info('Сервис парсера остановлен')
+
+
+if __name__ == '__main__':
+    main()
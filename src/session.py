@@ -0,0 +1,270 @@
+import logging
+import socket
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from archive import ReplayAdapter, WarcArchive, WarcWriter
+from cache import ParserCache
+from constants import BASE_DIR, CACHE_NAME, CONCURRENCY, CONNECT_TIMEOUT,\
+    EXPIRE_AFTER, HOST_POOLS, NAME_DIR_STATE, NAME_FILE_EXTRACT_MEMO,\
+    NAME_FILE_PEP_STATE, PER_HOST_CONCURRENCY, PARSE_WORKERS, POOL_SIZE,\
+    REQUEST_TIMEOUT, URLS_EXPIRE_AFTER
+from limiter import HostRateLimiter
+from memo import ExtractMemo
+from metrics import METRICS
+from retry import CircuitBreaker, RetryPolicy
+from state import PepStateStore
+
+RETRY_METHODS = ('GET', 'HEAD')
+# TCP keep-alive не дает долго простаивающим соединениям пула
+# тихо оборваться на стороне сервера или промежуточных узлов.
+KEEP_ALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+
+class ParserAdapter(HTTPAdapter):
+    """
+    Транспорт синхронной сессии парсера.
+    Повторяет GET и HEAD запросы по политике RetryPolicy
+    и не отправляет запросы к хостам, для которых разомкнут
+    CircuitBreaker. Каждая попытка ждет токен ограничителя
+    частоты запросов к хосту, если он задан.
+    Запросам без таймаута назначается timeout.
+    Ответы из кеша сессии до транспорта не доходят, поэтому
+    не повторяются и не расходуют токены ограничителя.
+    Соединения переиспользуются из пула; при keep_alive сокетам
+    пула включается TCP keep-alive.
+    """
+
+    def __init__(
+        self,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        timeout: Union[None, float, Tuple[float, float]] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        keep_alive: bool = True,
+        **kwargs
+    ) -> None:
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **pool_kwargs) -> None:
+        if self.keep_alive:
+            pool_kwargs.setdefault(
+                'socket_options', KEEP_ALIVE_SOCKET_OPTIONS
+            )
+        super().init_poolmanager(*args, **pool_kwargs)
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs
+    ) -> requests.Response:
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        host = urlparse(request.url).netloc
+        retryable = request.method in RETRY_METHODS
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_request(host)
+            if self.rate_limiter is not None:
+                time.sleep(self.rate_limiter.reserve(host))
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(host, success=False)
+                if not (
+                    retryable and self.retry_policy.should_retry(attempt)
+                ):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                status = response.status_code
+                self._record(host, success=status < 500)
+                if not (retryable and self.retry_policy.should_retry(
+                    attempt, status
+                )):
+                    return response
+                delay = self.retry_policy.delay(
+                    attempt, response.headers.get('Retry-After')
+                )
+                response.close()
+            METRICS.inc('retries_total')
+            logging.warning(
+                f'Повтор запроса {request.url} через {delay:.2f} с'
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def _record(self, host: str, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success(host)
+        else:
+            self.breaker.record_failure(host)
+
+
+class ParserSession(requests_cache.CachedSession):
+    """
+    Кеширующая сессия парсера.
+    Помимо кеша хранит настройки сетевого слоя,
+    которыми пользуется асинхронный загрузчик страниц,
+    и хранилище состояния PEP для инкрементального обхода.
+    Политика повторов, размыкатель цепи и ограничитель частоты
+    запросов общие для синхронных запросов сессии
+    и асинхронного загрузчика.
+    Транспорт держит по pool_size соединений на хост и пулы
+    для pool_connections хостов, чтобы потоки пула переиспользовали
+    открытые TLS-соединения, а таймаут
+    установки соединения connect_timeout задается отдельно от timeout.
+    Без keep_alive запросы отправляются с заголовком Connection: close.
+    parse_workers задает число процессов, в которых асинхронные режимы
+    разбирают загруженные страницы, а extract_memo — кеш извлеченных
+    из страниц значений.
+    С recorder ответы записываются в архив WARC, а с archive
+    запросы обслуживаются из архива без сети.
+    fetcher — асинхронный загрузчик, открытый на время запуска
+    нескольких режимов, чтобы они делили его пул соединений и лимиты.
+    shard — номер шарда и число шардов, на которые делятся
+    карточки PEP, или None, если обрабатываются все карточки.
+    shards_dir — директория результатов шардов или None,
+    если используется директория по умолчанию.
+    """
+
+    def __init__(
+        self,
+        *args,
+        concurrency: int = CONCURRENCY,
+        per_host: int = PER_HOST_CONCURRENCY,
+        pool_size: int = POOL_SIZE,
+        pool_connections: int = HOST_POOLS,
+        timeout: float = REQUEST_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        keep_alive: bool = True,
+        pep_state: Optional[PepStateStore] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        parse_workers: int = PARSE_WORKERS,
+        extract_memo: Optional[ExtractMemo] = None,
+        recorder: Optional[WarcWriter] = None,
+        archive: Optional[WarcArchive] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        shards_dir: Optional[Path] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.pool_size = pool_size
+        self.pool_connections = pool_connections
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.keep_alive = keep_alive
+        self.pep_state = pep_state
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self.parse_workers = parse_workers
+        self.extract_memo = extract_memo
+        self.recorder = recorder
+        self.archive = archive
+        self.fetcher = None
+        self.shard = shard
+        self.shards_dir = shards_dir
+        adapter = ParserAdapter(
+            self.retry_policy,
+            self.breaker,
+            (connect_timeout, timeout),
+            rate_limiter,
+            keep_alive=keep_alive,
+            pool_connections=pool_connections,
+            pool_maxsize=max(pool_size, concurrency),
+        )
+        if archive is not None:
+            adapter = ReplayAdapter(archive)
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+
+def create_pep_state(cli_args: Any) -> Optional[PepStateStore]:
+    """
+    Создает хранилище состояния PEP по аргументам командной строки.
+    С --record и --replay состояние не используется: при записи
+    архив должен содержать каждую карточку, а при воспроизведении
+    статусы берутся только из архива и не меняют состояние на диске.
+    С --shard I/N у шарда свой файл pep_state-I-of-N.json: шарды,
+    запущенные на одной машине, не перезаписывают состояние друг друга.
+
+    :param cli_args: аргументы командной строки
+    :return: объект PepStateStore или None
+    """
+    if cli_args.record or cli_args.replay:
+        return None
+    path = BASE_DIR / NAME_DIR_STATE / NAME_FILE_PEP_STATE
+    if cli_args.shard:
+        index, count = cli_args.shard
+        path = path.with_name(f'{path.stem}-{index}-of-{count}{path.suffix}')
+    return PepStateStore(path, full=cli_args.full)
+
+
+def create_session(cli_args: Any) -> ParserSession:
+    """
+    Создает сессию парсера по аргументам командной строки.
+    Время жизни записей кеша задается по шаблонам URL: индексы
+    устаревают быстро, страницы PEP и статьи whatsnew — медленно.
+    Устаревшие записи с заголовками ETag или Last-Modified
+    перепроверяются условным запросом, и ответ 304 продлевает их
+    без повторной загрузки тела.
+    Ответы хранятся сжатыми в ParserCache, размер которого ограничен
+    --cache-size мегабайт.
+    Значения, извлеченные из страниц, сохраняются в кеш извлечения,
+    если не передан флаг --no-memo.
+    С --replay сессия отвечает из архива WARC и использует кеш
+    в памяти, чтобы не смешивать архив с HTTP-кешем на диске.
+
+    :param cli_args: аргументы командной строки
+    :return: объект ParserSession
+    """
+    return ParserSession(
+        backend='memory' if cli_args.replay else ParserCache(
+            CACHE_NAME, max_size=cli_args.cache_size * 1024 * 1024
+        ),
+        expire_after=EXPIRE_AFTER,
+        urls_expire_after=URLS_EXPIRE_AFTER,
+        concurrency=cli_args.concurrency,
+        per_host=cli_args.per_host,
+        pool_size=cli_args.pool_size,
+        pool_connections=cli_args.pool_connections,
+        timeout=cli_args.timeout,
+        connect_timeout=cli_args.connect_timeout,
+        keep_alive=not cli_args.no_keep_alive,
+        pep_state=create_pep_state(cli_args),
+        retry_policy=RetryPolicy(attempts=cli_args.retries),
+        rate_limiter=(
+            HostRateLimiter(cli_args.rate, cli_args.burst)
+            if cli_args.rate else None
+        ),
+        parse_workers=cli_args.parse_workers,
+        extract_memo=None if cli_args.no_memo else ExtractMemo(
+            BASE_DIR / NAME_DIR_STATE / NAME_FILE_EXTRACT_MEMO
+        ),
+        recorder=WarcWriter(cli_args.record) if cli_args.record else None,
+        shard=cli_args.shard,
+        shards_dir=cli_args.shards_dir,
+        archive=WarcArchive(cli_args.replay) if cli_args.replay else None,
+    )
@@ -0,0 +1,112 @@
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+from exceptions import ShardMergeException
+
+# Шард задается номером от 1 до числа шардов и числом шардов.
+Shard = Tuple[int, int]
+
+
+def shard_path(directory: Path, shard: Shard) -> Path:
+    """
+    Возвращает путь к файлу результатов шарда.
+
+    :param directory: директория результатов шардов
+    :param shard: кортеж (номер шарда, число шардов)
+    :return: путь к файлу pep-<номер>-of-<число>.json
+    """
+    index, count = shard
+    return directory / f'pep-{index}-of-{count}.json'
+
+
+def save_shard(
+    directory: Path,
+    shard: Shard,
+    result_status: Dict[str, int],
+    index_digest: str
+) -> Path:
+    """
+    Сохраняет счетчики статусов шарда в JSON вместе с отпечатком
+    индекса PEP, по которому шард построен.
+    Итог Total не сохраняется: при объединении он пересчитывается
+    по сумме счетчиков всех шардов.
+
+    :param directory: директория результатов шардов
+    :param shard: кортеж (номер шарда, число шардов)
+    :param result_status: словарь с количеством PEP по статусам
+    :param index_digest: отпечаток полной очереди карточек PEP
+    :return: путь к сохраненному файлу
+    """
+    index, count = shard
+    directory.mkdir(parents=True, exist_ok=True)
+    path = shard_path(directory, shard)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='UTF-8') as file:
+        json.dump(
+            {
+                'shard': index,
+                'shards': count,
+                'index': index_digest,
+                'counts': {
+                    status: number
+                    for status, number in result_status.items()
+                    if status != 'Total'
+                },
+            },
+            file,
+            ensure_ascii=False,
+            indent=1,
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def merge_shards(directory: Path) -> Dict[str, int]:
+    """
+    Объединяет счетчики статусов всех шардов одного разбиения
+    и пересчитывает Total. Шарды должны быть построены по одному
+    снимку индекса PEP: иначе карточки могут быть учтены дважды
+    или пропущены.
+
+    :param directory: директория результатов шардов
+    :return: словарь с количеством PEP по статусам и Total
+    :raises ShardMergeException: если результатов нет, в директории
+    результаты разных разбиений или разных снимков индекса
+    или не хватает шардов
+    """
+    shards: Dict[int, Dict[str, int]] = {}
+    counts = set()
+    digests = set()
+    for path in sorted(directory.glob('pep-*-of-*.json')):
+        with open(path, encoding='UTF-8') as file:
+            data = json.load(file)
+        shards[data['shard']] = data['counts']
+        counts.add(data['shards'])
+        digests.add(data.get('index'))
+    if not shards:
+        raise ShardMergeException(f'В {directory} нет результатов шардов pep')
+    if len(counts) > 1:
+        raise ShardMergeException(
+            f'В {directory} результаты разных разбиений: '
+            f'{sorted(counts)} шардов'
+        )
+    if len(digests) > 1:
+        raise ShardMergeException(
+            f'В {directory} результаты шардов, построенных по разным '
+            'снимкам индекса PEP; удалите результаты прежних запусков'
+        )
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - set(shards))
+    if missing:
+        raise ShardMergeException(
+            f'Нет результатов шардов {missing} из {count}'
+        )
+    result_status = defaultdict(int)
+    for index in sorted(shards):
+        for status, number in shards[index].items():
+            result_status[status] += number
+    result_status['Total'] = sum(result_status.values())
+    return result_status
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class PepStateStore:
+    """
+    Локальное хранилище состояния PEP между запусками парсера.
+    Для каждой карточки PEP хранит текст ссылающейся на нее строки
+    индекса и статус из карточки. Если строка индекса не изменилась,
+    статус карточки берется из хранилища без загрузки страницы.
+    """
+
+    def __init__(self, path: Path, full: bool = False) -> None:
+        """
+        :param path: путь к JSON-файлу с состоянием
+        :param full: игнорировать сохраненные статусы карточек,
+        но обновить состояние по результатам обхода
+        """
+        self.path = path
+        self.full = full
+        self._states: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        if self._states is None:
+            self._states = self._load()
+        return self._states
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding='UTF-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            logging.exception(
+                f'Не удалось прочитать состояние PEP: {self.path}'
+            )
+            return {}
+
+    def lookup(self, url: str, index_row: str) -> Optional[str]:
+        """
+        Возвращает сохраненный статус карточки PEP,
+        если строка индекса совпадает с сохраненной.
+
+        :param url: URL карточки PEP
+        :param index_row: текст строки индекса
+        :return: статус карточки или None, если карточку нужно загрузить
+        """
+        if self.full:
+            return None
+        state = self.states.get(url)
+        if state is None or state.get('index_row') != index_row:
+            return None
+        return state['card_status']
+
+    def remember(self, url: str, index_row: str, card_status: str) -> None:
+        """
+        Запоминает строку индекса и статус загруженной карточки PEP.
+
+        :param url: URL карточки PEP
+        :param index_row: текст строки индекса
+        :param card_status: статус PEP в карточке
+        :return: None
+        """
+        self.states[url] = {
+            'index_row': index_row,
+            'card_status': card_status,
+        }
+
+    def save(self) -> None:
+        """
+        Атомарно сохраняет состояние в JSON-файл. Временный файл
+        у каждого сохранения свой, поэтому процессы, одновременно
+        сохраняющие состояние в один файл, не мешают друг другу.
+
+        :return: None
+        """
+        if self._states is None:
+            return
+        self.path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            suffix='.tmp', prefix=self.path.name + '.', dir=self.path.parent
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='UTF-8') as file:
+                json.dump(self._states, file, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
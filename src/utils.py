@@ -1,11 +1,58 @@
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Any, Optional
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List,\
+    Optional, Tuple
 
-from bs4 import BeautifulSoup, NavigableString, ResultSet
+import requests
 from requests import RequestException
-import requests_cache
 
-from exceptions import EmptyResponseExeption, ParserFindTagException
+from constants import CONCURRENCY, DOWNLOAD_CHUNK_SIZE, PART_SUFFIX,\
+    SECTIONS
+from exceptions import CircuitOpenException, DownloadIntegrityException,\
+    EmptyResponseExeption, ParserFindTagException
+from metrics import METRICS
+from parsers import Strainer, parse_html
+
+# Тяжелые библиотеки загружаются внутри функций, которые их используют,
+# чтобы каждый режим платил при запуске только за свои зависимости.
+if TYPE_CHECKING:
+    import requests_cache
+    from bs4 import BeautifulSoup, NavigableString, ResultSet
+
+    from fetcher import AsyncFetcher
+
+# Фильтры для частичного разбора страниц: BeautifulSoup строит дерево
+# только из совпавших тегов и их потомков, остальная разметка пропускается.
+WHATS_NEW_INDEX_STRAINER = Strainer(
+    'section', attrs={'id': 'what-s-new-in-python'}
+)
+WHATS_NEW_STRAINER = Strainer(['h1', 'dl'])
+VERSIONS_STRAINER = Strainer(
+    'div', attrs={'class': 'sphinxsidebarwrapper'}
+)
+DOWNLOAD_STRAINER = Strainer('table')
+PEP_INDEX_STRAINER = Strainer('section', attrs={'id': SECTIONS})
+PEP_STATUS_STRAINER = Strainer('dl', attrs={'class': 'rfc2822'})
+PEP_CONTENT_STRAINER = Strainer('section', attrs={'id': 'pep-content'})
+
+
+def progress(iterable: Iterable[Any], **kwargs: Any) -> Iterator[Any]:
+    """
+    Оборачивает итерируемый объект индикатором выполнения tqdm.
+
+    :param iterable: итерируемый объект
+    :param kwargs: параметры tqdm
+    :return: итератор по элементам с индикатором выполнения
+    """
+    from tqdm import tqdm
+    return tqdm(iterable, **kwargs)
 
 
 def get_response(
@@ -16,16 +63,76 @@ def get_response(
     и возвращает ответ в виде объекта Response.
     Если возникает ошибка при загрузке страницы,
     функция записывает информацию об ошибке в лог.
+    Время, источник и размер ответа учитываются в метриках.
+    Если у сессии есть WarcWriter, ответ записывается в архив.
 
     :param session: объект сессии
     :param url: URL страницы
     :return: объект Response или None,
     если возникла ошибка при загрузке страницы
     """
+    started = time.perf_counter()
     try:
         response = session.get(url)
+        METRICS.record_response(response, time.perf_counter() - started)
+        recorder = getattr(session, 'recorder', None)
+        if recorder is not None:
+            recorder.record(response)
         return response
     except RequestException:
+        METRICS.inc('request_errors_total')
+        logging.exception(
+            f'Возникла ошибка при загрузке страницы {url}',
+            stack_info=True
+        )
+
+
+def iter_responses(
+    session: requests_cache.CachedSession, urls: List[str]
+) -> Iterator[Optional[requests_cache.AnyResponse]]:
+    """
+    Загружает страницы параллельно в пуле потоков и отдает ответы
+    по мере готовности в том же порядке, что и переданные URL.
+    Число потоков ограничено настройкой concurrency сессии парсера.
+
+    :param session: объект сессии
+    :param urls: список URL страниц
+    :return: итератор объектов Response или None для страниц,
+    которые не удалось загрузить
+    """
+    max_workers = getattr(session, 'concurrency', CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from progress(
+            executor.map(lambda url: get_response(session, url), urls),
+            total=len(urls)
+        )
+
+
+async def async_get_response(
+    fetcher: AsyncFetcher, url: str
+) -> Optional[requests_cache.AnyResponse]:
+    """
+    Асинхронно загружает страницу по указанному URL
+    с помощью переданного загрузчика и возвращает ответ.
+    Если возникает ошибка при загрузке страницы,
+    функция записывает информацию об ошибке в лог.
+
+    :param fetcher: объект AsyncFetcher
+    :param url: URL страницы
+    :return: объект Response или None,
+    если возникла ошибка при загрузке страницы
+    """
+    import aiohttp
+    started = time.perf_counter()
+    try:
+        response = await fetcher.get(url)
+        METRICS.record_response(response, time.perf_counter() - started)
+        return response
+    except (
+        aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenException,
+        RequestException
+    ):
+        METRICS.inc('request_errors_total')
         logging.exception(
             f'Возникла ошибка при загрузке страницы {url}',
             stack_info=True
@@ -45,7 +152,8 @@ def find_tag(
     :param attrs: словарь атрибутов тега (по умолчанию None)
     :return: найденный тег
     """
-    searched_tag = soup.find(tag, attrs=(attrs or {}))
+    with METRICS.timer('find_duration_seconds', mode=METRICS.mode):
+        searched_tag = soup.find(tag, attrs=(attrs or {}))
     if searched_tag is None:
         error_msg = f'Не найден тег {tag} {attrs}'
         logging.error(error_msg, stack_info=True)
@@ -66,7 +174,8 @@ def find_all_tags(
     :param attrs: словарь атрибутов тега (по умолчанию None)
     :return: список найденных тегов
     """
-    searched_tags = soup.find_all(tag, attrs=(attrs or {}))
+    with METRICS.timer('find_duration_seconds', mode=METRICS.mode):
+        searched_tags = soup.find_all(tag, attrs=(attrs or {}))
     if searched_tags is None:
         error_msg = f'Не найден тег {tag} {attrs}'
         logging.error(error_msg, stack_info=True)
@@ -74,14 +183,256 @@ def find_all_tags(
     return searched_tags
 
 
-def get_soup(response: requests_cache.AnyResponse) -> BeautifulSoup:
+def index_row_text(tr: Any) -> str:
     """
-    Возвращает объект BeautifulSoup из переданного response.
+    Возвращает текст строки индекса PEP вместе с подсказкой title
+    тега abbr, в которой индекс расшифровывает тип и статус PEP.
+    По нему определяется, изменилась ли строка индекса с прошлого
+    запуска: буквенный статус у Draft и Active один и тот же.
+
+    :param tr: тег строки индекса
+    :return: текст строки с нормализованными пробелами
+    """
+    abbr = tr.find('abbr')
+    title = abbr.get('title', '') if abbr is not None else ''
+    return ' '.join([title, *tr.text.split()])
+
+
+def get_soup(
+    response: requests_cache.AnyResponse,
+    parse_only: Optional[Strainer] = None
+) -> BeautifulSoup:
+    """
+    Возвращает дерево страницы из переданного response,
+    разобранное выбранным HTML-парсером.
+    Если передан фильтр parse_only, парсер bs4 строит дерево
+    только из совпавших с ним тегов.
 
     :response: объект Response
-    :return: объект BeautifulSoup
+    :param parse_only: фильтр Strainer (по умолчанию None)
+    :return: объект BeautifulSoup или узел Node другого парсера
     :raises EmptyDataSoupExeption: если поступил пустой response
     """
     if response is None:
         raise EmptyResponseExeption('Пустой респонс для soup')
-    return BeautifulSoup(response.text, features='lxml')
+    return parse_text(response.text, parse_only)
+
+
+def parse_text(text: str, parse_only: Optional[Strainer] = None) -> Any:
+    """
+    Возвращает дерево страницы, разобранное выбранным HTML-парсером,
+    и учитывает время разбора в метриках.
+
+    :param text: HTML-код страницы
+    :param parse_only: фильтр Strainer (по умолчанию None)
+    :return: объект BeautifulSoup или узел Node другого парсера
+    """
+    with METRICS.timer('parse_duration_seconds', mode=METRICS.mode):
+        return parse_html(text, parse_only)
+
+
+def extract_pep_status_text(text: str) -> str:
+    """
+    Возвращает статус из HTML-кода карточки PEP.
+    Статус ищется в списке полей заголовка PEP; если его разметка
+    изменилась, статус ищется во всем блоке pep-content.
+    Парсер bs4 разбирает только эти блоки, а lxml и selectolax
+    фильтр не учитывают, поэтому поиск ограничивается блоком явно:
+    abbr встречается и вне заголовка PEP.
+    Принимает и возвращает строки, поэтому может выполняться
+    в процессе пула ParsePool.
+
+    :param text: HTML-код страницы PEP
+    :return: статус PEP
+    """
+    soup = parse_text(text, PEP_STATUS_STRAINER)
+    dl = soup.find('dl', attrs={'class': 'rfc2822'})
+    abbr = dl.find('abbr') if dl is not None else None
+    if abbr is None:
+        soup = parse_text(text, PEP_CONTENT_STRAINER)
+        section = find_tag(soup, 'section', {'id': 'pep-content'})
+        abbr = find_tag(section, 'abbr')
+    return abbr.text
+
+
+def extract_whats_new_text(text: str) -> Tuple[str, str]:
+    """
+    Возвращает заголовок и текст списка с редактором и автором
+    из HTML-кода статьи whatsnew. Разбираются только теги h1 и dl.
+    Принимает и возвращает строки, поэтому может выполняться
+    в процессе пула ParsePool.
+
+    :param text: HTML-код страницы статьи
+    :return: кортеж (заголовок, редактор/автор)
+    """
+    soup = parse_text(text, WHATS_NEW_STRAINER)
+    h1 = find_tag(soup, 'h1')
+    dl = find_tag(soup, 'dl')
+    return h1.text, dl.text.replace('\n', ' ')
+
+
+def extract_cached(
+    session: requests_cache.CachedSession,
+    function: Callable[[str], Any],
+    response: requests_cache.AnyResponse
+) -> Any:
+    """
+    Извлекает значение из страницы функцией извлечения.
+    Если у сессии есть кеш извлечения ExtractMemo, страница с уже
+    известным содержимым не разбирается.
+
+    :param session: объект сессии
+    :param function: функция извлечения, например extract_pep_status_text
+    :param response: объект Response страницы
+    :return: извлеченное значение
+    :raises EmptyResponseExeption: если поступил пустой response
+    """
+    if response is None:
+        raise EmptyResponseExeption('Пустой респонс для извлечения')
+    memo = getattr(session, 'extract_memo', None)
+    if memo is None:
+        return function(response.text)
+    return memo.extract(function, response.text)
+
+
+def get_remote_mtime(headers: Any) -> Optional[float]:
+    """
+    Возвращает время изменения файла на сервере
+    из заголовка Last-Modified в виде timestamp.
+
+    :param headers: заголовки ответа
+    :return: timestamp или None, если заголовка нет или он некорректен
+    """
+    last_modified = headers.get('Last-Modified')
+    if last_modified is None:
+        return None
+    try:
+        return parsedate_to_datetime(last_modified).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_file_actual(
+    path: Path, remote_size: Optional[int], remote_mtime: Optional[float]
+) -> bool:
+    """
+    Проверяет, совпадает ли локальный файл с файлом на сервере
+    по размеру и, если известно, по времени изменения.
+
+    :param path: путь к локальному файлу
+    :param remote_size: размер файла на сервере
+    :param remote_mtime: время изменения файла на сервере
+    :return: True, если файл можно не загружать
+    """
+    if remote_size is None or not path.exists():
+        return False
+    stat = path.stat()
+    if stat.st_size != remote_size:
+        return False
+    return remote_mtime is None or int(stat.st_mtime) == int(remote_mtime)
+
+
+def uncached_session(session: requests.Session) -> requests.Session:
+    """
+    Возвращает сессию без HTTP-кеша с заголовками и транспортом session:
+    запросы через нее проходят те же повторы, лимиты и архив WARC,
+    но не читают и не пишут кеш. Транспорт принадлежит session,
+    поэтому возвращенную сессию не нужно закрывать.
+
+    :param session: объект сессии
+    :return: объект requests.Session
+    """
+    plain = requests.Session()
+    plain.headers.update(session.headers)
+    for prefix, adapter in session.adapters.items():
+        plain.mount(prefix, adapter)
+    return plain
+
+
+def download_file(
+    session: requests_cache.CachedSession, url: str, path: Path
+) -> bool:
+    """
+    Потоково скачивает файл по частям во временный файл рядом с path
+    и атомарно переименовывает его после проверки размера.
+    Прерванная загрузка продолжается Range-запросом с If-Range,
+    поэтому изменившийся на сервере файл будет скачан заново.
+    Если локальный файл совпадает с файлом на сервере, загрузка
+    пропускается. Запросы выполняются в обход HTTP-кеша через
+    отдельную сессию uncached_session, поэтому кеш общей сессии
+    продолжает работать для режимов, запущенных одновременно.
+    Если у сессии есть WarcWriter, файл записывается в архив
+    с заголовками ответа на HEAD-запрос.
+
+    :param session: объект сессии
+    :param url: URL файла
+    :param path: путь для сохранения файла
+    :return: True, если файл был загружен, False, если он уже актуален
+    :raises DownloadIntegrityException: если размер файла не совпал
+    """
+    plain = uncached_session(session)
+    head = plain.head(url, allow_redirects=True)
+    head.raise_for_status()
+    length = head.headers.get('Content-Length')
+    remote_size = int(length) if length is not None else None
+    remote_mtime = get_remote_mtime(head.headers)
+    if is_file_actual(path, remote_size, remote_mtime):
+        record_download(session, url, head.headers, path)
+        return False
+
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    if remote_size is not None and offset >= remote_size:
+        offset = 0
+    headers = {}
+    validator = head.headers.get('ETag') or head.headers.get(
+        'Last-Modified'
+    )
+    if offset and validator is not None:
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator}
+
+    started = time.perf_counter()
+    with plain.get(url, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        mode = 'ab' if response.status_code == 206 else 'wb'
+        with open(part_path, mode) as file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+                METRICS.inc(
+                    'response_bytes_total', len(chunk), source='network'
+                )
+    METRICS.observe(
+        'request_duration_seconds', time.perf_counter() - started,
+        source='network'
+    )
+    METRICS.inc('requests_total', source='network')
+
+    size = part_path.stat().st_size
+    if remote_size is not None and size != remote_size:
+        part_path.unlink()
+        raise DownloadIntegrityException(
+            f'Размер файла {path.name} {size} байт, '
+            f'ожидалось {remote_size} байт'
+        )
+    os.replace(part_path, path)
+    if remote_mtime is not None:
+        os.utime(path, (remote_mtime, remote_mtime))
+    record_download(session, url, head.headers, path)
+    return True
+
+
+def record_download(
+    session: requests_cache.CachedSession, url: str, headers: Any, path: Path
+) -> None:
+    """
+    Записывает скачанный файл в архив WARC сессии, если он задан.
+
+    :param session: объект сессии
+    :param url: URL файла
+    :param headers: заголовки ответа на HEAD-запрос
+    :param path: путь к скачанному файлу
+    :return: None
+    """
+    recorder = getattr(session, 'recorder', None)
+    if recorder is not None:
+        recorder.write(url, 200, 'OK', headers.items(), path.read_bytes())
@@ -1,5 +1,7 @@
 import pytest
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from bs4 import BeautifulSoup
 import requests_mock
@@ -110,3 +112,69 @@ def records():
         result = results[mode]
         return converting(result)
     return _records
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Отвечает 503 на первые `failures` запросов, затем 200"""
+    failures = 2
+    hits = 0
+
+    def do_GET(self):
+        cls = type(self)
+        cls.hits += 1
+        if cls.hits <= cls.failures:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'PEP 8'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_url():
+    """Start a local HTTP server with FlakyHandler"""
+    FlakyHandler.hits = 0
+    FlakyHandler.failures = 2
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/pep-8'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mocked_pages():
+    """Serve the fixture_data.pages corpus and the PDF archive it links"""
+    from fixture_data.pages import ARCHIVE_URL, PAGES
+    with requests_mock.Mocker() as mock:
+        for url, page in PAGES.items():
+            mock.get(
+                url,
+                text=page,
+                headers={'Content-Type': 'text/html; charset=utf-8'}
+            )
+        mock.head(ARCHIVE_URL, headers={'Content-Length': '3'})
+        mock.get(ARCHIVE_URL, content=b'zip')
+        yield mock
+
+
+@pytest.fixture
+def metrics():
+    """Reset the shared metrics registry around a test of the pep mode"""
+    # Модули src импортируют друг друга без префикса пакета,
+    # поэтому общий реестр метрик берется из модуля main.
+    metrics = main.METRICS
+    metrics.reset()
+    metrics.mode = 'pep'
+    yield metrics
+    metrics.reset()
+    metrics.mode = ''
@@ -0,0 +1,145 @@
+"""
+Небольшой корпус страниц с разметкой docs.python.org и peps.python.org.
+Используется для сверки результатов разных HTML-парсеров.
+"""
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+MAIN_PEP_URL = 'https://peps.python.org/'
+ARCHIVE_URL = MAIN_DOC_URL + 'archives/python-3.11.4-docs-pdf-a4.zip'
+
+WHATS_NEW_INDEX = '''
+<html><head><title>What’s New in Python</title></head><body>
+<div class="body" role="main">
+<section id="what-s-new-in-python">
+<h1>What’s New in Python<a class="headerlink" href="#what-s-new">¶</a></h1>
+<div class="toctree-wrapper compound">
+<ul>
+<li class="toctree-l1"><a class="reference internal" href="3.11.html">
+What’s New In Python 3.11</a>
+<ul><li class="toctree-l2"><a href="3.11.html#summary">Summary</a></li></ul>
+</li>
+<li class="toctree-l1"><a class="reference internal" href="3.10.html">
+What’s New In Python 3.10</a></li>
+</ul>
+</div>
+</section>
+</div>
+</body></html>
+'''
+
+
+def whats_new_article(version, editor):
+    return f'''
+<html><body>
+<div class="related"><h3>Navigation</h3></div>
+<section id="what-s-new-in-python-{version}">
+<h1>What’s New In Python {version}<a class="headerlink" href="#">¶</a></h1>
+<dl class="field-list simple">
+<dt class="field-odd">Editor<span class="colon">:</span></dt>
+<dd class="field-odd"><p>{editor}</p>
+</dd>
+</dl>
+<p>This article explains the new features in Python {version}.</p>
+<dl class="py function"><dt>example()</dt><dd>Not the header.</dd></dl>
+</section>
+</body></html>
+'''
+
+
+DOC_INDEX = '''
+<html><body>
+<div class="sphinxsidebar" role="navigation">
+<div class="sphinxsidebarwrapper">
+<h3>Download</h3>
+<ul><li><a href="download.html">Download these documents</a></li></ul>
+<h3>Docs by version</h3>
+<ul>
+<li><a href="https://docs.python.org/3.12/">Python 3.12 (in development)</a></li>
+<li><a href="https://docs.python.org/3.11/">Python 3.11 (stable)</a></li>
+<li><a href="https://docs.python.org/2.7/">Python 2.7 (EOL)</a></li>
+<li><a href="https://www.python.org/doc/versions/">All versions</a></li>
+</ul>
+</div>
+</div>
+</body></html>
+'''
+
+DOWNLOAD = '''
+<html><body>
+<table class="docutils">
+<tr><th>Format</th><th>Packed as .zip</th></tr>
+<tr><td>PDF (US-Letter paper size)</td>
+<td><a href="archives/python-3.11.4-docs-pdf-letter.zip">Download</a></td></tr>
+<tr><td>PDF (A4 paper size)</td>
+<td><a href="archives/python-3.11.4-docs-pdf-a4.zip">Download</a></td></tr>
+</table>
+</body></html>
+'''
+
+
+def pep_row(status, number):
+    return f'''
+<tr class="row-odd">
+<td><abbr title="{status}">{status}</abbr></td>
+<td><a class="pep reference internal" href="pep-{number:04d}/">{number}</a>
+</td><td>Title of PEP {number}</td><td>Author</td>
+</tr>
+'''
+
+
+PEP_INDEX = f'''
+<html><body>
+<section id="index-by-category">
+<section id="meta-peps"><table class="pep-zero-table"><tbody>
+{pep_row('PA', 1)}{pep_row('PF', 8)}
+</tbody></table></section>
+</section>
+<section id="numerical-index"><table class="pep-zero-table"><tbody>
+{pep_row('PA', 1)}{pep_row('PF', 8)}{pep_row('S', 9)}{pep_row('SW', 42)}
+</tbody></table></section>
+<section id="reserved-pep-numbers"><table><tbody>
+{pep_row('I', 801)}
+</tbody></table></section>
+</body></html>
+'''
+
+
+def pep_card(number, status):
+    return f'''
+<html><body>
+<nav><ul class="breadcrumbs"><li><a href="../">
+<abbr title="Python Enhancement Proposals">PEP</abbr> Index</a></li></ul></nav>
+<article>
+<section id="pep-content">
+<h1 class="page-title">PEP {number} – Title</h1>
+<dl class="rfc2822 field-list simple">
+<dt class="field-odd">Author<span class="colon">:</span></dt>
+<dd class="field-odd">Author</dd>
+<dt class="field-even">Status<span class="colon">:</span></dt>
+<dd class="field-even"><abbr title="Status">{status}</abbr></dd>
+<dt class="field-odd">Type<span class="colon">:</span></dt>
+<dd class="field-odd"><abbr title="Type">Process</abbr></dd>
+</dl>
+<p>Body of PEP {number}.</p>
+</section>
+</article>
+</body></html>
+'''
+
+
+PAGES = {
+    MAIN_DOC_URL: DOC_INDEX,
+    MAIN_DOC_URL + 'whatsnew/': WHATS_NEW_INDEX,
+    MAIN_DOC_URL + 'whatsnew/3.11.html': whats_new_article(
+        '3.11', 'Pablo Galindo Salgado'
+    ),
+    MAIN_DOC_URL + 'whatsnew/3.10.html': whats_new_article(
+        '3.10', 'Pablo Galindo Salgado'
+    ),
+    MAIN_DOC_URL + 'download.html': DOWNLOAD,
+    MAIN_PEP_URL: PEP_INDEX,
+    MAIN_PEP_URL + 'pep-1': pep_card(1, 'Active'),
+    MAIN_PEP_URL + 'pep-8': pep_card(8, 'Final'),
+    MAIN_PEP_URL + 'pep-9': pep_card(9, 'Withdrawn'),
+    MAIN_PEP_URL + 'pep-42': pep_card(42, 'Withdrawn'),
+    MAIN_PEP_URL + 'pep-801': pep_card(801, 'Draft'),
+}
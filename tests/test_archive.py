@@ -0,0 +1,150 @@
+import asyncio
+from argparse import Namespace
+
+import pytest
+import requests_mock
+
+from fixture_data.pages import ARCHIVE_URL, MAIN_PEP_URL, PAGES
+try:
+    from src import archive, async_main, configs, main
+    from src.session import ParserSession, create_session
+    from src.state import PepStateStore
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `archive.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `archive.py`'
+
+MODES = ['whats-new', 'latest-versions', 'pep']
+
+
+@pytest.fixture
+def recorded(monkeypatch, tmp_path, mocked_pages):
+    path = tmp_path / 'snapshot.warc.gz'
+    (tmp_path / 'record').mkdir()
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path / 'record')
+    session = ParserSession(
+        backend='memory', recorder=archive.WarcWriter(path)
+    )
+    results = {
+        mode: main.MODE_TO_FUNCTION[mode](session) for mode in MODES
+    }
+    main.download(session)
+    # Пока заглушка активна, она подменяет адаптер воспроизведения.
+    mocked_pages.stop()
+    return path, results
+
+
+def test_replay_sync_modes(monkeypatch, tmp_path, recorded):
+    path, expected = recorded
+    (tmp_path / 'replay').mkdir()
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path / 'replay')
+    session = ParserSession(
+        backend='memory', archive=archive.WarcArchive(path)
+    )
+    for mode in MODES:
+        assert main.MODE_TO_FUNCTION[mode](session) == expected[mode], (
+            f'Режим {mode} из архива должен давать те же результаты, '
+            'что и при записи'
+        )
+    main.download(session)
+    downloaded = tmp_path / 'replay' / 'downloads' / ARCHIVE_URL.split('/')[-1]
+    assert downloaded.read_bytes() == b'zip', (
+        'Режим download должен брать архив документации из WARC'
+    )
+
+
+def test_replay_async(recorded):
+    path, expected = recorded
+    session = ParserSession(
+        backend='memory', archive=archive.WarcArchive(path)
+    )
+    got = asyncio.run(async_main.pep(session))
+    assert dict(got) == dict(expected['pep'])
+
+
+def test_warc_records(recorded):
+    path, _ = recorded
+    records = dict(archive.read_warc(path))
+    assert set(records) == set(PAGES) | {ARCHIVE_URL}, (
+        'В архив должен записываться каждый полученный ответ один раз'
+    )
+    status, _, headers, body = records[MAIN_PEP_URL]
+    assert status == 200
+    assert body.decode() == PAGES[MAIN_PEP_URL]
+    assert ('Content-Length', str(len(body))) in headers
+
+
+def test_replay_redirect_and_missing(tmp_path):
+    path = tmp_path / 'snapshot.warc.gz'
+    session = ParserSession(
+        backend='memory', recorder=archive.WarcWriter(path)
+    )
+    with requests_mock.Mocker() as mock:
+        mock.get(MAIN_PEP_URL + 'old', status_code=301, headers={
+            'Location': MAIN_PEP_URL
+        })
+        mock.get(MAIN_PEP_URL, text='index')
+        main.get_response(session, MAIN_PEP_URL + 'old')
+    replay = ParserSession(
+        backend='memory', archive=archive.WarcArchive(path)
+    )
+    response = main.get_response(replay, MAIN_PEP_URL + 'old')
+    assert response.text == 'index' and response.history
+    assert main.get_response(replay, MAIN_PEP_URL + 'missing') is None, (
+        'Запрос к URL, которого нет в архиве, должен завершаться ошибкой'
+    )
+
+
+def test_replay_async_run_modes(monkeypatch, recorded):
+    path, expected = recorded
+    outputs = {}
+
+    def control_output(results, cli_args):
+        outputs[cli_args.mode] = list(results)
+
+    monkeypatch.setattr(async_main, 'control_output', control_output)
+    session = ParserSession(
+        backend='memory', archive=archive.WarcArchive(path)
+    )
+    asyncio.run(async_main.run_modes(session, MODES, Namespace(output=None)))
+    assert {mode: sorted(rows) for mode, rows in outputs.items()} == {
+        mode: sorted(rows) for mode, rows in expected.items()
+    }, 'Режимы, запущенные вместе, должны давать те же результаты'
+    assert session.fetcher is None
+
+
+def test_record_replay_with_pep_state(monkeypatch, tmp_path, mocked_pages):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr('src.session.BASE_DIR', tmp_path)
+    state_path = tmp_path / 'state' / 'pep_state.json'
+    path = tmp_path / 'snapshot.warc.gz'
+    parser = configs.configure_argument_parser(['pep'])
+    warm = ParserSession(
+        backend='memory', pep_state=PepStateStore(state_path)
+    )
+    expected = main.pep(warm)
+    state = state_path.read_text()
+    record = create_session(
+        parser.parse_args(['pep', '--record', str(path)])
+    )
+    assert record.pep_state is None, (
+        'При записи архива состояние PEP не должно использоваться'
+    )
+    main.pep(record)
+    mocked_pages.stop()
+    assert {url for url, _ in archive.read_warc(path)} == {
+        url for url in PAGES if url.startswith(MAIN_PEP_URL)
+    }, (
+        'Архив должен содержать все карточки PEP, даже если '
+        'сохраненное состояние позволяет их пропустить'
+    )
+    replay = create_session(
+        parser.parse_args(['pep', '--replay', str(path)])
+    )
+    assert main.pep(replay) == expected, (
+        'Режим pep из архива должен давать те же результаты'
+    )
+    assert state_path.read_text() == state, (
+        'Воспроизведение архива не должно менять состояние PEP'
+    )
@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import requests
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / 'benchmarks'))
+try:
+    from stand_in import MAIN_PEP_URL, StandInServer, synthetic_snapshot
+except ModuleNotFoundError:
+    assert False, (
+        'Убедитесь что в директории `benchmarks` есть файл `stand_in.py`'
+    )
+
+
+def test_stand_in_server():
+    snapshot = synthetic_snapshot(peps=3, articles=2, archive_size=10)
+    with StandInServer(snapshot, latency=0.01, jitter=0.005) as server:
+        response = requests.get(server.local_url(MAIN_PEP_URL + 'pep-1'))
+        assert response.status_code == 200
+        assert 'PEP 1' in response.text
+        head = requests.head(server.local_url(MAIN_PEP_URL + 'pep-2'))
+        assert head.headers['Content-Length'] == str(len(
+            snapshot[MAIN_PEP_URL + 'pep-2']['body'].encode()
+        ))
+        missing = requests.get(server.local_url(MAIN_PEP_URL + 'pep-999'))
+        assert missing.status_code == 404
+        assert server.requests == 3, (
+            'Локальный сервер должен считать обработанные запросы'
+        )
+
+
+def test_benchmark_worker(tmp_path):
+    snapshot = synthetic_snapshot(peps=5, articles=2, archive_size=10)
+    with StandInServer(snapshot) as server:
+        completed = subprocess.run(
+            [
+                sys.executable, str(BASE_DIR / 'benchmarks' / 'run.py'),
+                '--worker', server.base_url, 'pep', 'async', str(tmp_path)
+            ],
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+        requests_count = server.requests
+    run = json.loads(completed.stdout.decode().splitlines()[-1])
+    assert requests_count == 6, (
+        'Бенчмарк режима pep должен загрузить индекс и каждую карточку PEP'
+    )
+    assert run['wall'] > 0 and run['parse'] > 0 and run['rss_kb'] > 0
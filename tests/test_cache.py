@@ -0,0 +1,93 @@
+import pickle
+
+import pytest
+import requests_mock
+from requests_cache import CachedSession
+
+from fixture_data.pages import MAIN_PEP_URL, PAGES
+try:
+    from src import async_main, cache, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+
+PEP_URLS = [url for url in PAGES if url.startswith(MAIN_PEP_URL + 'pep-')]
+
+
+def make_session(path, max_size=None):
+    return CachedSession(
+        backend=cache.ParserCache(str(path), max_size=max_size)
+    )
+
+
+def test_responses_compressed(tmp_path):
+    session = make_session(tmp_path / 'cache')
+    url = MAIN_PEP_URL
+    page = PAGES[url] * 20
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text=page)
+        session.get(url)
+        cached = session.get(url)
+    assert cached.from_cache and cached.text == page
+    assert session.cache.responses.total_size() < len(page.encode()) / 2, (
+        'Тела ответов должны храниться в кеше сжатыми'
+    )
+
+
+def test_uncompressed_entries_readable():
+    data = pickle.dumps({'body': b'page'})
+    assert cache.decompress(data) == data, (
+        'Записи, сохраненные без сжатия, должны читаться как есть'
+    )
+    assert cache.decompress(cache.compress(data)) == data
+
+
+def test_lru_eviction(tmp_path):
+    session = make_session(tmp_path / 'cache')
+    with requests_mock.Mocker() as mock:
+        for url in PEP_URLS:
+            mock.get(url, text=PAGES[url])
+        for url in PEP_URLS[:3]:
+            session.get(url)
+        responses = session.cache.responses
+        entry_size = responses.total_size() // 3
+        session.get(PEP_URLS[0])
+        responses.max_size = entry_size * 3 + entry_size // 2
+        session.get(PEP_URLS[3])
+    cached_urls = set(session.cache.urls())
+    assert PEP_URLS[1] not in cached_urls, (
+        'Из кеша должен вытесняться ответ, к которому дольше всего '
+        'не обращались'
+    )
+    assert {PEP_URLS[0], PEP_URLS[2], PEP_URLS[3]} <= cached_urls
+    assert responses.total_size() <= responses.max_size
+
+
+def test_cache_modes(tmp_path):
+    session = make_session(tmp_path / 'cache')
+    with requests_mock.Mocker() as mock:
+        for url in PEP_URLS:
+            mock.get(url, text=PAGES[url])
+            session.get(url)
+    stats = dict(main.MODE_TO_CACHE['cache-stats'](session))
+    assert stats['Ответов'] == str(len(PEP_URLS))
+    session.cache.responses.max_size = 1
+    pruned = dict(main.MODE_TO_CACHE['cache-prune'](session))
+    assert pruned['Удалено ответов'] == str(len(PEP_URLS)), (
+        'Режим cache-prune должен удалять ответы сверх лимита размера'
+    )
+    assert session.cache.responses.count() == 0
+
+
+@pytest.mark.parametrize('module', [main, async_main])
+@pytest.mark.parametrize('mode', ['cache-stats', 'cache-prune'])
+def test_cache_modes_reject_replay(monkeypatch, capsys, module, mode):
+    monkeypatch.setattr(
+        'sys.argv', [f'{module.__name__}.py', mode, '--replay', 'x.warc']
+    )
+    with pytest.raises(SystemExit):
+        module.main()
+    assert '--replay' in capsys.readouterr().err, (
+        f'Режим {mode} с --replay должен завершаться ошибкой аргументов'
+    )
@@ -0,0 +1,96 @@
+import asyncio
+
+from aiohttp import web
+try:
+    from src import fetcher, utils
+    from src.session import ParserSession
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `fetcher.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `fetcher.py`'
+
+
+async def run_with_server(handler, coroutine):
+    app = web.Application()
+    app.router.add_get('/{name}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await coroutine(f'http://127.0.0.1:{port}/')
+    finally:
+        await runner.cleanup()
+
+
+def test_fetcher_limits_concurrency():
+    in_flight = {'now': 0, 'max': 0}
+
+    async def handler(request):
+        in_flight['now'] += 1
+        in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        await asyncio.sleep(0.02)
+        in_flight['now'] -= 1
+        return web.Response(text=request.match_info['name'])
+
+    async def crawl(base_url):
+        async with fetcher.AsyncFetcher(concurrency=3, per_host=2) as f:
+            responses = await asyncio.gather(
+                *(f.get(f'{base_url}{i}') for i in range(10))
+            )
+        return [response.text for response in responses]
+
+    got = asyncio.run(run_with_server(handler, crawl))
+    assert got == [str(i) for i in range(10)], (
+        'Загрузчик должен возвращать тексты страниц в порядке запросов'
+    )
+    assert in_flight['max'] <= 2, (
+        'Загрузчик не должен превышать лимит запросов к одному хосту'
+    )
+
+
+def test_async_get_response_error():
+    async def handler(request):
+        return web.Response(status=404)
+
+    async def crawl(base_url):
+        async with fetcher.AsyncFetcher() as f:
+            return await utils.async_get_response(f, f'{base_url}missing')
+
+    got = asyncio.run(run_with_server(handler, crawl))
+    assert got is None, (
+        'Функция `async_get_response` должна возвращать None '
+        'при ошибке загрузки страницы'
+    )
+
+
+def test_fetcher_shares_session_cache():
+    hits = {'count': 0}
+
+    async def handler(request):
+        hits['count'] += 1
+        return web.Response(text='PEP 8', content_type='text/html')
+
+    session = ParserSession(backend='memory')
+
+    async def crawl(base_url):
+        async with fetcher.AsyncFetcher.from_session(session) as f:
+            first = (await f.get(f'{base_url}pep-0008')).text
+            second = (await f.get(f'{base_url}pep-0008')).text
+        sync_response = await asyncio.to_thread(
+            session.get, f'{base_url}pep-0008'
+        )
+        return first, second, sync_response
+
+    first, second, sync_response = asyncio.run(
+        run_with_server(handler, crawl)
+    )
+    assert first == second == 'PEP 8'
+    assert hits['count'] == 1, (
+        'Повторный запрос загрузчика должен обслуживаться из кеша сессии'
+    )
+    assert sync_response.from_cache, (
+        'Загрузчик должен сохранять ответы по тем же ключам, '
+        'что и синхронная сессия'
+    )
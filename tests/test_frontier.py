@@ -0,0 +1,76 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from requests_cache import CachedSession
+
+from fixture_data.pages import MAIN_PEP_URL
+try:
+    from src import async_main, main
+    from src.frontier import CrawlFrontier, normalize_url
+    from src.session import ParserSession
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `frontier.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `frontier.py`'
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://PEPS.python.org/pep-0008/', 'https://peps.python.org/pep-0008'),
+    ('https://peps.python.org/pep-8#id1', 'https://peps.python.org/pep-8'),
+    ('https://peps.python.org/', 'https://peps.python.org/'),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_frontier_dedup():
+    frontier = CrawlFrontier()
+    frontier.add(MAIN_PEP_URL + 'pep-1', ('A', ('Active',)))
+    frontier.add(MAIN_PEP_URL + 'pep-8', ('F', ('Final',)))
+    frontier.add(MAIN_PEP_URL + 'pep-1/', ('F', ('Final',)))
+    assert list(frontier) == [MAIN_PEP_URL + 'pep-1', MAIN_PEP_URL + 'pep-8']
+    assert len(frontier) == 2
+    assert frontier.rows_count == 3
+    assert frontier.rows(MAIN_PEP_URL + 'pep-1') == [
+        ('A', ('Active',)), ('F', ('Final',))
+    ]
+
+
+def card_requests(mock):
+    return Counter(
+        request.url for request in mock.request_history
+        if request.url != MAIN_PEP_URL
+    )
+
+
+def test_pep_fetches_each_card_once(mocked_pages):
+    session = CachedSession(backend='memory')
+    results = main.pep(session)
+    requested = card_requests(mocked_pages)
+    assert requested, 'Карточки PEP должны загружаться'
+    assert set(requested.values()) == {1}, (
+        'Карточка PEP из нескольких разделов индекса '
+        'должна загружаться один раз'
+    )
+    assert ('Total', 7) in results, (
+        'Подсчет PEP должен вестись по строкам индекса'
+    )
+
+
+def test_async_pep_fetches_each_card_once(monkeypatch, mocked_pages):
+    session = ParserSession(backend='memory')
+    fetched = Counter()
+
+    async def fake_get_response(fetcher, url):
+        fetched[url] += 1
+        return session.get(url)
+
+    monkeypatch.setattr(async_main, 'async_get_response', fake_get_response)
+    results = asyncio.run(async_main.pep(session))
+    assert set(fetched.values()) == {1}, (
+        'Карточка PEP из нескольких разделов индекса '
+        'должна загружаться один раз'
+    )
+    expected = main.pep(CachedSession(backend='memory'))
+    assert sorted(results) == sorted(expected)
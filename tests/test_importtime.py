@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+SRC_DIR = BASE_DIR / 'src'
+
+# Бюджет времени импорта модуля main в микросекундах.
+IMPORT_BUDGET_US = 200_000
+HEAVY_MODULES = {'aiohttp', 'bs4', 'lxml', 'requests_cache', 'tqdm'}
+PARSING_MODULES = {'aiohttp', 'bs4', 'lxml', 'tqdm'}
+
+
+def import_times(*args: str, cwd: Path = SRC_DIR) -> Dict[str, int]:
+    """Возвращает суммарное время импорта модулей по выводу -X importtime."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.decode().splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def top_level(times: Dict[str, int]) -> set:
+    return {name.split('.')[0] for name in times}
+
+
+@pytest.mark.parametrize('module', ['main', 'async_main'])
+def test_import_skips_heavy_modules(module):
+    loaded = top_level(import_times('-c', f'import {module}'))
+    assert not loaded & HEAVY_MODULES, (
+        f'Импорт {module} не должен загружать {loaded & HEAVY_MODULES}: '
+        'тяжелые библиотеки загружаются режимами, которые их используют'
+    )
+
+
+def test_import_budget():
+    times = import_times('-c', 'import main')
+    assert times['main'] < IMPORT_BUDGET_US, (
+        f'Импорт main занимает {times["main"] / 1000:.0f} мс, '
+        f'бюджет — {IMPORT_BUDGET_US / 1000:.0f} мс'
+    )
+
+
+def test_help_skips_http_stack():
+    loaded = top_level(import_times(str(SRC_DIR / 'main.py'), '--help'))
+    assert not loaded & HEAVY_MODULES, (
+        'Справка по аргументам не должна загружать HTTP-стек и парсеры'
+    )
+
+
+def test_cache_mode_skips_parsers(tmp_path):
+    loaded = top_level(import_times(
+        str(SRC_DIR / 'main.py'), 'cache-stats', cwd=tmp_path
+    ))
+    assert 'requests_cache' in loaded
+    assert not loaded & PARSING_MODULES, (
+        'Режимы обслуживания кеша не должны загружать парсеры и aiohttp'
+    )
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from test_fetcher import run_with_server
+from conftest import FlakyHandler
+try:
+    from src import fetcher
+    from src.limiter import HostRateLimiter, TokenBucket
+    from src.session import ParserSession
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `limiter.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `limiter.py`'
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0, 0], 'Запросы в пределах burst не должны ждать'
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_rate_limiter_per_host():
+    limiter = HostRateLimiter(rate=1, burst=1)
+    assert limiter.reserve('peps.python.org') == 0
+    assert limiter.reserve('docs.python.org') == 0, (
+        'У каждого хоста должна быть своя корзина токенов'
+    )
+    assert limiter.reserve('peps.python.org') > 0
+
+
+def test_sync_rate_limit_skips_cache(flaky_url):
+    FlakyHandler.failures = 0
+    session = ParserSession(
+        backend='memory', rate_limiter=HostRateLimiter(rate=20, burst=1)
+    )
+    urls = [f'{flaky_url}?page={number}' for number in range(5)]
+    started = time.perf_counter()
+    for url in urls:
+        session.get(url)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for url in urls:
+        assert session.get(url).from_cache
+    warm = time.perf_counter() - started
+    assert cold >= 0.19, 'Запросы к хосту должны ограничиваться по частоте'
+    assert warm < 0.1, 'Ответы из кеша не должны ждать токены'
+
+
+def test_async_rate_limit():
+    async def handler(request):
+        return web.Response(text=request.match_info['name'])
+
+    async def crawl(base_url):
+        async with fetcher.AsyncFetcher(
+            rate_limiter=HostRateLimiter(rate=20, burst=1)
+        ) as f:
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(f.get(f'{base_url}{i}') for i in range(5))
+            )
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(run_with_server(handler, crawl))
+    assert elapsed >= 0.19, (
+        'Асинхронный загрузчик должен ограничивать частоту запросов к хосту'
+    )
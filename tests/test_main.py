@@ -1,5 +1,12 @@
+import io
+import threading
+
 import pytest
+from argparse import Namespace
 from pathlib import Path
+from types import GeneratorType
+
+from fixture_data.pages import ARCHIVE_URL, MAIN_PEP_URL, PAGES
 try:
     from src import main
 except ModuleNotFoundError:
@@ -140,3 +147,109 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+@pytest.mark.parametrize('mode', ['whats-new', 'latest-versions'])
+def test_mode_to_stream(tempfile_session, mocked_pages, mode):
+    stream = main.MODE_TO_STREAM[mode](tempfile_session)
+    assert isinstance(stream, GeneratorType), (
+        f'Потоковый вариант режима {mode} должен быть генератором'
+    )
+    got = list(stream)
+    expected = main.MODE_TO_FUNCTION[mode](tempfile_session)
+    assert got == expected, (
+        f'Потоковый вариант режима {mode} должен отдавать '
+        'те же строки, что и обычный'
+    )
+
+
+def test_warm(tempfile_session, mocked_pages):
+    got = main.MODE_TO_CACHE['warm'](tempfile_session)
+    warmed = {request.url for request in mocked_pages.request_history}
+    assert got is None, 'Режим warm не должен выводить результаты'
+    assert warmed == set(PAGES), (
+        'Режим warm должен загрузить в кеш все страницы, '
+        'которые читают режимы парсера'
+    )
+    calls = mocked_pages.call_count
+    for mode in ('whats-new', 'latest-versions', 'pep'):
+        main.MODE_TO_FUNCTION[mode](tempfile_session)
+    assert mocked_pages.call_count == calls, (
+        'После прогрева режимы должны читать страницы только из кеша'
+    )
+
+
+def test_expand_modes():
+    assert main.expand_modes(['pep', 'all']) == [
+        'pep', 'whats-new', 'latest-versions', 'download'
+    ], 'Режим all должен раскрываться в режимы парсинга без повторов'
+
+
+def test_run_modes(monkeypatch, capsys, tempfile_session, mocked_pages):
+    outputs = {}
+
+    def control_output(results, cli_args):
+        outputs[cli_args.mode] = list(results)
+
+    monkeypatch.setattr(main, 'control_output', control_output)
+    modes = ['whats-new', 'latest-versions', 'pep']
+    main.run_modes(tempfile_session, modes, Namespace(output=None))
+    expected = {
+        mode: list(main.MODE_TO_FUNCTION[mode](tempfile_session))
+        for mode in modes
+    }
+    assert outputs == expected, (
+        'Каждый режим совместного запуска должен выводить '
+        'свои результаты отдельно'
+    )
+    monkeypatch.undo()
+    capsys.readouterr()
+    main.run_modes(tempfile_session, modes, Namespace(output=None))
+    lines = capsys.readouterr().out.splitlines()
+    blocks = {
+        mode: [' '.join(map(str, row)) for row in rows]
+        for mode, rows in expected.items()
+    }
+    assert len(lines) == sum(len(block) for block in blocks.values())
+    for block in blocks.values():
+        start = lines.index(block[0])
+        assert lines[start:start + len(block)] == block, (
+            'Строки режимов совместного запуска не должны '
+            'перемешиваться в консоли'
+        )
+
+
+def test_download_keeps_cache_for_other_modes(
+    monkeypatch, tmp_path, tempfile_session, mocked_pages
+):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowArchive(io.BytesIO):
+        def read(self, *args, **kwargs):
+            started.set()
+            release.wait(10)
+            return super().read(*args, **kwargs)
+
+    mocked_pages.get(ARCHIVE_URL, body=SlowArchive(b'zip'))
+    thread = threading.Thread(
+        target=main.download, args=(tempfile_session,)
+    )
+    thread.start()
+    try:
+        assert started.wait(10)
+        expected = main.pep(tempfile_session)
+        mocked_pages.reset_mock()
+        assert main.pep(tempfile_session) == expected
+        assert not [
+            request.url for request in mocked_pages.request_history
+            if request.url.startswith(MAIN_PEP_URL)
+        ], (
+            'Пока скачивается архив, остальные режимы должны '
+            'читать и пополнять HTTP-кеш общей сессии'
+        )
+    finally:
+        release.set()
+        thread.join()
+    assert (tmp_path / 'downloads' / ARCHIVE_URL.split('/')[-1]).exists()
@@ -0,0 +1,61 @@
+from requests_cache import CachedSession
+
+from fixture_data.pages import MAIN_PEP_URL, PAGES
+try:
+    from src import main, memo
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memo.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `memo.py`'
+
+PEP_CARD = PAGES[MAIN_PEP_URL + 'pep-1']
+
+
+def test_memo_skips_known_content(tmp_path):
+    calls = []
+
+    def extract_title(text):
+        calls.append(text)
+        return ['title', len(text)]
+
+    extract_memo = memo.ExtractMemo(tmp_path / 'memo.db')
+    first = extract_memo.extract(extract_title, PEP_CARD)
+    second = extract_memo.extract(extract_title, PEP_CARD)
+    extract_memo.extract(extract_title, PEP_CARD + ' ')
+    assert first == second == ['title', len(PEP_CARD)]
+    assert len(calls) == 2, (
+        'Страница с уже известным содержимым не должна разбираться повторно'
+    )
+    extract_memo.close()
+    reopened = memo.ExtractMemo(tmp_path / 'memo.db')
+    assert reopened.extract(extract_title, PEP_CARD) == first
+    assert len(calls) == 2, 'Кеш извлечения должен сохраняться между запусками'
+
+
+def test_memo_key_depends_on_version(monkeypatch, tmp_path):
+    extract_memo = memo.ExtractMemo(tmp_path / 'memo.db')
+    key = extract_memo.key(main.extract_pep_status_text, PEP_CARD)
+    extract_memo.store(key, 'Active')
+    monkeypatch.setattr(memo, 'EXTRACTOR_VERSION', memo.EXTRACTOR_VERSION + 1)
+    new_key = extract_memo.key(main.extract_pep_status_text, PEP_CARD)
+    assert new_key != key
+    assert extract_memo.lookup(new_key) is None, (
+        'После смены версии извлечения старые записи не должны использоваться'
+    )
+
+
+def test_warm_pep_skips_parsing(metrics, mocked_pages, tmp_path):
+    session = CachedSession(backend='memory')
+    session.extract_memo = memo.ExtractMemo(tmp_path / 'memo.db')
+    cold = main.pep(session)
+    cold_parses = metrics.histograms[
+        ('parse_duration_seconds', (('mode', 'pep'),))
+    ].count
+    metrics.reset()
+    warm = main.pep(session)
+    assert warm == cold
+    assert cold_parses > 1
+    assert metrics.histograms[
+        ('parse_duration_seconds', (('mode', 'pep'),))
+    ].count == 1, 'При повторном запуске разбирается только индекс PEP'
+    assert metrics.counter('extract_memo_hits_total') == 5
@@ -0,0 +1,63 @@
+from requests_cache import CachedSession
+
+try:
+    from src import main
+    from src.metrics import Metrics
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+def test_pep_metrics(metrics, mocked_pages):
+    session = CachedSession(backend='memory')
+    main.pep(session)
+    assert metrics.counter('requests_total', source='network') == 6, (
+        'Каждый ответ из сети должен учитываться в метриках'
+    )
+    assert metrics.cache_hit_ratio() == 0
+    main.pep(session)
+    assert metrics.counter('requests_total', source='cache') == 6
+    assert metrics.cache_hit_ratio() == 0.5, (
+        'Ответы из кеша должны учитываться в доле попаданий в кеш'
+    )
+    assert metrics.counter('response_bytes_total') > 0
+    parse = metrics.histograms[
+        ('parse_duration_seconds', (('mode', 'pep'),))
+    ]
+    assert parse.count > 0, 'Время разбора должно учитываться по режиму'
+
+
+def test_prometheus_text(tmp_path):
+    metrics = Metrics()
+    metrics.observe('request_duration_seconds', 0.02, source='network')
+    metrics.observe('request_duration_seconds', 3, source='network')
+    metrics.inc('requests_total', 2, source='network')
+    path = tmp_path / 'metrics' / 'bs4_parser.prom'
+    metrics.report(path)
+    text = path.read_text(encoding='UTF-8')
+    assert '# TYPE bs4_parser_request_duration_seconds histogram' in text
+    assert (
+        'bs4_parser_request_duration_seconds_bucket'
+        '{source="network",le="0.025"} 1'
+    ) in text
+    assert (
+        'bs4_parser_request_duration_seconds_bucket'
+        '{source="network",le="+Inf"} 2'
+    ) in text
+    assert 'bs4_parser_requests_total{source="network"} 2' in text
+    assert 'bs4_parser_cache_hit_ratio 0.0' in text
+
+
+def test_stats_file(monkeypatch, tmp_path, metrics):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('session.BASE_DIR', tmp_path)
+    path = tmp_path / 'textfile' / 'parser.prom'
+    monkeypatch.setattr('sys.argv', [
+        'main.py', 'cache-stats', '--stats', '--stats-file', str(path)
+    ])
+    main.main()
+    assert 'bs4_parser_run_duration_seconds' in path.read_text(), (
+        'С --stats-file метрики Prometheus должны записываться '
+        'в указанный файл'
+    )
@@ -1,3 +1,5 @@
+import json
+import sqlite3
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +92,73 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def broken_rows(rows: int):
+    yield ('Статус', 'Количество')
+    for number in range(rows):
+        yield ('Active', number)
+    raise RuntimeError('Сбой посреди парсинга')
+
+
+def test_file_output_streaming(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    monkeypatch.setattr(outputs, 'OUTPUT_FLUSH_ROWS', 2)
+    with pytest.raises(RuntimeError):
+        outputs.control_output(broken_rows(5), cli_args('pep', 'file'))
+    output_file, = Path(tmp_path).glob('results/*.csv')
+    lines = output_file.read_text(encoding='UTF-8').splitlines()
+    assert len(lines) == 6, (
+        'При сбое посреди парсинга уже полученные строки '
+        'должны остаться в файле'
+    )
+
+
+def test_default_output_generator(capsys):
+    rows = (row for row in [('Статус', 'Количество'), ('Active', 2)])
+    outputs.control_output(rows, cli_args('pep', None))
+    captured_out, _ = capsys.readouterr()
+    assert captured_out == 'Статус Количество\nActive 2\n', (
+        'Вывод в консоль должен принимать генератор строк'
+    )
+
+
+PEP_ROWS = [('Статус', 'Количество'), ('Active', 2), ('Total', 2)]
+
+
+def test_jsonl_output(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(iter(PEP_ROWS), cli_args('pep', 'jsonl'))
+    output_file, = Path(tmp_path).glob('results/pep_*.jsonl')
+    lines = output_file.read_text(encoding='UTF-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'Статус': 'Active', 'Количество': 2},
+        {'Статус': 'Total', 'Количество': 2},
+    ], 'Каждая строка JSON Lines должна быть объектом с ключами заголовка'
+
+
+def test_sqlite_output(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    for _ in range(2):
+        outputs.control_output(iter(PEP_ROWS), cli_args('pep', 'sqlite'))
+    connection = sqlite3.connect(Path(tmp_path) / 'results' / 'results.db')
+    try:
+        rows = connection.execute(
+            'SELECT "Статус", "Количество" FROM pep'
+        ).fetchall()
+    finally:
+        connection.close()
+    assert rows == PEP_ROWS[1:] * 2, (
+        'Результаты каждого запуска должны добавляться в таблицу режима'
+    )
+
+
+def test_parquet_output(monkeypatch, tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(iter(PEP_ROWS), cli_args('pep', 'parquet'))
+    output_file, = Path(tmp_path).glob('results/pep_*.parquet')
+    assert parquet.read_table(output_file).to_pylist() == [
+        {'Статус': 'Active', 'Количество': 2},
+        {'Статус': 'Total', 'Количество': 2},
+    ]
@@ -0,0 +1,62 @@
+import pytest
+
+try:
+    from src import main, parsers
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+
+PARSER_NAMES = ['bs4', 'lxml', 'selectolax']
+
+
+@pytest.fixture
+def run_with_parser(tempfile_session, mocked_pages):
+    def _run_with_parser(parser_name, mode):
+        if parser_name == 'selectolax':
+            pytest.importorskip('selectolax.lexbor')
+        main.configure_parser(parser_name)
+        try:
+            return main.MODE_TO_FUNCTION[mode](tempfile_session)
+        finally:
+            main.configure_parser('bs4')
+    return _run_with_parser
+
+
+@pytest.mark.parametrize('parser_name', PARSER_NAMES)
+@pytest.mark.parametrize('mode', ['whats-new', 'latest-versions', 'pep'])
+def test_parsers_give_identical_results(run_with_parser, parser_name, mode):
+    expected = run_with_parser('bs4', mode)
+    got = run_with_parser(parser_name, mode)
+    assert got == expected, (
+        f'Парсер {parser_name} должен давать те же результаты режима '
+        f'{mode}, что и BeautifulSoup'
+    )
+
+
+def test_corpus_results(run_with_parser):
+    got = run_with_parser('bs4', 'pep')
+    assert got == [
+        ('Active', 2), ('Final', 2), ('Withdrawn', 2),
+        ('Draft', 1), ('Total', 7)
+    ], 'Проверьте корпус страниц `fixture_data/pages.py`'
+
+
+@pytest.mark.parametrize('parser_name', PARSER_NAMES)
+def test_parsers_download(monkeypatch, tmp_path, run_with_parser, parser_name):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    run_with_parser(parser_name, 'download')
+    archive = tmp_path / 'downloads' / 'python-3.11.4-docs-pdf-a4.zip'
+    assert archive.read_bytes() == b'zip', (
+        f'Парсер {parser_name} должен находить ссылку на архив PDF A4'
+    )
+
+
+def test_node_is_abstract():
+    class PartialNode(parsers.Node):
+        def get(self, key, default=None):
+            return default
+
+    for node_class in (parsers.Node, PartialNode):
+        with pytest.raises(TypeError):
+            node_class()
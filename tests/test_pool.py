@@ -0,0 +1,81 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from fixture_data.pages import MAIN_PEP_URL, PAGES, WHATS_NEW_INDEX
+try:
+    from src import async_main, pool, utils
+    from src.session import ParserSession
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pool.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pool.py`'
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / 'benchmarks'))
+try:
+    from stand_in import StandInServer, synthetic_snapshot
+except ModuleNotFoundError:
+    assert False, (
+        'Убедитесь что в директории `benchmarks` есть файл `stand_in.py`'
+    )
+
+PEP_CARDS = [
+    page for url, page in PAGES.items()
+    if url.startswith(MAIN_PEP_URL + 'pep-')
+]
+
+
+async def extract_all(workers, function, texts):
+    with pool.ParsePool(workers) as parse_pool:
+        return await asyncio.gather(
+            *(parse_pool.extract(function, text) for text in texts)
+        )
+
+
+@pytest.mark.parametrize('parser_name', ['bs4', 'lxml'])
+def test_pool_matches_inline(parser_name):
+    async_main.configure_parser(parser_name)
+    try:
+        inline = asyncio.run(
+            extract_all(0, utils.extract_pep_status_text, PEP_CARDS)
+        )
+        pooled = asyncio.run(
+            extract_all(2, utils.extract_pep_status_text, PEP_CARDS)
+        )
+    finally:
+        async_main.configure_parser('bs4')
+    assert inline == ['Active', 'Final', 'Withdrawn', 'Withdrawn', 'Draft']
+    assert pooled == inline, (
+        f'Разбор в пуле процессов парсером {parser_name} должен давать '
+        'те же статусы, что и разбор в цикле событий'
+    )
+
+
+def test_pool_propagates_errors():
+    with pytest.raises(utils.ParserFindTagException):
+        asyncio.run(
+            extract_all(1, utils.extract_whats_new_text, [WHATS_NEW_INDEX])
+        )
+
+
+def test_async_pep_with_parse_workers(monkeypatch):
+    snapshot = synthetic_snapshot(peps=20, articles=2, archive_size=10)
+    with StandInServer(snapshot) as server:
+        # Индекс PEP разбирает main.get_pep_frontier, который async_main
+        # импортирует из модуля main, а не src.main.
+        monkeypatch.setattr(
+            'main.MAIN_PEP_URL', server.local_url(MAIN_PEP_URL)
+        )
+        results = {
+            workers: dict(asyncio.run(async_main.pep(
+                ParserSession(backend='memory', parse_workers=workers)
+            )))
+            for workers in (0, 2)
+        }
+    assert results[2] == results[0], (
+        'Режим pep с --parse-workers должен давать те же результаты, '
+        'что и без пула процессов'
+    )
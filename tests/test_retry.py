@@ -0,0 +1,117 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+from aiohttp import web
+
+from conftest import FlakyHandler
+from test_fetcher import run_with_server
+try:
+    from src import fetcher, utils
+    from src.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+    from src.session import ParserSession
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `retry.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `retry.py`'
+
+# Модули src импортируют друг друга без префикса пакета,
+# поэтому класс исключения берется из модуля utils.
+CircuitOpenException = utils.CircuitOpenException
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    delay = parse_retry_after(formatdate(time.time() + 60, usegmt=True))
+    assert 55 < delay <= 60
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(attempts=2, backoff=1, max_backoff=3)
+    assert all(0 <= policy.delay(5) <= 3 for _ in range(100)), (
+        'Задержка не должна превышать max_backoff'
+    )
+    assert policy.delay(0, '2') == 2, 'Нужно учитывать заголовок Retry-After'
+    assert policy.delay(0, '100') == 3
+    assert policy.should_retry(0, 503)
+    assert not policy.should_retry(0, 404)
+    assert not policy.should_retry(2, 503)
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+    breaker.record_failure('peps.python.org')
+    breaker.before_request('peps.python.org')
+    breaker.record_failure('peps.python.org')
+    with pytest.raises(CircuitOpenException):
+        breaker.before_request('peps.python.org')
+    breaker.before_request('docs.python.org')
+    time.sleep(0.06)
+    breaker.before_request('peps.python.org')
+    with pytest.raises(CircuitOpenException):
+        breaker.before_request('peps.python.org')
+    breaker.record_success('peps.python.org')
+    breaker.before_request('peps.python.org')
+
+
+def test_sync_retry(flaky_url):
+    session = ParserSession(
+        backend='memory', retry_policy=RetryPolicy(backoff=0.001)
+    )
+    response = utils.get_response(session, flaky_url)
+    assert response.status_code == 200, (
+        'Синхронная сессия должна повторять запрос при ответе 503'
+    )
+    assert FlakyHandler.hits == 3
+
+
+def test_sync_circuit_breaker():
+    session = ParserSession(
+        backend='memory',
+        retry_policy=RetryPolicy(attempts=0),
+        breaker=CircuitBreaker(threshold=1, reset_timeout=60),
+    )
+    url = 'http://127.0.0.1:9/pep-8'
+    assert utils.get_response(session, url) is None
+    with pytest.raises(CircuitOpenException):
+        session.get(url)
+
+
+def test_async_retry():
+    hits = {'count': 0}
+
+    async def handler(request):
+        hits['count'] += 1
+        if hits['count'] <= 2:
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        return web.Response(text='PEP 8')
+
+    async def crawl(base_url):
+        async with fetcher.AsyncFetcher() as f:
+            return (await f.get(f'{base_url}pep-8')).text
+
+    got = asyncio.run(run_with_server(handler, crawl))
+    assert got == 'PEP 8', (
+        'Асинхронный загрузчик должен повторять запрос при ответе 503'
+    )
+    assert hits['count'] == 3
+
+
+def test_async_circuit_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+
+    async def crawl():
+        async with fetcher.AsyncFetcher(
+            retry_policy=RetryPolicy(attempts=0), breaker=breaker
+        ) as f:
+            first = await utils.async_get_response(
+                f, 'http://127.0.0.1:9/pep-8'
+            )
+            with pytest.raises(CircuitOpenException):
+                await f.get('http://127.0.0.1:9/pep-8')
+            return first
+
+    assert asyncio.run(crawl()) is None
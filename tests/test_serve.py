@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+import requests
+import requests_mock
+
+from fixture_data.pages import PAGES
+try:
+    from src import configs, main, serve
+    from src.session import create_pep_state
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `serve.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `serve.py`'
+
+MODES = list(serve.SERVE_MODES)
+
+
+@pytest.fixture
+def server():
+    snapshot = serve.Snapshot()
+    with serve.SnapshotServer(('127.0.0.1', 0), snapshot, MODES) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        server.url = f'http://{host}:{port}/'
+        yield server
+        server.shutdown()
+
+
+def test_serves_snapshot(server, tempfile_session, mocked_pages):
+    serve.refresh(tempfile_session, server.snapshot, MODES)
+    expected = {
+        mode: [
+            list(row) for row in main.MODE_TO_FUNCTION[mode](
+                tempfile_session
+            )
+        ]
+        for mode in MODES
+    }
+    # Запросы к запущенному сервису должны уходить мимо заглушки.
+    mocked_pages.stop()
+    for mode in MODES:
+        response = requests.get(server.url + mode)
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith(
+            'application/json'
+        )
+        data = response.json()
+        assert [data['header'], *data['rows']] == expected[mode], (
+            f'GET /{mode} должен отдавать результаты режима из снимка'
+        )
+
+
+def test_unknown_and_missing_modes(server):
+    assert requests.get(server.url + 'download').status_code == 404
+    response = requests.get(server.url + 'pep')
+    assert response.status_code == 503, (
+        'До первого обновления сервис должен отвечать 503'
+    )
+    assert 'Retry-After' in response.headers
+
+
+def test_failed_refresh_keeps_results(tempfile_session):
+    snapshot = serve.Snapshot()
+    snapshot.update('pep', [('Статус', 'Количество'), ('Total', 1)])
+    before = snapshot.get('pep')
+    with requests_mock.Mocker() as mock:
+        for url in PAGES:
+            mock.get(url, exc=requests.ConnectionError)
+        serve.refresh_mode(tempfile_session, snapshot, 'pep')
+    assert snapshot.get('pep') == before, (
+        'Если обновление не удалось, сервис должен отдавать '
+        'прежние результаты'
+    )
+
+
+def test_refresher_updates_in_background(tempfile_session, mocked_pages):
+    snapshot = serve.Snapshot()
+    refresher = serve.Refresher(tempfile_session, snapshot, MODES, 60)
+    refresher.start()
+    refresher.stop()
+    refresher.join(timeout=10)
+    assert not refresher.is_alive()
+    assert all(snapshot.get(mode) is not None for mode in MODES), (
+        'Фоновый поток должен обновить результаты сразу после запуска'
+    )
+
+
+@pytest.mark.parametrize('option', [
+    ['-o', 'pretty'], ['--output', 'file'], ['--stats'], ['--shard', '1/2'],
+])
+def test_serve_rejects_cli_only_options(option):
+    parser = configs.configure_serve_argument_parser(MODES)
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', *option])
+
+
+def test_serve_arguments(monkeypatch, tmp_path):
+    monkeypatch.setattr('src.session.BASE_DIR', tmp_path)
+    args = configs.configure_serve_argument_parser(MODES).parse_args(
+        ['pep', '--port', '0', '--parser', 'lxml', '--retries', '1']
+    )
+    assert (args.port, args.parser, args.retries) == (0, 'lxml', 1)
+    assert create_pep_state(args).path == (
+        tmp_path / 'state' / 'pep_state.json'
+    ), 'Сервис должен использовать общее состояние PEP без шардов'
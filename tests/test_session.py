@@ -0,0 +1,129 @@
+import socket
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests_mock
+from requests_cache.policy import get_url_expiration
+try:
+    from src import configs, constants, session
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `session.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `session.py`'
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://peps.python.org/', timedelta(hours=1)),
+    ('https://peps.python.org/pep-0008/', timedelta(days=7)),
+    ('https://docs.python.org/3/', timedelta(hours=1)),
+    ('https://docs.python.org/3/whatsnew/', timedelta(hours=1)),
+    ('https://docs.python.org/3/whatsnew/3.11.html', timedelta(days=30)),
+])
+def test_urls_expire_after(url, expected):
+    got = get_url_expiration(url, constants.URLS_EXPIRE_AFTER)
+    assert got == expected, (
+        f'Проверьте время жизни кеша для {url} в `URLS_EXPIRE_AFTER`'
+    )
+
+
+def test_pool_arguments(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    args = configs.configure_argument_parser(['pep']).parse_args([
+        'pep', '--pool-connections', '3', '--pool-size', '7',
+        '--concurrency', '5'
+    ])
+    adapter = session.create_session(args).get_adapter(constants.MAIN_PEP_URL)
+    assert (adapter._pool_connections, adapter._pool_maxsize) == (3, 7), (
+        'Флаги --pool-connections и --pool-size должны задавать '
+        'число пулов и размер пула соединений'
+    )
+
+
+def test_stale_response_revalidated(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    args = configs.configure_argument_parser(['pep']).parse_args(['pep'])
+    parser_session = session.create_session(args)
+    url = constants.MAIN_PEP_URL
+    with requests_mock.Mocker() as mock:
+        mock.get(url, [
+            {'text': 'index', 'headers': {'ETag': '"v1"'}},
+            {'status_code': 304, 'headers': {'ETag': '"v1"'}},
+        ])
+        first = parser_session.get(url, expire_after=0)
+        second = parser_session.get(url)
+        assert mock.call_count == 2
+        revalidation = mock.request_history[1]
+    assert revalidation.headers.get('If-None-Match') == '"v1"', (
+        'Устаревшая запись кеша должна перепроверяться условным запросом'
+    )
+    assert first.text == second.text == 'index'
+    assert second.from_cache, (
+        'Ответ 304 должен продлевать запись кеша без загрузки тела'
+    )
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    connection_headers = []
+
+    def do_GET(self):
+        type(self).connections.add(self.client_address)
+        type(self).connection_headers.append(self.headers.get('Connection'))
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def keep_alive_url():
+    KeepAliveHandler.connections = set()
+    KeepAliveHandler.connection_headers = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('keep_alive, connections', [(True, 1), (False, 5)])
+def test_connection_reuse(keep_alive_url, keep_alive, connections):
+    parser_session = session.ParserSession(
+        backend='memory', keep_alive=keep_alive
+    )
+    for number in range(5):
+        parser_session.get(f'{keep_alive_url}{number}')
+    assert len(KeepAliveHandler.connections) == connections, (
+        'Синхронная сессия должна переиспользовать соединения пула'
+        if keep_alive else 'Без keep-alive соединения не переиспользуются'
+    )
+    if not keep_alive:
+        assert set(KeepAliveHandler.connection_headers) == {'close'}
+
+
+def test_transport_settings():
+    parser_session = session.ParserSession(
+        backend='memory', pool_size=30, pool_connections=4,
+        concurrency=20, timeout=12, connect_timeout=3
+    )
+    adapter = parser_session.get_adapter('https://peps.python.org/')
+    assert adapter._pool_maxsize == 30, (
+        'Размер пула соединений должен задаваться настройкой pool_size'
+    )
+    assert adapter._pool_connections == 4, (
+        'Число пулов соединений должно задаваться настройкой '
+        'pool_connections'
+    )
+    assert adapter.timeout == (3, 12), (
+        'Таймаут соединения должен задаваться отдельно от таймаута чтения'
+    )
+    socket_options = adapter.poolmanager.connection_pool_kw['socket_options']
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in socket_options
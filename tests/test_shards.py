@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from requests_cache import CachedSession
+
+from fixture_data.pages import MAIN_PEP_URL, PAGES, PEP_INDEX
+try:
+    from src import async_main, configs, main, shards
+    from src.frontier import CrawlFrontier
+    from src.session import ParserSession, create_pep_state
+    from src.state import PepStateStore
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `shards.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `shards.py`'
+
+SHARDS = 3
+
+
+def card_urls(mock):
+    return [
+        request.url for request in mock.request_history
+        if request.url != MAIN_PEP_URL
+    ]
+
+
+def test_frontier_shards_partition():
+    frontier = CrawlFrontier()
+    for number in range(50):
+        frontier.add(f'{MAIN_PEP_URL}pep-{number}', ('A', ('Active',)))
+    frontier.add(f'{MAIN_PEP_URL}pep-1/', ('F', ('Final',)))
+    parts = [frontier.shard(index, SHARDS) for index in range(1, SHARDS + 1)]
+    urls = [url for part in parts for url in part]
+    assert sorted(urls) == sorted(frontier), (
+        'Каждая карточка PEP должна попадать ровно в один шард'
+    )
+    assert all(len(part) for part in parts)
+    assert all(
+        part.rows(url) == frontier.rows(url) for part in parts for url in part
+    ), 'Карточка должна попадать в шард со всеми строками индекса'
+    assert list(frontier.shard(2, SHARDS)) == list(parts[1]), (
+        'Разбиение на шарды должно быть детерминированным'
+    )
+
+
+def test_sharded_pep_merge(monkeypatch, tmp_path, mocked_pages):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    fetched = []
+    expected = main.pep(CachedSession(backend='memory'))
+    for index in range(1, SHARDS + 1):
+        mocked_pages.reset_mock()
+        session = CachedSession(backend='memory')
+        session.shard = (index, SHARDS)
+        main.pep(session)
+        fetched.extend(card_urls(mocked_pages))
+    assert len(fetched) == len(set(fetched)), (
+        'Карточка PEP должна загружаться только в своем шарде'
+    )
+    saved = json.loads(
+        (tmp_path / 'shards' / f'pep-1-of-{SHARDS}.json').read_text()
+    )
+    assert 'Total' not in saved['counts']
+    merged = main.MODE_TO_CACHE['merge'](CachedSession(backend='memory'))
+    assert dict(merged) == dict(expected), (
+        'Режим merge должен давать те же счетчики и Total, '
+        'что и обход без шардов'
+    )
+
+
+def test_concurrent_shards_state(monkeypatch, tmp_path, mocked_pages):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr('src.session.BASE_DIR', tmp_path)
+    parser = configs.configure_argument_parser(['pep'])
+
+    def run_shard(index):
+        session = CachedSession(backend='memory')
+        session.shard = (index, SHARDS)
+        session.pep_state = create_pep_state(
+            parser.parse_args(['pep', '--shard', f'{index}/{SHARDS}'])
+        )
+        return main.pep(session)
+
+    expected = main.pep(CachedSession(backend='memory'))
+    with ThreadPoolExecutor(max_workers=SHARDS) as executor:
+        list(executor.map(run_shard, range(1, SHARDS + 1)))
+    states = {
+        path.name: json.loads(path.read_text())
+        for path in (tmp_path / 'state').iterdir()
+    }
+    assert set(states) <= {
+        f'pep_state-{index}-of-{SHARDS}.json'
+        for index in range(1, SHARDS + 1)
+    }, 'У каждого шарда должен быть свой файл состояния PEP'
+    assert sorted(url for state in states.values() for url in state) == sorted(
+        url for url in PAGES
+        if url.startswith(MAIN_PEP_URL) and url != MAIN_PEP_URL
+    ), 'Состояние каждой карточки PEP должно сохраняться в файле ее шарда'
+    merged = main.MODE_TO_CACHE['merge'](CachedSession(backend='memory'))
+    assert dict(merged) == dict(expected)
+
+
+def test_concurrent_state_saves(tmp_path):
+    path = tmp_path / 'state' / 'pep_state.json'
+
+    def save(number):
+        store = PepStateStore(path)
+        for attempt in range(20):
+            store.remember(f'{MAIN_PEP_URL}pep-{number}', 'A', 'Active')
+            store.save()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(save, range(8)))
+    assert set(json.loads(path.read_text())) <= {
+        f'{MAIN_PEP_URL}pep-{number}' for number in range(8)
+    }, 'Одновременные сохранения не должны портить файл состояния'
+    assert [file.name for file in path.parent.iterdir()] == [path.name], (
+        'После сохранения не должно оставаться временных файлов'
+    )
+
+
+def test_async_sharded_pep(monkeypatch, tmp_path, mocked_pages):
+    session = ParserSession(
+        backend='memory', shard=(1, SHARDS), shards_dir=tmp_path / 'shards'
+    )
+
+    async def fake_get_response(fetcher, url):
+        return session.get(url)
+
+    monkeypatch.setattr(async_main, 'async_get_response', fake_get_response)
+    results = asyncio.run(async_main.pep(session))
+    saved = shards.shard_path(tmp_path / 'shards', (1, SHARDS))
+    assert json.loads(saved.read_text())['counts'] == {
+        status: number for status, number in results if status != 'Total'
+    }
+
+
+def test_merge_requires_all_shards(tmp_path):
+    shards.save_shard(tmp_path, (1, 2), {'Active': 1, 'Total': 1}, 'v1')
+    with pytest.raises(shards.ShardMergeException, match=r'\[2\]'):
+        shards.merge_shards(tmp_path)
+    shards.save_shard(tmp_path, (2, 3), {'Final': 1, 'Total': 1}, 'v1')
+    with pytest.raises(shards.ShardMergeException):
+        shards.merge_shards(tmp_path)
+
+
+def test_merge_rejects_other_index(tmp_path):
+    shards.save_shard(tmp_path, (1, 2), {'Active': 1, 'Total': 1}, 'v1')
+    shards.save_shard(tmp_path, (2, 2), {'Final': 1, 'Total': 1}, 'v2')
+    with pytest.raises(shards.ShardMergeException, match='снимкам индекса'):
+        shards.merge_shards(tmp_path)
+
+
+def test_stale_shard_from_previous_run(tmp_path, mocked_pages):
+    shards_dir = tmp_path / 'copied'
+    parser = configs.configure_argument_parser(['pep', 'merge'])
+    for index in range(1, SHARDS + 1):
+        args = parser.parse_args([
+            'pep', '--shard', f'{index}/{SHARDS}',
+            '--shards-dir', str(shards_dir)
+        ])
+        session = CachedSession(backend='memory')
+        session.shard, session.shards_dir = args.shard, args.shards_dir
+        main.pep(session)
+    mocked_pages.get(MAIN_PEP_URL, text=PEP_INDEX.replace('>PF<', '>PA<'))
+    session = CachedSession(backend='memory')
+    session.shard, session.shards_dir = (1, SHARDS), shards_dir
+    main.pep(session)
+    merge_session = CachedSession(backend='memory')
+    merge_session.shards_dir = parser.parse_args(
+        ['merge', '--shards-dir', str(shards_dir)]
+    ).shards_dir
+    with pytest.raises(shards.ShardMergeException):
+        main.MODE_TO_CACHE['merge'](merge_session)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1/4', (1, 4)), ('4/4', (4, 4)),
+    ('0/4', None), ('5/4', None), ('1/0', None), ('a/b', None), ('2', None),
+])
+def test_shard_spec(value, expected):
+    if expected is None:
+        with pytest.raises(argparse.ArgumentTypeError):
+            configs.shard_spec(value)
+    else:
+        assert configs.shard_spec(value) == expected
@@ -0,0 +1,88 @@
+import pytest
+import requests_mock
+from requests_cache import CachedSession
+
+from fixture_data.pages import MAIN_PEP_URL, PAGES, PEP_INDEX, pep_card
+try:
+    from src import main
+    from src.state import PepStateStore
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `state.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `state.py`'
+
+
+def run_pep(state_path, pages, full=False):
+    session = CachedSession(backend='memory')
+    session.pep_state = PepStateStore(state_path, full=full)
+    with requests_mock.Mocker() as mock:
+        for url, page in pages.items():
+            mock.get(url, text=page)
+        results = main.pep(session)
+        cards = [
+            request.url for request in mock.request_history
+            if request.url != MAIN_PEP_URL
+        ]
+    return results, cards
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return tmp_path / 'state' / 'pep_state.json'
+
+
+def test_pep_state_roundtrip(state_path):
+    store = PepStateStore(state_path)
+    store.remember(MAIN_PEP_URL + 'pep-8', 'PF PF 8 Style Guide', 'Final')
+    store.save()
+    got = PepStateStore(state_path)
+    assert got.lookup(
+        MAIN_PEP_URL + 'pep-8', 'PF PF 8 Style Guide'
+    ) == 'Final'
+    assert got.lookup(
+        MAIN_PEP_URL + 'pep-8', 'PA PA 8 Style Guide'
+    ) is None, 'При изменении строки индекса карточку нужно загрузить заново'
+    assert PepStateStore(state_path, full=True).lookup(
+        MAIN_PEP_URL + 'pep-8', 'PF PF 8 Style Guide'
+    ) is None
+
+
+def test_incremental_pep(state_path):
+    first, first_cards = run_pep(state_path, PAGES)
+    assert first_cards, 'Первый запуск должен загрузить карточки PEP'
+
+    second, second_cards = run_pep(state_path, PAGES)
+    assert second == first
+    assert second_cards == [], (
+        'Карточки PEP с неизменившимся статусом в индексе '
+        'не должны загружаться повторно'
+    )
+
+    pages = dict(PAGES)
+    pages[MAIN_PEP_URL] = PEP_INDEX.replace('>PF<', '>PA<')
+    pages[MAIN_PEP_URL + 'pep-8'] = pep_card(8, 'Active')
+    third, third_cards = run_pep(state_path, pages)
+    assert set(third_cards) == {MAIN_PEP_URL + 'pep-8'}, (
+        'Должны загружаться только карточки PEP с изменившимся статусом'
+    )
+    assert ('Active', 4) in third
+
+    _, full_cards = run_pep(state_path, pages, full=True)
+    assert set(full_cards) == set(first_cards), (
+        'Флаг --full должен загружать все карточки PEP'
+    )
+
+
+def test_incremental_pep_same_status_letter(state_path):
+    run_pep(state_path, PAGES)
+    pages = dict(PAGES)
+    pages[MAIN_PEP_URL] = PEP_INDEX.replace(
+        'title="I"', 'title="Informational, Active"'
+    )
+    pages[MAIN_PEP_URL + 'pep-801'] = pep_card(801, 'Active')
+    results, cards = run_pep(state_path, pages)
+    assert cards == [MAIN_PEP_URL + 'pep-801'], (
+        'Переход Draft -> Active не меняет буквенный статус в индексе, '
+        'но меняет строку индекса: карточку нужно загрузить заново'
+    )
+    assert ('Active', 3) in results
@@ -1,3 +1,4 @@
+import time
 import pytest
 import requests
 import requests_mock
@@ -54,3 +55,114 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+ARCHIVE_URL = MAIN_DOC_URL + 'archives/python-docs-pdf-a4.zip'
+ARCHIVE = b'0123456789' * 10
+
+
+def test_download_file(tempfile_session, tmp_path):
+    path = tmp_path / 'docs.zip'
+    with requests_mock.Mocker() as mock:
+        mock.head(ARCHIVE_URL, headers={'Content-Length': str(len(ARCHIVE))})
+        mock.get(ARCHIVE_URL, content=ARCHIVE)
+        got = utils.download_file(tempfile_session, ARCHIVE_URL, path)
+        assert got is True
+        assert path.read_bytes() == ARCHIVE, (
+            'Функция `download_file` должна сохранять файл целиком'
+        )
+        assert not list(tmp_path.glob('*.part')), (
+            'После загрузки временный файл должен быть переименован'
+        )
+        got = utils.download_file(tempfile_session, ARCHIVE_URL, path)
+        assert got is False
+        assert mock.call_count == 3, (
+            'Актуальный файл не должен загружаться повторно'
+        )
+
+
+def test_download_file_resume(tempfile_session, tmp_path):
+    path = tmp_path / 'docs.zip'
+    (tmp_path / 'docs.zip.part').write_bytes(ARCHIVE[:30])
+    headers = {'Content-Length': str(len(ARCHIVE)), 'ETag': '"v1"'}
+    with requests_mock.Mocker() as mock:
+        mock.head(ARCHIVE_URL, headers=headers)
+        mock.get(ARCHIVE_URL, content=ARCHIVE[30:], status_code=206)
+        utils.download_file(tempfile_session, ARCHIVE_URL, path)
+        request = mock.request_history[-1]
+    assert request.headers['Range'] == 'bytes=30-', (
+        'Прерванная загрузка должна продолжаться Range-запросом'
+    )
+    assert request.headers['If-Range'] == '"v1"'
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_size_mismatch(tempfile_session, tmp_path):
+    path = tmp_path / 'docs.zip'
+    with requests_mock.Mocker() as mock:
+        mock.head(ARCHIVE_URL, headers={'Content-Length': '1000'})
+        mock.get(ARCHIVE_URL, content=ARCHIVE)
+        with pytest.raises(BaseException) as excinfo:
+            utils.download_file(tempfile_session, ARCHIVE_URL, path)
+    assert excinfo.typename == 'DownloadIntegrityException'
+    assert not path.exists(), (
+        'Файл с неверным размером не должен сохраняться'
+    )
+
+
+def test_iter_responses_keeps_order(tempfile_session):
+    urls = [f'{MAIN_DOC_URL}whatsnew/3.{i}.html' for i in range(6)]
+
+    def slow_page(request, context):
+        number = int(request.url.split('.')[-2])
+        time.sleep(0.01 * (6 - number))
+        return request.url
+
+    with requests_mock.Mocker() as mock:
+        mock.get(requests_mock.ANY, text=slow_page)
+        got = list(utils.iter_responses(tempfile_session, urls))
+    assert [response.text for response in got] == urls, (
+        'Функция `iter_responses` должна отдавать ответы '
+        'в порядке переданных URL'
+    )
+
+
+PEP_PAGE = (
+    '<html><body><nav><ul><li><a href="/">Index</a></li></ul></nav>'
+    '<section id="pep-content"><h1>PEP 8 – Style Guide</h1>'
+    '<dl class="rfc2822 field-list simple">'
+    '<dt>Author</dt><dd>Guido</dd>'
+    '<dt>Status</dt><dd><abbr title="In use">Active</abbr></dd>'
+    '<dt>Type</dt><dd><abbr title="Process">Process</abbr></dd>'
+    '</dl><p>Body</p></section></body></html>'
+)
+WHATS_NEW_PAGE = (
+    '<html><body><section><h1>What’s New In Python 3.10</h1>'
+    '<dl class="field-list simple"><dt>Release</dt>\n<dd>3.10.1</dd>'
+    '<dt>Editor</dt>\n<dd>Pablo Galindo Salgado</dd></dl>'
+    '<p>Body</p><dl><dt>Other</dt></dl></section></body></html>'
+)
+
+
+@pytest.mark.parametrize('page, expected', [
+    (PEP_PAGE, 'Active'),
+    (PEP_PAGE.replace('rfc2822 ', ''), 'Active'),
+])
+def test_extract_pep_status_text(page, expected):
+    got = utils.extract_pep_status_text(page)
+    assert got == expected, (
+        'Функция `extract_pep_status_text` должна возвращать статус '
+        'из карточки PEP'
+    )
+
+
+def test_extract_whats_new_text():
+    soup = bs4.BeautifulSoup(WHATS_NEW_PAGE, features='lxml')
+    expected = (
+        soup.find('h1').text, soup.find('dl').text.replace('\n', ' ')
+    )
+    got = utils.extract_whats_new_text(WHATS_NEW_PAGE)
+    assert got == expected, (
+        'Частичный разбор статьи должен давать тот же результат, '
+        'что и разбор всей страницы'
+    )